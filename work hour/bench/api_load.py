@@ -0,0 +1,150 @@
+# 로컬 JSON API 부하 테스트 클라이언트
+# 실행: python -m bench.api_load [--clients 20] [--requests 200] [--writes 0.3] [--port PORT]
+# --port가 없으면 임시 DB로 서버를 이 프로세스 안에 띄운다. 있으면 이미 떠 있는 서버(cli.py serve)에 붙는다.
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+
+from bench.data import generate_db
+
+WORK_TYPES = ["일반근무", "재택근무", "연/월차", "오전반차", "출장"]
+
+
+async def request(reader, writer, method, path, payload=None):
+    body = json.dumps(payload, ensure_ascii=False).encode('utf-8') if payload is not None else b''
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Length: {len(body)}\r\n"
+                 f"Content-Type: application/json\r\n\r\n".encode('latin-1') + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        if name.strip().lower() == 'content-length':
+            length = int(value)
+    return status, json.loads(await reader.readexactly(length))
+
+
+async def client(port, count, write_ratio, seed, latencies, statuses):
+    # 연결 하나를 유지하며 읽기/쓰기를 섞어 보낸다. 2023년 날짜만 쓰므로 기존 기록과 겹쳐도 된다.
+    rng = random.Random(seed)
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writes = 0
+    try:
+        for _ in range(count):
+            day = f"2023-{rng.randint(1, 12):02}-{rng.randint(1, 28):02}"
+            roll = rng.random()
+            if roll < write_ratio * 0.7:
+                call = ('PUT', f"/entries/{day}", {'start_time': "09:00", 'end_time': rng.choice(["17:00", "18:00"]),
+                                                   'work_type': rng.choice(WORK_TYPES)})
+                writes += 1
+            elif roll < write_ratio:
+                call = ('DELETE', f"/entries/{day}", None)
+                writes += 1
+            elif roll < 0.5 + write_ratio / 2:
+                call = ('GET', f"/entries/{day}", None)
+            else:
+                call = ('GET', f"/summary/2023/{rng.randint(1, 12)}", None)
+            started = time.perf_counter()
+            status, _ = await request(reader, writer, *call)
+            latencies.append((time.perf_counter() - started) * 1000)
+            statuses[status] = statuses.get(status, 0) + 1
+    finally:
+        writer.close()
+    return writes
+
+
+async def subscribe(port, events, stop):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write(b"GET /events HTTP/1.1\r\nHost: localhost\r\n\r\n")
+    await writer.drain()
+    while not stop.is_set():
+        try:
+            line = await asyncio.wait_for(reader.readline(), 0.2)
+        except asyncio.TimeoutError:
+            continue
+        if not line:
+            break
+        if line.startswith(b'data: '):
+            events.append(json.loads(line[6:]))
+    writer.close()
+
+
+async def run(port, clients, requests, write_ratio):
+    latencies = []
+    statuses = {}
+    events = []
+    stop = asyncio.Event()
+    subscriber = asyncio.create_task(subscribe(port, events, stop))
+    await asyncio.sleep(0.1)  # 구독이 먼저 붙도록
+    started = time.perf_counter()
+    writes = await asyncio.gather(*(client(port, requests, write_ratio, seed, latencies, statuses)
+                                    for seed in range(clients)))
+    elapsed = time.perf_counter() - started
+    await asyncio.sleep(0.2)  # 마지막 알림까지 받도록
+    stop.set()
+    await subscriber
+    latencies.sort()
+    total = len(latencies)
+    print(f"{clients} clients x {requests} requests: {total / elapsed:,.0f} req/s in {elapsed:.2f} s")
+    print(f"latency ms: p50 {statistics.median(latencies):.2f}  p95 {latencies[int(total * 0.95) - 1]:.2f}  "
+          f"p99 {latencies[int(total * 0.99) - 1]:.2f}  max {latencies[-1]:.2f}")
+    print(f"status: {dict(sorted(statuses.items()))}")
+    print(f"writes: {sum(writes)}, change notifications received: {len(events)}")
+
+
+def start_server(path):
+    # 별도 스레드의 이벤트 루프에서 서버를 띄우고 실제 포트를 돌려준다
+    from server import WorkHoursServer
+
+    ready = threading.Event()
+    holder = {}
+
+    def target():
+        loop = asyncio.new_event_loop()
+        holder['server'] = loop.run_until_complete(WorkHoursServer(path, port=0).start())
+        holder['loop'] = loop
+        ready.set()
+        loop.run_forever()
+
+    threading.Thread(target=target, daemon=True).start()
+    ready.wait()
+    return holder
+
+
+def stop_server(holder):
+    future = asyncio.run_coroutine_threadsafe(holder['server'].close(), holder['loop'])
+    future.result()
+    holder['loop'].call_soon_threadsafe(holder['loop'].stop)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test for the local JSON API")
+    parser.add_argument('--clients', type=int, default=20)
+    parser.add_argument('--requests', type=int, default=200, help="requests per client")
+    parser.add_argument('--writes', type=float, default=0.3, help="fraction of PUT/DELETE requests")
+    parser.add_argument('--port', type=int, help="use a server that is already running")
+    args = parser.parse_args()
+    if args.port:
+        asyncio.run(run(args.port, args.clients, args.requests, args.writes))
+        return
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'work_hours.db')
+        generate_db(path, years=3)
+        holder = start_server(path)
+        try:
+            asyncio.run(run(holder['server'].port, args.clients, args.requests, args.writes))
+        finally:
+            stop_server(holder)
+
+
+if __name__ == '__main__':
+    main()
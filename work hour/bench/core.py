@@ -0,0 +1,70 @@
+# 헤드리스(core) 계산 vs GUI 경로(PyQt5 + WorkHoursManager.update_info) 시간 비교
+# 실행: python -m bench.core
+import datetime
+import os
+import subprocess
+import sys
+import tempfile
+import textwrap
+
+from bench.data import generate_db
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_DIR = os.path.dirname(BENCH_DIR)
+YEARS = 3
+LAST_YEAR = 2024
+
+HEADLESS = textwrap.dedent('''
+    import sys, time
+    started = time.perf_counter()
+    from core import WorkHoursStore
+    from db import Database
+    store = WorkHoursStore(Database(sys.argv[1]))
+    ready = time.perf_counter()
+    for year in range({first}, {last} + 1):
+        for month in range(1, 13):
+            store.month_summary(year, month)
+    done = time.perf_counter()
+    print(ready - started, done - ready)
+''')
+
+GUI = textwrap.dedent('''
+    import os, sys, time
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    started = time.perf_counter()
+    from PyQt5.QtCore import QDate
+    from PyQt5.QtWidgets import QApplication
+    app = QApplication(['bench'])
+    from main import WorkHoursManager
+    window = WorkHoursManager(sys.argv[1])
+    ready = time.perf_counter()
+    for year in range({first}, {last} + 1):
+        for month in range(1, 13):
+            window.calendar.setSelectedDate(QDate(year, month, 1))
+            window.update_info()
+    done = time.perf_counter()
+    print(ready - started, done - ready)
+''')
+
+
+def run(script, path):
+    code = script.format(first=LAST_YEAR - YEARS + 1, last=LAST_YEAR)
+    out = subprocess.run([sys.executable, '-c', code, path], cwd=APP_DIR, check=True,
+                         capture_output=True, text=True).stdout
+    startup, compute = (float(value) for value in out.split())
+    return startup * 1000, compute * 1000
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'work_hours.db')
+        generate_db(path, years=YEARS, end=datetime.date(LAST_YEAR, 12, 31))
+        months = YEARS * 12
+        print(f"{'':10} {'startup ms':>12} {f'{months} months ms':>16} {'per month ms':>14}")
+        for name, script in (('headless', HEADLESS), ('gui', GUI)):
+            startup, compute = min((run(script, path) for _ in range(3)), key=sum)
+            print(f"{name:10} {startup:12.1f} {compute:16.2f} {compute / months:14.3f}")
+
+
+if __name__ == '__main__':
+    main()
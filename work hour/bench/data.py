@@ -0,0 +1,58 @@
+# 벤치마크용 가짜 근무 기록 DB 생성
+import datetime
+import random
+
+from core import entry_row
+from db import Database
+
+BENCH_WORK_TYPES = ["일반근무"] * 12 + ["재택근무", "재택근무", "연/월차", "오전반차", "오후반차", "출장", "교육", "기타"]
+START_TIMES = ["08:00", "08:30", "09:00", "09:30"]
+END_TIMES = ["16:30", "17:00", "17:30", "18:00", "18:30"]
+
+
+def iter_days(first, last):
+    day = first
+    while day <= last:
+        yield day
+        day += datetime.timedelta(days=1)
+
+
+FIXED_HOLIDAYS = {(1, 1): "신정", (3, 1): "삼일절", (5, 5): "어린이날", (6, 6): "현충일", (8, 15): "광복절",
+                  (10, 3): "개천절", (10, 9): "한글날", (12, 25): "기독탄신일"}
+
+
+def year_holidays(year, rng):
+    # 고정 공휴일 + 해마다 날짜가 바뀌는 3일 연휴 두 번(설날/추석 대용) + 주말과 겹치면 대체공휴일 하루
+    holidays = {datetime.date(year, month, day): name for (month, day), name in FIXED_HOLIDAYS.items()}
+    for name, month, first_day in (("설날", 1, 21), ("추석", 9, 8)):
+        start = datetime.date(year, month, first_day) + datetime.timedelta(days=rng.randrange(28))
+        days = [start + datetime.timedelta(days=offset) for offset in range(3)]
+        holidays.update((day, name) for day in days)
+        if any(day.weekday() >= 5 for day in days):
+            substitute = days[-1] + datetime.timedelta(days=1)
+            while substitute.weekday() >= 5 or substitute in holidays:
+                substitute += datetime.timedelta(days=1)
+            holidays[substitute] = "대체공휴일"
+    return holidays
+
+
+def generate_db(path, years, end=datetime.date(2024, 12, 31), seed=0):
+    rng = random.Random(seed)
+    first = datetime.date(end.year - years + 1, 1, 1)
+    holidays = {}
+    for year in range(first.year, end.year + 1):
+        holidays.update(year_holidays(year, rng))
+    work_rows = []
+    holiday_rows = [(day.toordinal(), name) for day, name in sorted(holidays.items()) if first <= day <= end]
+    for day in iter_days(first, end):
+        if (day.weekday() < 5 and day not in holidays) or rng.random() < 0.03:
+            if rng.random() < 0.95:
+                work_rows.append(entry_row(day.isoformat(), rng.choice(START_TIMES), rng.choice(END_TIMES),
+                                           rng.choice(BENCH_WORK_TYPES)))
+    db = Database(path)
+    with db.transaction():
+        db.executemany('Insert or replace work hours', work_rows)
+        db.executemany('Insert or replace holiday', holiday_rows)
+        db.execute('Insert leave entry', (first.toordinal(), 'grant', 15.0, 'bench'))
+    db.close()
+    return len(work_rows), len(holiday_rows)
@@ -0,0 +1,34 @@
+# 쿼리 조회 1회당 비용 비교: 예전 방식(매번 queries.sql 파싱) vs 레지스트리
+# 실행: python -m bench.load_query
+import timeit
+
+from db import QUERIES_PATH, load_query
+
+
+def legacy_load_query(query_name):
+    with open(QUERIES_PATH, 'r') as file:
+        queries = file.read().split(';')
+        query_dict = {}
+        for query in queries:
+            if query.strip():
+                lines = query.strip().split('\n')
+                name = lines[0].strip().lstrip('-- ')
+                query_dict[name] = '\n'.join(lines[1:]).strip()
+        return query_dict[query_name]
+
+
+def measure(func, number):
+    best = min(timeit.repeat(lambda: func('Select work hours for a specific date'), number=number, repeat=5))
+    return best / number * 1e6
+
+
+def main():
+    legacy = measure(legacy_load_query, 2000)
+    registry = measure(load_query, 200000)
+    print(f"legacy load_query : {legacy:10.3f} us/call")
+    print(f"registry          : {registry:10.3f} us/call")
+    print(f"speedup           : {legacy / registry:10.0f}x")
+
+
+if __name__ == '__main__':
+    main()
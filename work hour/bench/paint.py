@@ -0,0 +1,146 @@
+# WorkCalendar 다시 그리기 비용 측정 (offscreen QPA)
+# 실행: python -m bench.paint
+import os
+import sys
+import tempfile
+import time
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt5.QtCore import QDate, Qt
+from PyQt5.QtGui import QColor
+from PyQt5.QtWidgets import QApplication, QCalendarWidget
+
+from bench.data import generate_db
+from core import WorkHoursStore
+from db import Database
+
+
+def legacy_paint_cell(calendar, painter, rect, date):
+    # 렌더 모델 도입 전 paintCell (비교용)
+    QCalendarWidget.paintCell(calendar, painter, rect, date)
+    date_str = date.toString("yyyy-MM-dd")
+    view = calendar.store.day(date_str)
+    recorded = view is not None and view.recorded
+    holiday = view is not None and view.holiday
+    painter.fillRect(rect, QColor('white'))
+    painter.setOpacity(1.0 if date.month() == calendar.selectedDate().month() else 0.3)
+    if recorded:
+        work_type = view.work_type_name
+        if work_type == "재택근무":
+            painter.fillRect(rect, QColor(0xE6, 0xFB, 0xEA))
+        elif work_type == "연/월차":
+            painter.fillRect(rect, QColor(255, 219, 204))
+        elif work_type in ("오전반차", "오후반차"):
+            painter.fillRect(rect, QColor(255, 255, 181))
+        elif work_type == "출장":
+            painter.fillRect(rect, QColor(212, 240, 240))
+        elif work_type == "교육":
+            painter.fillRect(rect, QColor(236, 213, 227))
+        elif work_type == "기타":
+            painter.fillRect(rect, QColor(236, 234, 228))
+    painter.setPen(QColor('black'))
+    if holiday or date.dayOfWeek() in (6, 7):
+        painter.setPen(QColor('red'))
+    painter.drawText(rect, Qt.AlignCenter, str(date.day()))
+    if recorded:
+        hours = view.minutes / 60
+        if holiday or date.dayOfWeek() in (6, 7):
+            color = QColor('blue')
+        else:
+            color = QColor('blue') if hours >= 8 else QColor('red')
+        painter.setPen(color)
+        painter.drawText(rect, Qt.AlignBottom | Qt.AlignRight, f"{hours:.2f}")
+    if date == calendar.selectedDate():
+        pen = painter.pen()
+        pen.setWidth(2)
+        pen.setColor(QColor(0, 0, 0))
+        painter.setPen(pen)
+        painter.drawRect(rect.adjusted(1, 1, -1, -1))
+    painter.setOpacity(1.0)
+
+
+def time_repaints(calendar, app, count, resize=False, switch_months=False):
+    start_date = QDate(2024, 1, 15)
+    started = time.perf_counter()
+    for i in range(count):
+        if resize:
+            calendar.resize(600 + (i % 2) * 40, 400 + (i % 2) * 30)
+        if switch_months:
+            calendar.setSelectedDate(start_date.addMonths(i % 12))
+        app.processEvents()
+        calendar.grab()  # 내부 테이블 뷰까지 포함해 한 번 그린다
+    return (time.perf_counter() - started) / count * 1000
+
+
+def time_heatmap(heatmap, app, years, count, cold):
+    # cold: 해마다 store 캐시를 비워 DB에서 다시 읽는 경우, warm: 이미 읽은 해를 다시 그리는 경우
+    started = time.perf_counter()
+    for i in range(count):
+        if cold:
+            heatmap.store.year_days_cache.clear()
+        heatmap.set_year(years[i % len(years)])
+        app.processEvents()
+        heatmap.grab()
+    return (time.perf_counter() - started) / count * 1000
+
+
+def bench_heatmap(app, tmp):
+    from main import YearHeatmap
+
+    path = os.path.join(tmp, 'heatmap.db')
+    generate_db(path, years=10)
+    db = Database(path)
+    heatmap = YearHeatmap(WorkHoursStore(db))
+    heatmap.resize(720, 300)
+    heatmap.show()
+    years = list(range(2015, 2025))
+    time_heatmap(heatmap, app, years, 10, cold=False)  # 워밍업
+    print(f"{'year heatmap (10 years)':30} {'repaint':>10} {'switch cold':>12} {'switch warm':>12}  (ms per repaint)")
+    repaint = time_heatmap(heatmap, app, [2024], 100, cold=False)
+    cold = time_heatmap(heatmap, app, years, 100, cold=True)
+    warm = time_heatmap(heatmap, app, years, 100, cold=False)
+    print(f"{'':30} {repaint:10.3f} {cold:12.3f} {warm:12.3f}")
+    heatmap.close()
+    heatmap.detach()
+    db.close()
+
+
+def main():
+    from main import WorkCalendar
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'work_hours.db')
+        generate_db(path, years=3)
+        db = Database(path)
+
+        scenarios = [
+            ('legacy paintCell', lambda cal, *args: legacy_paint_cell(cal, *args), False),
+            ('render model', None, False),
+            ('render model + pixmap cache', None, True),
+        ]
+        print(f"{'':30} {'repaint':>10} {'resize':>10} {'month switch':>14}  (ms per repaint)")
+        for name, paint, use_pixmaps in scenarios:
+            calendar = WorkCalendar(WorkHoursStore(db))
+            calendar.pixmap_cache_enabled = use_pixmaps
+            if paint is not None:
+                calendar.paintCell = lambda painter, rect, date, cal=calendar: paint(cal, painter, rect, date)
+            calendar.resize(600, 400)
+            calendar.setSelectedDate(QDate(2024, 1, 15))
+            calendar.show()
+            app.processEvents()
+            time_repaints(calendar, app, 5)  # 워밍업
+            plain = time_repaints(calendar, app, 100)
+            resized = time_repaints(calendar, app, 100, resize=True)
+            switched = time_repaints(calendar, app, 100, switch_months=True)
+            print(f"{name:30} {plain:10.3f} {resized:10.3f} {switched:14.3f}")
+            calendar.close()
+            calendar.deleteLater()
+        db.close()
+        print()
+        bench_heatmap(app, tmp)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,209 @@
+# 기록이 1년/10년/30년 쌓인 DB에서 앱 전체 주요 경로 시간 측정 (offscreen QPA)
+# 실행: python -m bench.suite [--years 1 10 30] [--out results.json] [--baseline baseline.json]
+# 크기마다 새 프로세스에서 재므로 시작 시간은 매번 콜드 스타트다.
+import argparse
+import datetime
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from bench.data import generate_db
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_DIR = os.path.dirname(BENCH_DIR)
+DEFAULT_YEARS = (1, 10, 30)
+LAST_YEAR = 2024
+DEFAULT_TOLERANCE = 0.25  # 기준보다 25% 넘게 느려지면 회귀로 본다
+
+
+def summarize(samples):
+    # 밀리초 표본 -> 중앙값/p95/최대
+    samples = sorted(samples)
+    return {
+        'n': len(samples),
+        'median_ms': round(statistics.median(samples), 4),
+        'p95_ms': round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 4),
+        'max_ms': round(samples[-1], 4),
+    }
+
+
+def timed(func, count):
+    samples = []
+    for i in range(count):
+        started = time.perf_counter()
+        func(i)
+        samples.append((time.perf_counter() - started) * 1000)
+    return summarize(samples)
+
+
+def run_worker(path, years):
+    # 자식 프로세스: WorkHoursManager를 띄워 항목별로 재고 결과를 JSON 한 줄로 출력한다
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    started = time.perf_counter()
+    from PyQt5.QtCore import QDate
+    from PyQt5.QtWidgets import QApplication
+    app = QApplication(['bench'])
+    from main import WorkHoursManager
+    imported = time.perf_counter()
+    window = WorkHoursManager(path)
+    window.show()
+    app.processEvents()
+    ready = time.perf_counter()
+
+    first_year = LAST_YEAR - years + 1
+    months = [(year, month) for year in range(first_year, LAST_YEAR + 1) for month in range(1, 13)]
+    # 히스토리 전체에 고르게 흩어진 날짜 (캐시 밖의 달도 섞인다)
+    dates = [QDate(year, month, 1 + (index * 7) % 28) for index, (year, month) in enumerate(months)]
+    results = {
+        'startup': {'import_ms': round((imported - started) * 1000, 3),
+                    'window_ms': round((ready - imported) * 1000, 3),
+                    'total_ms': round((ready - started) * 1000, 3)},
+    }
+
+    def select(date):
+        window.calendar.setSelectedDate(date)
+        app.processEvents()
+
+    # 달력이 쓰는 달 단위 일괄 읽기 (예전 WorkCalendar.load_work_hours). 매번 캐시를 비운 뒤의 load_month만 잰다.
+    store = window.store
+    samples = []
+    for i in range(min(500, 4 * len(months))):
+        store.clear_cache()
+        started = time.perf_counter()
+        store.load_month(*months[i % len(months)])
+        samples.append((time.perf_counter() - started) * 1000)
+    results['load_work_hours'] = summarize(samples)
+    store.clear_cache()
+    window.calendar.ensure_window(window.calendar.yearShown(), window.calendar.monthShown())
+
+    def update_info(i):
+        window.calendar.setSelectedDate(dates[i % len(dates)])
+        window.update_info()
+    results['update_info'] = timed(update_info, min(300, 4 * len(dates)))
+    results['update_balance_and_leave'] = timed(lambda i: window.update_balance_and_leave(), 300)
+
+    select(QDate(LAST_YEAR, 6, 12))
+    window.calendar.grab()  # 워밍업
+    results['paint_calendar'] = timed(lambda i: window.calendar.grab(), 100)
+    results['paint_calendar']['per_cell_ms'] = round(results['paint_calendar']['median_ms'] / 42, 4)
+
+    def month_switch(i):
+        window.calendar.setSelectedDate(dates[i % len(dates)])
+        window.calendar.showSelectedDate()
+        window.calendar.grab()
+    results['month_switch_paint'] = timed(month_switch, min(100, 2 * len(dates)))
+
+    # 등록 -> 삭제 한 번 (커밋까지 기다린다). 끝나면 DB는 처음과 같다.
+    select(QDate(LAST_YEAR, 6, 15))  # 토요일이라 원래 기록이 없을 가능성이 크다
+
+    def round_trip(i):
+        window.save_work_hours()
+        window.refresh.flush()
+        window.delete_work_hours()
+        window.refresh.flush()
+        window.db.sync()
+    results['save_delete_round_trip'] = timed(round_trip, 50)
+
+    window.refresh.flush()
+    window.db.close()  # closeEvent는 창 위치를 QSettings에 저장하므로 부르지 않는다
+    print(json.dumps(results))
+
+
+def measure(years, tmp):
+    path = os.path.join(tmp, f'work_hours_{years}y.db')
+    started = time.perf_counter()
+    entries, holidays = generate_db(path, years=years, end=datetime.date(LAST_YEAR, 12, 31))
+    generated = (time.perf_counter() - started) * 1000
+    out = subprocess.run([sys.executable, '-m', 'bench.suite', '--worker', path, '--years', str(years)],
+                         cwd=APP_DIR, check=True, capture_output=True, text=True).stdout
+    results = json.loads(out.strip().splitlines()[-1])
+    results['data'] = {'entries': entries, 'holidays': holidays, 'db_bytes': os.path.getsize(path),
+                       'generate_ms': round(generated, 1)}
+    return results
+
+
+def environment():
+    from PyQt5.QtCore import QT_VERSION_STR
+    return {
+        'python': platform.python_version(),
+        'qt': QT_VERSION_STR,
+        'sqlite': sqlite3.sqlite_version,
+        'platform': platform.platform(),
+        'recorded_at': datetime.datetime.now().isoformat(timespec='seconds'),
+    }
+
+
+def iter_metrics(results):
+    # (크기, 항목, 중앙값 또는 시작 시간)
+    for years, metrics in results.items():
+        for name, values in metrics.items():
+            if 'median_ms' in values:
+                yield years, name, values['median_ms']
+            elif 'total_ms' in values:
+                yield years, name, values['total_ms']
+
+
+def compare(results, baseline, tolerance):
+    # 기준 결과보다 tolerance 넘게 느려진 (크기, 항목, 기준, 현재) 목록
+    reference = {(years, name): value for years, name, value in iter_metrics(baseline['results'])}
+    regressions = []
+    for years, name, value in iter_metrics(results):
+        base = reference.get((years, name))
+        if base is not None and base > 0 and value > base * (1 + tolerance):
+            regressions.append((years, name, base, value))
+    return regressions
+
+
+def print_table(results, baseline=None):
+    reference = {}
+    if baseline is not None:
+        reference = {(years, name): value for years, name, value in iter_metrics(baseline['results'])}
+    print(f"{'years':>5} {'metric':28} {'ms':>10} {'baseline':>10} {'change':>8}")
+    for years, name, value in iter_metrics(results):
+        base = reference.get((years, name))
+        change = f"{(value / base - 1) * 100:+7.1f}%" if base else ''
+        base_text = f"{base:10.3f}" if base is not None else ''
+        print(f"{years:>5} {name:28} {value:10.3f} {base_text:>10} {change:>8}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Work Hours Manager benchmark suite")
+    parser.add_argument('--years', type=int, nargs='+', default=list(DEFAULT_YEARS))
+    parser.add_argument('--out', help="write results as JSON to this file")
+    parser.add_argument('--baseline', help="compare against a JSON file written by --out")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument('--worker', metavar='DB', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        run_worker(args.worker, args.years[0])
+        return 0
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for years in args.years:
+            results[str(years)] = measure(years, tmp)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as file:
+            baseline = json.load(file)
+    print_table(results, baseline)
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as file:
+            json.dump({'environment': environment(), 'results': results}, file, indent=2, ensure_ascii=False)
+    if baseline is not None:
+        regressions = compare(results, baseline, args.tolerance)
+        for years, name, base, value in regressions:
+            print(f"REGRESSION {years}y {name}: {base:.3f} -> {value:.3f} ms", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
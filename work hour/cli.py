@@ -0,0 +1,255 @@
+# PyQt 없이 실행하는 명령줄 도구
+# 예: python cli.py import attendance.csv
+import argparse
+import datetime
+import sys
+import time
+
+from core import WorkHoursStore, ordinal_date
+from db import DB_PATH, Database
+
+
+def iso_date(value):
+    # argparse type: 'yyyy-mm-dd'만 받는다. 잘못된 날짜는 사용법 오류(종료 코드 2)로 끝난다.
+    try:
+        return datetime.date.fromisoformat(value).isoformat()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid date {value!r} (expected yyyy-mm-dd)") from None
+
+
+def cmd_import(args):
+    from importer import AttendanceImportError, import_attendance
+
+    db = Database(args.db)
+    store = WorkHoursStore(db)
+    started = time.perf_counter()
+    try:
+        imported, errors = import_attendance(store, args.file, args.format, args.skip_invalid)
+    except (AttendanceImportError, OSError) as e:
+        print(f"Import failed: {e}", file=sys.stderr)
+        return 1
+    finally:
+        db.close()
+    elapsed = (time.perf_counter() - started) * 1000
+    for error in errors:
+        print(f"Skipped line {error}", file=sys.stderr)
+    print(f"Imported {imported} rows in {elapsed:.1f} ms (remaining leave: {store.remaining_leave:g})")
+    return 0
+
+
+def cmd_holidays(args):
+    from holiday_import import HolidayImportError, import_holidays
+
+    db = Database(args.db)
+    store = WorkHoursStore(db)
+    started = time.perf_counter()
+    try:
+        imported, errors = import_holidays(store, args.file, args.skip_invalid)
+    except (HolidayImportError, OSError) as e:
+        print(f"Import failed: {e}", file=sys.stderr)
+        return 1
+    finally:
+        db.close()
+    elapsed = (time.perf_counter() - started) * 1000
+    for error in errors:
+        print(f"Skipped event at line {error}", file=sys.stderr)
+    print(f"Imported {imported} holidays in {elapsed:.1f} ms (remaining leave: {store.remaining_leave:g})")
+    return 0
+
+
+def cmd_leave(args):
+    db = Database(args.db)
+    store = WorkHoursStore(db)
+    try:
+        if args.on:
+            print(f"Leave balance at the end of {args.on}: {store.leave_balance_on(args.on):g}")
+            return 0
+        if args.audit:
+            balance, mismatches = store.replay_leave_ledger()
+            print(f"Replayed balance: {balance:g}, stored balance: {store.remaining_leave:g}")
+            for seq in mismatches:
+                print(f"Running balance mismatch at entry {seq}", file=sys.stderr)
+            return 1 if mismatches or abs(balance - store.remaining_leave) > 1e-9 else 0
+        for seq, recorded_at, day, kind, amount, balance, note in store.leave_entries():
+            date = ordinal_date(day) if day else '-'
+            print(f"{seq:6} {recorded_at} {date:10} {kind:8} {amount:+6g} {balance:8g} {note or ''}")
+        return 0
+    finally:
+        db.close()
+
+
+def cmd_summary(args):
+    db = Database(args.db)
+    store = WorkHoursStore(db)
+    try:
+        if args.verify or args.rebuild:
+            mismatches = store.verify_monthly_summary()
+            for (year, month), stored, fresh in mismatches:
+                print(f"{year:04}-{month:02}: stored {stored} != recomputed {fresh}")
+            print(f"{len(mismatches)} month(s) differ from a full rebuild")
+            if args.rebuild and mismatches:
+                store.rebuild_monthly_summary()
+                print("monthly_summary rebuilt")
+                return 0
+            return 1 if mismatches else 0
+        year = args.year or datetime.date.today().year
+        print(f"{'month':>5} {'hours':>8} {'required':>9} {'balance':>8} {'days':>7}")
+        for month, summary in enumerate(store.year_summaries(year), start=1):
+            print(f"{month:5} {summary.total_hours:8.2f} {summary.required:9} {summary.balance:8.2f} "
+                  f"{summary.workdays_with_hours:3}/{summary.work_days:<3}")
+        return 0
+    finally:
+        db.close()
+
+
+def cmd_rollup(args):
+    from rollup import find_databases, rollup, team_totals, write_csv
+
+    paths = find_databases(args.directory)
+    if not paths:
+        print(f"No .db files under {args.directory}", file=sys.stderr)
+        return 1
+    year = args.year or datetime.date.today().year
+    started = time.perf_counter()
+    reports = rollup(paths, year, args.jobs)
+    elapsed = (time.perf_counter() - started) * 1000
+    reports.sort(key=lambda report: report.name)
+
+    print(f"{'employee':20} {'hours':>9} {'required':>9} {'balance':>9} {'leave':>6} {'months':>6}")
+    for report in reports:
+        if report.error:
+            print(f"Skipped {report.path}: {report.error}", file=sys.stderr)
+            continue
+        hours = sum(summary.total_hours for summary in report.months)
+        required = sum(summary.required for summary in report.months)
+        balance = sum(summary.balance for summary in report.months)
+        completed = sum(summary.all_days_worked for summary in report.months)
+        print(f"{report.name[:20]:20} {hours:9.2f} {required:9} {balance:9.2f} {report.remaining_leave:6g} {completed:6}")
+    totals = team_totals(reports)
+    print(f"{'team':20} {sum(t[0] for t in totals):9.2f} {sum(t[1] for t in totals):9} "
+          f"{sum(t[2] for t in totals):9.2f}")
+    if args.csv:
+        write_csv(args.csv, reports)
+    failed = sum(1 for report in reports if report.error)
+    print(f"Rolled up {len(reports) - failed} of {len(paths)} databases for {year} in {elapsed:.1f} ms")
+    return 1 if failed else 0
+
+
+def cmd_export(args):
+    from exporter import ExportError, export_report
+
+    year = args.year or datetime.date.today().year
+    first = args.date_from or f"{year:04}-01-01"
+    last = args.date_to or f"{year:04}-12-31"
+    db = Database(args.db)
+    started = time.perf_counter()
+    try:
+        count = export_report(db, args.file, first, last, args.format)
+    except (ExportError, OSError) as e:
+        print(f"Export failed: {e}", file=sys.stderr)
+        return 1
+    finally:
+        db.close()
+    elapsed = (time.perf_counter() - started) * 1000
+    print(f"Exported {count} rows ({first} ~ {last}) to {args.file} in {elapsed:.1f} ms")
+    return 0
+
+
+def cmd_serve(args):
+    import asyncio
+
+    from server import DEFAULT_PORT, serve
+
+    try:
+        asyncio.run(serve(args.db, args.host, args.port or DEFAULT_PORT))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def cmd_sync(args):
+    from sync import SyncError, sync, write_report
+
+    db = Database(args.db)
+    store = WorkHoursStore(db)
+    started = time.perf_counter()
+    try:
+        report = sync(store, args.folder)
+        if args.report:
+            write_report(report, args.report)
+    except (SyncError, OSError) as e:
+        print(f"Sync failed: {e}", file=sys.stderr)
+        return 1
+    finally:
+        db.close()
+    elapsed = (time.perf_counter() - started) * 1000
+    for conflict in report.conflicts:
+        print(f"Conflict {conflict.table} {conflict.key}: local {conflict.local_changed_at}, "
+              f"{conflict.device} {conflict.remote_changed_at} -> kept {conflict.kept}")
+    print(f"Device {report.device}: received {report.received} changes (applied {report.applied}, "
+          f"unchanged {report.unchanged}, older than local {report.older}), exported {report.exported}, "
+          f"{len(report.conflicts)} conflict(s) in {elapsed:.1f} ms (remaining leave: {store.remaining_leave:g})")
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Work Hours Manager command line tools")
+    parser.add_argument('--db', default=DB_PATH, help="path to work_hours.db")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    import_parser = commands.add_parser('import', help="import attendance rows from CSV or JSON")
+    import_parser.add_argument('file')
+    import_parser.add_argument('--format', choices=('csv', 'json'), help="default: from the file extension")
+    import_parser.add_argument('--skip-invalid', action='store_true', help="skip invalid rows instead of aborting")
+    import_parser.set_defaults(func=cmd_import)
+
+    holidays_parser = commands.add_parser('holidays', help="import all-day events from an iCalendar (.ics) file")
+    holidays_parser.add_argument('file')
+    holidays_parser.add_argument('--skip-invalid', action='store_true', help="skip invalid events instead of aborting")
+    holidays_parser.set_defaults(func=cmd_holidays)
+
+    leave_parser = commands.add_parser('leave', help="show the leave ledger")
+    leave_parser.add_argument('--audit', action='store_true', help="replay the ledger and check running balances")
+    leave_parser.add_argument('--on', type=iso_date, metavar='DATE', help="balance at the end of DATE (yyyy-mm-dd)")
+    leave_parser.set_defaults(func=cmd_leave)
+
+    summary_parser = commands.add_parser('summary', help="show or verify the monthly_summary table")
+    summary_parser.add_argument('--year', type=int, help="default: this year")
+    summary_parser.add_argument('--verify', action='store_true', help="rebuild the summaries in memory and diff")
+    summary_parser.add_argument('--rebuild', action='store_true', help="like --verify, then repair the table")
+    summary_parser.set_defaults(func=cmd_summary)
+
+    export_parser = commands.add_parser('export', help="write a per-day report with monthly totals to CSV or XLSX")
+    export_parser.add_argument('file')
+    export_parser.add_argument('--format', choices=('csv', 'xlsx'), help="default: from the file extension")
+    export_parser.add_argument('--year', type=int, help="whole year (default: this year)")
+    export_parser.add_argument('--from', dest='date_from', type=iso_date, metavar='DATE', help="first day (yyyy-mm-dd)")
+    export_parser.add_argument('--to', dest='date_to', type=iso_date, metavar='DATE', help="last day (yyyy-mm-dd)")
+    export_parser.set_defaults(func=cmd_export)
+
+    rollup_parser = commands.add_parser('rollup', help="team report over a directory of work_hours.db files")
+    rollup_parser.add_argument('directory')
+    rollup_parser.add_argument('--year', type=int, help="default: this year")
+    rollup_parser.add_argument('--jobs', type=int, help="worker processes (default: CPU count, 1: no pool)")
+    rollup_parser.add_argument('--csv', metavar='FILE', help="also write employee x month rows to FILE")
+    rollup_parser.set_defaults(func=cmd_rollup)
+
+    serve_parser = commands.add_parser('serve', help="run the local JSON API (localhost only)")
+    serve_parser.add_argument('--host', default='127.0.0.1', choices=('127.0.0.1', 'localhost', '::1'))
+    serve_parser.add_argument('--port', type=int, help="default: $WORK_HOURS_API_PORT or 8765")
+    serve_parser.set_defaults(func=cmd_serve)
+
+    sync_parser = commands.add_parser('sync', help="exchange changes with other devices through a shared folder")
+    sync_parser.add_argument('folder')
+    sync_parser.add_argument('--report', metavar='FILE', help="also write the result and conflicts as JSON")
+    sync_parser.set_defaults(func=cmd_sync)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,877 @@
+import calendar
+import datetime
+from array import array
+import os
+import sqlite3
+from collections import namedtuple, OrderedDict
+from enum import IntEnum
+
+from workdays import WorkdayEngine, count_weekdays, month_end
+
+
+class WorkType(IntEnum):
+    NONE = 0  # 등록되지 않았거나 알 수 없는 유형
+    NORMAL = 1
+    REMOTE = 2
+    ANNUAL_LEAVE = 3
+    HALF_DAY_AM = 4
+    HALF_DAY_PM = 5
+    BUSINESS_TRIP = 6
+    TRAINING = 7
+    OTHER = 8
+
+WORK_TYPES = ["일반근무", "재택근무", "연/월차", "오전반차", "오후반차", "출장", "교육", "기타"]
+WORK_TYPE_CODES = {name: WorkType(code) for code, name in enumerate(WORK_TYPES, start=1)}
+
+MINUTES_PER_DAY = 8 * 60
+LUNCH_BREAK_MIN = 60  # 점심시간 1시간 제외
+LEAVE_ADJUSTMENT_KEY = 'leave_adjustment'  # settings: 'set' 항목 합계 (동기화로 다른 기기에 간다)
+
+def parse_minutes(time_str):
+    # 'HH:MM' -> 자정부터의 분
+    hour, minute = time_str.split(':')
+    return int(hour) * 60 + int(minute)
+
+def format_minutes(minutes):
+    return f"{minutes // 60:02}:{minutes % 60:02}"
+
+def work_minutes(start_min, end_min, break_min=LUNCH_BREAK_MIN):
+    return end_min - start_min - break_min
+
+def split_date(date_str):
+    return int(date_str[:4]), int(date_str[5:7]), int(date_str[8:10])
+
+def day_ordinal(date_str):
+    # DB 키로 쓰는 정수 일 (datetime.date.toordinal, 0001-01-01 = 1)
+    return datetime.date(*split_date(date_str)).toordinal()
+
+def ordinal_date(day):
+    return datetime.date.fromordinal(day).isoformat()
+
+def entry_row(date_str, start_time, end_time, work_type, break_min=LUNCH_BREAK_MIN):
+    # 'Insert or replace work hours' 파라미터. 근무 분은 쓸 때 한 번만 계산해 저장한다.
+    start_min = parse_minutes(start_time)
+    end_min = parse_minutes(end_time)
+    return (day_ordinal(date_str), start_min, end_min, break_min,
+            work_minutes(start_min, end_min, break_min), work_type)
+
+def add_months(year, month, delta):
+    index = year * 12 + (month - 1) + delta
+    return index // 12, index % 12 + 1
+
+def month_range(year, month):
+    # 그 달 첫날과 말일의 정수 일
+    first = datetime.date(year, month, 1).toordinal()
+    return first, first + calendar.monthrange(year, month)[1] - 1
+
+def leave_adjustment(work_type, undo=False):
+    # 근무 유형을 되돌릴 때(undo=False) 돌려받는 연차 일수. undo=True면 새로 쓰는 만큼 차감된다.
+    adjustment = 0
+    if work_type == "연/월차":
+        adjustment = 1
+    elif work_type == "오전반차" or work_type == "오후반차":
+        adjustment = 0.5
+    elif work_type == "increment":
+        adjustment = 1
+    elif work_type == "decrement":
+        adjustment = -1
+    return -adjustment if undo else adjustment
+
+# 한 해를 1월 1일부터의 일 순서로 펼친 배열들. flags: 1 주말, 2 휴일, 4 기록 있음
+DAY_WEEKEND = 1
+DAY_HOLIDAY = 2
+DAY_RECORDED = 4
+YearDays = namedtuple('YearDays', 'year first_day minutes work_types flags summaries')
+
+MonthSummary = namedtuple('MonthSummary', 'total_hours balance required work_days workdays_with_hours all_days_worked')
+
+def month_summary_from_totals(total_minutes, workdays_with_hours, work_days):
+    # 휴일/주말 근무는 그대로 더하고 근무일마다 8시간을 빼므로 balance = 합계 - 8시간 x 근무일 기록 수
+    balance = total_minutes - MINUTES_PER_DAY * workdays_with_hours
+    return MonthSummary(total_minutes / 60, balance / 60, work_days * 8, work_days, workdays_with_hours,
+                        workdays_with_hours == work_days)
+
+
+class YearData:
+    # 한 해치 기록을 일 순서(0 = 1월 1일) 배열로 들고 있는다. 1년에 약 3KB (하루 8바이트).
+    __slots__ = ('year', 'first_day', 'month_offsets', 'start_min', 'end_min', 'minutes',
+                 'work_types', 'flags', 'descriptions', 'loaded_mask')
+
+    def __init__(self, year):
+        self.year = year
+        self.first_day = datetime.date(year, 1, 1).toordinal()
+        size = datetime.date(year, 12, 31).toordinal() - self.first_day + 1
+        self.month_offsets = [datetime.date(year, month, 1).toordinal() - self.first_day
+                              for month in range(1, 13)] + [size]
+        self.start_min = array('H', bytes(2 * size))
+        self.end_min = array('H', bytes(2 * size))
+        self.minutes = array('h', bytes(2 * size))
+        self.work_types = array('B', bytes(size))  # WorkType 값
+        self.flags = array('B', (DAY_WEEKEND if (self.first_day + index - 1) % 7 >= 5 else 0
+                                 for index in range(size)))
+        self.descriptions = {}  # 휴일인 일 순서 -> 설명 (휴일만 있으므로 dict)
+        self.loaded_mask = 0  # 캐시에 올라온 달이면 (월 - 1)번째 비트가 1
+
+    def month_bounds(self, month):
+        return self.month_offsets[month - 1], self.month_offsets[month]
+
+    def index(self, month, day):
+        return self.month_offsets[month - 1] + day - 1
+
+    def is_month_loaded(self, month):
+        return bool(self.loaded_mask >> (month - 1) & 1)
+
+    def clear_month(self, month):
+        start, stop = self.month_bounds(month)
+        size = stop - start
+        self.start_min[start:stop] = array('H', bytes(2 * size))
+        self.end_min[start:stop] = array('H', bytes(2 * size))
+        self.minutes[start:stop] = array('h', bytes(2 * size))
+        self.work_types[start:stop] = array('B', bytes(size))
+        for index in range(start, stop):
+            self.flags[index] &= DAY_WEEKEND
+            self.descriptions.pop(index, None)
+
+    def fill_month(self, month, records, holidays):
+        # records/holidays: 'Select work hours/holidays in date range' 결과 그대로
+        self.clear_month(month)
+        for day, start_min, end_min, minutes, work_type in records:
+            self.set_entry(day - self.first_day, start_min, end_min, minutes, work_type)
+        for day, description in holidays:
+            self.set_holiday(day - self.first_day, description)
+
+    def set_entry(self, index, start_min, end_min, minutes, work_type):
+        self.start_min[index] = start_min
+        self.end_min[index] = end_min
+        self.minutes[index] = minutes
+        self.work_types[index] = WORK_TYPE_CODES.get(work_type, WorkType.NONE)
+        self.flags[index] |= DAY_RECORDED
+
+    def remove_entry(self, index):
+        self.start_min[index] = self.end_min[index] = self.minutes[index] = 0
+        self.work_types[index] = WorkType.NONE
+        self.flags[index] &= ~DAY_RECORDED
+
+    def set_holiday(self, index, description):
+        self.flags[index] |= DAY_HOLIDAY
+        self.descriptions[index] = description
+
+    def remove_holiday(self, index):
+        self.flags[index] &= ~DAY_HOLIDAY
+        self.descriptions.pop(index, None)
+
+    def month_totals(self, month):
+        # 한 달 구간을 잘라 합계와 근무일(주말/휴일이 아닌 날) 기록 수를 센다
+        start, stop = self.month_bounds(month)
+        workday_entries = sum(1 for flags in self.flags[start:stop]
+                              if flags & (DAY_RECORDED | DAY_WEEKEND | DAY_HOLIDAY) == DAY_RECORDED)
+        return sum(self.minutes[start:stop]), workday_entries
+
+    def day(self, month, day):
+        return DayView(self, self.index(month, day))
+
+    def month_days(self, month):
+        start, stop = self.month_bounds(month)
+        return [DayView(self, index) for index in range(start, stop)]
+
+    def nbytes(self):
+        arrays = (self.start_min, self.end_min, self.minutes, self.work_types, self.flags)
+        return sum(values.itemsize * len(values) for values in arrays)
+
+
+class DayView:
+    # YearData 배열의 하루를 가리키는 가벼운 뷰. 값은 복사하지 않고 읽을 때 배열에서 꺼낸다.
+    __slots__ = ('data', 'index')
+
+    def __init__(self, data, index):
+        self.data = data
+        self.index = index
+
+    @property
+    def date(self):
+        return datetime.date.fromordinal(self.data.first_day + self.index)
+
+    @property
+    def day(self):
+        return self.date.day
+
+    @property
+    def recorded(self):
+        return bool(self.data.flags[self.index] & DAY_RECORDED)
+
+    @property
+    def holiday(self):
+        return bool(self.data.flags[self.index] & DAY_HOLIDAY)
+
+    @property
+    def weekend(self):
+        return bool(self.data.flags[self.index] & DAY_WEEKEND)
+
+    @property
+    def off_day(self):
+        return bool(self.data.flags[self.index] & (DAY_HOLIDAY | DAY_WEEKEND))
+
+    @property
+    def minutes(self):
+        return self.data.minutes[self.index] if self.recorded else None
+
+    @property
+    def work_type(self):
+        return WorkType(self.data.work_types[self.index])
+
+    @property
+    def work_type_name(self):
+        code = self.data.work_types[self.index]
+        return WORK_TYPES[code - 1] if code else None
+
+    @property
+    def start_time(self):
+        return format_minutes(self.data.start_min[self.index]) if self.recorded else None
+
+    @property
+    def end_time(self):
+        return format_minutes(self.data.end_min[self.index]) if self.recorded else None
+
+    @property
+    def description(self):
+        return self.data.descriptions.get(self.index)
+
+
+class WorkHoursStore:
+    # 근무 기록/휴일/남은 연차를 다루는 Qt 없는 핵심 로직. 화면은 이 객체를 읽고 호출만 한다.
+
+    # 켜두면 캐시를 한 줄씩 갱신할 때마다 전체 재로딩 결과와 비교한다 (테스트/디버깅용)
+    verify_cache_enabled = os.environ.get('WORK_HOURS_VERIFY_CACHE') == '1'
+    external_change_limit = 1000  # 다른 프로세스가 이보다 많이 바꿨으면 한 줄씩 대신 올라온 달을 다시 읽는다
+
+    def __init__(self, db, max_cached_months=12):
+        self.db = db
+        self.max_cached_months = max(3, max_cached_months)  # 보이는 달과 앞뒤 달은 항상 남긴다
+        self.loaded_months = OrderedDict()  # (년, 월) LRU 순서
+        self.years = {}  # 년 -> YearData (캐시에 올라온 달이 하나라도 있는 해만)
+        self.workdays = WorkdayEngine(db)  # 달별 근무일 수 캐시 (휴일이 바뀔 때만 고친다)
+        self.year_days_cache = {}  # 년 -> YearDays
+        self.listeners = []  # 캐시가 바뀌면 인자 없이 호출된다
+        self.remaining_leave = self.load_remaining_leave()
+
+    def add_listener(self, callback):
+        self.listeners.append(callback)
+
+    def remove_listener(self, callback):
+        if callback in self.listeners:
+            self.listeners.remove(callback)
+
+    def notify(self):
+        for callback in self.listeners:
+            callback()
+
+    # --- 캐시 ---
+
+    def ensure_window(self, year, month):
+        for delta in (0, -1, 1):
+            self.ensure_month(*add_months(year, month, delta))
+
+    def ensure_month(self, year, month):
+        key = (year, month)
+        if key in self.loaded_months:
+            self.loaded_months.move_to_end(key)
+            return
+        self.load_month(year, month)
+        while len(self.loaded_months) > self.max_cached_months:
+            self.evict_month(*next(iter(self.loaded_months)))
+
+    def load_month(self, year, month):
+        data = self.years.get(year)
+        if data is None:
+            data = self.years[year] = YearData(year)
+        data.fill_month(month, *self.read_month(year, month))
+        data.loaded_mask |= 1 << (month - 1)
+        self.loaded_months[(year, month)] = True
+        self.notify()
+
+    def evict_month(self, year, month):
+        del self.loaded_months[(year, month)]
+        data = self.years[year]
+        data.clear_month(month)
+        data.loaded_mask &= ~(1 << (month - 1))
+        if not data.loaded_mask:
+            del self.years[year]
+        self.notify()
+
+    def reload_months(self, months):
+        for year, month in months:
+            self.year_days_cache.pop(year, None)
+            if (year, month) in self.loaded_months:
+                self.evict_month(year, month)
+                self.load_month(year, month)
+
+    def reload(self):
+        # 캐시에 올라와 있는 달만 DB에서 다시 읽는다
+        months = list(self.loaded_months)
+        self.clear_cache()
+        for year, month in months:
+            self.load_month(year, month)
+        self.remaining_leave = self.load_remaining_leave()
+
+    def read_month(self, year, month):
+        # 한 달치 근무 기록과 휴일을 DB 결과 그대로 읽는다
+        records = []
+        holidays = []
+        first, last = month_range(year, month)
+        try:
+            records = self.db.fetchall('Select work hours in date range', (first, last))
+            holidays = self.db.fetchall('Select holidays in date range', (first, last))
+        except sqlite3.Error as e:
+            print(f"Database error: {e}")
+        return records, holidays
+
+    def locate(self, date_str):
+        # 캐시에 올라온 달이면 (YearData, 일 순서), 아니면 None
+        year, month, day = split_date(date_str)
+        data = self.years.get(year)
+        if data is None or not data.is_month_loaded(month):
+            return None
+        return data, data.index(month, day)
+
+    def is_loaded(self, date_str):
+        return self.locate(date_str) is not None
+
+    def day(self, date_str):
+        location = self.locate(date_str)
+        return DayView(*location) if location else None
+
+    def month_days(self, year, month):
+        # 캐시에 올라온 달의 DayView 목록 (1일부터)
+        self.ensure_month(year, month)
+        return self.years[year].month_days(month)
+
+    def is_holiday(self, date_str):
+        view = self.day(date_str)
+        return view is not None and view.holiday
+
+    # DB에 한 줄을 쓴 직후 같은 변경을 캐시에만 반영한다 (전체 재로딩 대신)
+    # 캐시에 없는 달이면 나중에 DB에서 읽을 때 반영되므로 건너뛴다
+    def set_work_entry(self, date_str, start_min, end_min, minutes, work_type):
+        self.year_days_cache.pop(int(date_str[:4]), None)
+        location = self.locate(date_str)
+        if location is None:
+            return
+        data, index = location
+        data.set_entry(index, start_min, end_min, minutes, work_type)
+        self.notify()
+        self.check_cache()
+
+    def remove_work_entry(self, date_str):
+        self.year_days_cache.pop(int(date_str[:4]), None)
+        location = self.locate(date_str)
+        if location is None:
+            return
+        data, index = location
+        data.remove_entry(index)
+        self.notify()
+        self.check_cache()
+
+    def set_work_entries(self, db_rows):
+        # 여러 줄을 캐시에 반영하고 리스너는 한 번만 부른다. db_rows: entry_row() 결과 또는 (day,) (삭제)
+        touched = False
+        for row in db_rows:
+            date_str = ordinal_date(row[0])
+            self.year_days_cache.pop(int(date_str[:4]), None)
+            location = self.locate(date_str)
+            if location is None:
+                continue
+            data, index = location
+            if len(row) == 1:
+                data.remove_entry(index)
+            else:
+                data.set_entry(index, row[1], row[2], row[4], row[5])
+            touched = True
+        if touched:
+            self.notify()
+            self.check_cache()
+
+    def add_holiday_date(self, date_str, description):
+        self.workdays.set_holiday(date_str, True)
+        self.year_days_cache.pop(int(date_str[:4]), None)
+        location = self.locate(date_str)
+        if location is None:
+            return
+        data, index = location
+        data.set_holiday(index, description)
+        self.notify()
+        self.check_cache()
+
+    def add_holiday_dates(self, rows):
+        # add_holiday_date를 여러 번 부르는 것과 같지만 리스너는 한 번만 부른다. rows: (날짜, 설명)
+        for date_str, description in rows:
+            self.workdays.set_holiday(date_str, True)
+            self.year_days_cache.pop(int(date_str[:4]), None)
+            location = self.locate(date_str)
+            if location is not None:
+                location[0].set_holiday(location[1], description)
+        if rows:
+            self.notify()
+            self.check_cache()
+
+    def remove_holiday_date(self, date_str):
+        self.workdays.set_holiday(date_str, False)
+        self.year_days_cache.pop(int(date_str[:4]), None)
+        location = self.locate(date_str)
+        if location is None:
+            return
+        data, index = location
+        data.remove_holiday(index)
+        self.notify()
+        self.check_cache()
+
+    # 다른 프로세스(가져오기 스크립트, cli.py sync, 다른 창)가 커밋한 변경을 캐시에 반영한다
+    def changelog_mark(self):
+        # (reset 세대, 지금까지 커밋된 변경의 가장 큰 seq). seq는 AUTOINCREMENT라 reset 뒤에도 줄지 않으므로
+        # reset이 올리는 세대로 알아본다.
+        try:
+            return tuple(self.db.fetchone('Select changelog mark'))
+        except sqlite3.Error as e:
+            print(f"Database error: {e}")
+            return (0, 0)
+
+    def apply_external_changes(self, since):
+        # 지난번 changelog_mark() 뒤로 바뀐 근무/휴일 중 캐시와 다른 날만 고친다. (새 기준, 캐시나 남은 연차가 바뀌었는지)
+        # 이 창이 쓴 줄은 캐시와 같으므로 건너뛴다. 쓰기 스레드에 커밋 전 쓰기가 남아 있을 때는 부르지 않는다.
+        mark = self.changelog_mark()
+        generation, since_seq = since
+        try:
+            rows = self.db.fetchall('Select changed days after', (since_seq, self.external_change_limit + 1))
+        except sqlite3.Error as e:
+            print(f"Database error: {e}")
+            return since, False
+        if mark[0] != generation or len(rows) > self.external_change_limit:
+            # 다른 프로세스가 reset했거나(지운 줄은 changelog에 남지 않는다) 한꺼번에 많이 바뀌었다
+            self.reload()
+            return mark, True
+        changed = False
+        for table, day, deleted, start_min, end_min, break_min, minutes, work_type, description in rows:
+            date_str = ordinal_date(day)
+            view = self.day(date_str)
+            if table == 'work_hours':
+                if view is None:
+                    changed = True  # 캐시에 없는 달은 연간 요약 캐시만 버린다
+                elif deleted:
+                    if not view.recorded:
+                        continue
+                    view.data.remove_entry(view.index)
+                    changed = True
+                elif (not view.recorded or view.start_time != format_minutes(start_min)
+                      or view.end_time != format_minutes(end_min) or view.minutes != minutes
+                      or view.work_type_name != work_type):
+                    view.data.set_entry(view.index, start_min, end_min, minutes, work_type)
+                    changed = True
+                else:
+                    continue
+            elif deleted:
+                if view is not None and not view.holiday:
+                    continue
+                self.workdays.set_holiday(date_str, False)
+                if view is not None:
+                    view.data.remove_holiday(view.index)
+                changed = True
+            else:
+                if view is not None and view.holiday and view.description == description:
+                    continue
+                self.workdays.set_holiday(date_str, True)
+                if view is not None:
+                    view.data.set_holiday(view.index, description)
+                changed = True
+            self.year_days_cache.pop(int(date_str[:4]), None)
+        if changed:
+            self.notify()
+            self.check_cache()  # 모두 반영한 뒤에 한 번만 (근무와 휴일이 함께 바뀌었을 수 있다)
+        remaining_leave = self.load_remaining_leave()  # 연차 원장은 changelog에 없으므로 잔액을 다시 읽는다
+        changed = changed or remaining_leave != self.remaining_leave
+        self.remaining_leave = remaining_leave
+        return mark, changed
+
+    def clear_cache(self):
+        self.loaded_months.clear()
+        self.years.clear()
+        self.year_days_cache.clear()
+        self.workdays.clear()
+        self.notify()
+
+    def verify_cache(self):
+        # 증분 갱신된 캐시와 (캐시에 올라온 달들의) 전체 재로딩 결과가 다른 (배열 이름, 날짜) 목록을 돌려준다
+        mismatches = []
+        fresh_years = {}
+        for year, month in self.loaded_months:
+            fresh = fresh_years.get(year)
+            if fresh is None:
+                fresh = fresh_years[year] = YearData(year)
+            fresh.fill_month(month, *self.read_month(year, month))
+            cached = self.years.get(year)
+            if cached is None or not cached.is_month_loaded(month):
+                mismatches.append(('loaded_mask', f"{year:04}-{month:02}"))
+                continue
+            start, stop = cached.month_bounds(month)
+            for name in ('start_min', 'end_min', 'minutes', 'work_types', 'flags'):
+                cached_values = getattr(cached, name)
+                fresh_values = getattr(fresh, name)
+                for index in range(start, stop):
+                    if cached_values[index] != fresh_values[index]:
+                        mismatches.append((name, ordinal_date(cached.first_day + index)))
+            for index in range(start, stop):
+                if cached.descriptions.get(index) != fresh.descriptions.get(index):
+                    mismatches.append(('descriptions', ordinal_date(cached.first_day + index)))
+        for year, data in self.years.items():
+            for month in range(1, 13):
+                if data.is_month_loaded(month) != ((year, month) in self.loaded_months):
+                    mismatches.append(('loaded_mask', f"{year:04}-{month:02}"))
+        return mismatches
+
+    def check_cache(self):
+        if self.verify_cache_enabled:
+            mismatches = self.verify_cache()
+            assert not mismatches, f"Calendar cache out of sync: {mismatches}"
+
+    # --- 조회 ---
+
+    def month_summary(self, year, month):
+        data = self.years.get(year)
+        if data is not None and data.is_month_loaded(month):
+            total_minutes, workday_entries = data.month_totals(month)
+            return month_summary_from_totals(total_minutes, workday_entries, self.workdays.workdays_in_month(year, month))
+        # 캐시 밖의 달은 보이는 달이 밀려나지 않도록 캐시에 올리지 않고 monthly_summary 한 줄만 읽는다
+        row = None
+        try:
+            row = self.db.fetchone('Select monthly summary', (year, month))
+        except sqlite3.Error as e:
+            print(f"Database error: {e}")
+        return self.summary_from_row(year, month, row)
+
+    def summary_from_row(self, year, month, row):
+        total_minutes, workday_entries, weekday_holidays = row or (0, 0, 0)
+        weekdays = count_weekdays(datetime.date(year, month, 1), month_end(year, month))
+        return month_summary_from_totals(total_minutes, workday_entries, weekdays - weekday_holidays)
+
+    def year_summaries(self, year):
+        # 한 해 12달 요약. 캐시에 올라온 달은 캐시(아직 커밋 전인 변경 포함)로, 나머지는 monthly_summary 로.
+        rows = {}
+        try:
+            rows = {month: row for month, *row in
+                    self.db.fetchall('Select monthly summaries for year', (year,), sync=False)}
+        except sqlite3.Error as e:
+            print(f"Database error: {e}")
+        return [self.month_summary(year, month) if (year, month) in self.loaded_months
+                else self.summary_from_row(year, month, rows.get(month))
+                for month in range(1, 13)]
+
+    def year_days(self, year):
+        days = self.year_days_cache.get(year)
+        if days is None:
+            days = self.year_days_cache[year] = self.read_year_days(year)
+        return days
+
+    def read_year_days(self, year):
+        # 한 해치를 범위 쿼리 두 번으로 채운 뒤, 캐시에 올라온 달은 캐시 배열(커밋 전 변경 포함)을 잘라 덮는다
+        days = YearData(year)
+        first = days.first_day
+        last = first + len(days.flags) - 1
+        records = holidays = []
+        try:
+            records = self.db.fetchall('Select work hours in date range', (first, last), sync=False)
+            holidays = self.db.fetchall('Select holidays in date range', (first, last), sync=False)
+        except sqlite3.Error as e:
+            print(f"Database error: {e}")
+        for day, start_min, end_min, minutes, work_type in records:
+            days.set_entry(day - first, start_min, end_min, minutes, work_type)
+        for day, description in holidays:
+            days.set_holiday(day - first, description)
+        cached = self.years.get(year)
+        if cached is not None:
+            for month in range(1, 13):
+                if cached.is_month_loaded(month):
+                    start, stop = cached.month_bounds(month)
+                    for name in ('minutes', 'work_types', 'flags'):
+                        getattr(days, name)[start:stop] = getattr(cached, name)[start:stop]
+        return YearDays(year, first, days.minutes, days.work_types, days.flags, self.year_summaries(year))
+
+    def verify_monthly_summary(self):
+        # 트리거가 관리한 monthly_summary 와 원본 테이블에서 새로 계산한 값이 다른 달 목록
+        self.db.sync()
+        stored = {(year, month): tuple(row) for year, month, *row in self.db.fetchall('Select all monthly summaries')}
+        fresh = {(year, month): tuple(row) for year, month, *row in self.db.fetchall('Compute monthly summary')}
+        empty = (0, 0, 0, 0)
+        return [(key, stored.get(key, empty), fresh.get(key, empty))
+                for key in sorted(stored.keys() | fresh.keys())
+                if stored.get(key, empty) != fresh.get(key, empty)]
+
+    def rebuild_monthly_summary(self):
+        self.db.sync()
+        with self.db.transaction():
+            self.db.execute('Clear monthly summary')
+            self.db.execute('Rebuild monthly summary')
+
+    # 캐시에 올라온 달은 캐시에서 답한다. 백그라운드 writer가 아직 커밋하지 않은 변경도 캐시에는 이미 들어 있다.
+    def get_entry(self, date_str):
+        view = self.day(date_str)
+        if view is not None:
+            if not view.recorded:
+                return None, None, None
+            return view.start_time, view.end_time, view.work_type_name
+        result = self.db.fetchone('Select work hours for a specific date', (day_ordinal(date_str),))
+        if not result:
+            return None, None, None
+        start_min, end_min, work_type = result
+        return format_minutes(start_min), format_minutes(end_min), work_type
+
+    def holiday_description(self, date_str):
+        view = self.day(date_str)
+        if view is not None:
+            return view.description
+        result = self.db.fetchone('Select holiday description for a specific date', (day_ordinal(date_str),))
+        return result[0] if result else None
+
+    def load_remaining_leave(self):
+        # 연차 원장의 마지막 항목 잔액 (인덱스로 한 줄만 읽는다)
+        try:
+            result = self.db.fetchone('Select leave balance')
+            if result:
+                return float(result[0])
+            else:
+                return 0.0
+        except sqlite3.Error as e:
+            print(f"Database error: {e}")
+            return 0.0
+
+    def leave_balance_on(self, date_str):
+        # 그 근무일까지의 항목 기준 잔액 (언제 입력했는지가 아니라 항목의 날짜 기준)
+        try:
+            result = self.db.fetchone('Select leave balance at date', (day_ordinal(date_str),))
+        except sqlite3.Error as e:
+            print(f"Database error: {e}")
+            return None
+        return result[0] if result else 0.0
+
+    def leave_entries(self):
+        return self.db.fetchall('Select leave entries')
+
+    def replay_leave_ledger(self):
+        # 감사용: 원장을 (근무일, seq) 순서로 다시 더해 저장된 잔액과 다른 항목 번호를 모은다
+        balance = 0.0
+        mismatches = []
+        for seq, _, _, _, amount, stored, _ in self.leave_entries():
+            balance += amount
+            if abs(balance - stored) > 1e-9:
+                mismatches.append(seq)
+        return balance, mismatches
+
+    # --- 변경 (DB 쓰기 + 캐시 반영 + 연차 계산) ---
+    # db.write()는 백그라운드 writer가 붙어 있으면 큐에 넣고 바로 돌아오므로 캐시를 먼저(낙관적으로) 고친다.
+    # 쓰기가 실패하면 화면 쪽에서 reload()로 DB 상태로 되돌린다.
+
+    def record_leave(self, entries):
+        # entries: (날짜, 종류, 일수, 메모) 목록. 원장에 덧붙이고 메모리 잔액도 같은 순서로 더한다.
+        # 잔액은 (근무일, seq) 순서로 쌓이므로 날짜가 없는 항목은 받지 않는다.
+        if any(not date_str for date_str, *_ in entries):
+            raise ValueError("leave entry without a date")
+        entries = [(day_ordinal(date_str), kind, amount, note) for date_str, kind, amount, note in entries if amount]
+        if not entries:
+            return
+        for entry in entries:
+            self.remaining_leave += entry[2]
+        try:
+            self.db.write('Insert leave entry', entries, many=True)
+        except sqlite3.Error as e:
+            print(f"Database error: {e}")
+
+    def set_remaining_leave(self, remaining_leave):
+        # 설정 화면에서 잔액을 직접 바꾸면 차이만큼 'set' 항목을 남긴다
+        self.apply_leave_adjustment(self.leave_adjustment_total() + float(remaining_leave) - self.remaining_leave)
+
+    def leave_adjustment_total(self):
+        try:
+            return float(self.db.fetchone('Select leave adjustment total')[0])
+        except sqlite3.Error as e:
+            print(f"Database error: {e}")
+            return 0.0
+
+    def apply_leave_adjustment(self, total, note=None):
+        # 'set' 항목의 합이 total이 되도록 차이만큼 남기고 합계를 settings에도 쓴다.
+        # 나머지 항목은 기기마다 같은 근무 기록에서 다시 계산되므로, 동기화로 이 합계를 맞추면 잔액도 같아진다.
+        diff = float(total) - self.leave_adjustment_total()
+        if diff:
+            self.record_leave([(datetime.date.today().isoformat(), 'set', diff, note)])  # 바꾼 날 기준
+        value = repr(float(total))
+        try:
+            if self.db.fetchone('Select setting', (LEAVE_ADJUSTMENT_KEY,)) != (value,):
+                self.db.write('Insert or replace setting', (LEAVE_ADJUSTMENT_KEY, value))
+        except sqlite3.Error as e:
+            print(f"Database error: {e}")
+
+    def adjust_remaining_leave(self, work_type, undo=False, date_str=None):
+        if work_type == "increment":
+            kind = 'earned'  # 한 달을 다 채워서 생긴 연차
+        elif work_type == "decrement":
+            kind = 'forfeit'
+        else:
+            kind = 'taken' if undo else 'refund'
+        date_str = date_str or datetime.date.today().isoformat()
+        self.record_leave([(date_str, kind, leave_adjustment(work_type, undo), work_type)])
+
+    def month_completed(self, year, month):
+        # 그 달의 모든 근무일에 근무시간이 있고 여유 시간이 음수가 아닌지
+        summary = self.month_summary(year, month)
+        return summary.all_days_worked and summary.balance >= 0
+
+    def month_grants(self, months, date_str=None, earned_note="increment", forfeit_note="decrement"):
+        # 다 채운 달마다 연차 1일. 그 달의 'earned'/'forfeit' 합이 지금 상태(다 채웠으면 1, 아니면 0)가 되도록
+        # 차이만 항목으로 돌려준다. 같은 날을 다시 저장하거나 기기마다 편집 순서가 달라도 잔액이 같다.
+        # date_str: 항목 날짜 (없으면 그 달 1일)
+        entries = []
+        for year, month in months:
+            first = datetime.date(year, month, 1)
+            last = month_end(year, month)
+            try:
+                granted = self.db.fetchone('Select month leave grant', (first.toordinal(), last.toordinal()))[0]
+            except sqlite3.Error as e:
+                print(f"Database error: {e}")
+                continue
+            diff = int(self.month_completed(year, month)) - granted
+            if diff > 0:
+                entries.append((date_str or first.isoformat(), 'earned', diff, earned_note))
+            elif diff < 0:
+                entries.append((date_str or first.isoformat(), 'forfeit', diff, forfeit_note))
+        return entries
+
+    def save_entry(self, date_str, start_time, end_time, work_type):
+        previous_work_type = self.get_entry(date_str)[2]
+        self.adjust_remaining_leave(previous_work_type, undo=False, date_str=date_str)  # 이전 근무 타입에 따른 남은 휴가 복원
+
+        row = entry_row(date_str, start_time, end_time, work_type)
+        self.db.write('Insert or replace work hours', row)
+        self.set_work_entry(date_str, *row[1:3], row[4], work_type)
+
+        # balance와 모든 근무일에 근무시간이 등록되었는지 확인
+        self.record_leave(self.month_grants([split_date(date_str)[:2]], date_str))
+
+        self.adjust_remaining_leave(work_type, undo=True, date_str=date_str)  # 새 근무 타입에 따른 남은 휴가 반영
+
+    def delete_entry(self, date_str):
+        previous_work_type = self.get_entry(date_str)[2]
+        self.db.write('Delete work hours', (day_ordinal(date_str),))
+        self.remove_work_entry(date_str)
+
+        # 지운 뒤 상태에서 balance와 모든 근무일에 근무시간이 등록되었는지 확인
+        self.record_leave(self.month_grants([split_date(date_str)[:2]], date_str))
+
+        self.adjust_remaining_leave(previous_work_type, undo=False, date_str=date_str)  # 이전 근무 타입에 따른 남은 휴가 복원
+
+    def add_holiday(self, date_str, description):
+        self.db.write('Insert or replace holiday', (day_ordinal(date_str), description))
+        self.add_holiday_date(date_str, description)
+
+        # 휴일 추가 후 상태에서 balance와 모든 근무일에 근무시간이 등록되었는지 확인
+        self.record_leave(self.month_grants([split_date(date_str)[:2]], date_str))
+
+    def remove_holiday(self, date_str):
+        self.db.write('Delete holiday', (day_ordinal(date_str),))
+        self.remove_holiday_date(date_str)
+
+        # 휴일 삭제 후 상태에서 balance와 모든 근무일에 근무시간이 등록되었는지 확인
+        self.record_leave(self.month_grants([split_date(date_str)[:2]], date_str))
+
+    def import_entries(self, rows, note='import'):
+        # rows: (date, start_time, end_time, work_type) 목록. 한 트랜잭션으로 쓰고 캐시와 연차는 마지막에 한 번만 갱신한다.
+        # note: 새로 다 채운 달에 생긴 연차('earned') 항목에 남길 메모 (어디서 바뀌었는지 감사용)
+        rows = list({row[0]: row for row in rows}.values())  # 같은 날짜가 여러 번 나오면 마지막 줄 기준
+        if not rows:
+            return 0
+        months = sorted({split_date(row[0])[:2] for row in rows})
+        db_rows = [entry_row(*row) for row in rows]
+        first = min(row[0] for row in db_rows)
+        last = max(row[0] for row in db_rows)
+        previous_types = {ordinal_date(day): work_type for day, _, _, _, work_type in
+                          self.db.fetchall('Select work hours in date range', (first, last))}
+
+        self.db.write('Insert or replace work hours', db_rows, many=True)
+        self.set_work_entries(db_rows)
+
+        # 이전 근무 타입만큼 돌려받고 새 근무 타입만큼 차감, 달마다 다 채웠는지에 맞춰 1일 추가/회수
+        entries = []
+        for date, _, _, work_type in rows:
+            previous_type = previous_types.get(date)
+            entries.append((date, 'refund', leave_adjustment(previous_type), previous_type))
+            entries.append((date, 'taken', leave_adjustment(work_type, undo=True), work_type))
+        entries.extend(self.month_grants(months, earned_note=note, forfeit_note=note))
+        self.record_leave(entries)
+        return len(rows)
+
+    def import_holidays(self, rows):
+        # rows: (날짜, 설명). DB에 같은 설명으로 이미 있는 날짜는 건너뛰고 나머지를 한 트랜잭션으로 넣는다.
+        rows = list({date: (date, description) for date, description in rows}.values())
+        if not rows:
+            return 0
+        days = [day_ordinal(date) for date, _ in rows]
+        existing = dict(self.db.fetchall('Select holidays in date range', (min(days), max(days))))
+        rows = [(date, description) for day, (date, description) in zip(days, rows)
+                if existing.get(day) != description]
+        if not rows:
+            return 0
+        months = sorted({split_date(date)[:2] for date, _ in rows})
+
+        self.db.write('Insert or replace holiday', [(day_ordinal(date), description) for date, description in rows],
+                      many=True)
+        self.add_holiday_dates(rows)
+
+        # 휴일이 늘어 새로 다 채운 달마다 1일 추가 (add_holiday와 같은 규칙)
+        self.record_leave(self.month_grants(months, earned_note='holiday import', forfeit_note='holiday import'))
+        return len(rows)
+
+    def range_workdays(self, first_date, last_date):
+        # 두 날짜 사이(양 끝 포함)에서 주말과 휴일을 뺀 날짜 목록
+        first = day_ordinal(min(first_date, last_date))
+        last = day_ordinal(max(first_date, last_date))
+        holidays = {day for day, _ in self.db.fetchall('Select holidays in date range', (first, last))}
+        return [ordinal_date(day) for day in range(first, last + 1)
+                if (day - 1) % 7 < 5 and day not in holidays]
+
+    def save_range(self, first_date, last_date, start_time, end_time, work_type):
+        # 범위의 근무일마다 같은 근무를 등록한다. 한 트랜잭션으로 쓰고 연차는 범위 전체에 대해 한 번만 계산한다.
+        dates = self.range_workdays(first_date, last_date)
+        return self.import_entries([(date, start_time, end_time, work_type) for date in dates], note='range save')
+
+    def delete_range(self, first_date, last_date):
+        # 범위의 근무일 기록을 지운다. 다 채웠던 달이 비게 되면 그 달마다 1일을 돌려놓는다.
+        dates = set(self.range_workdays(first_date, last_date))
+        first = day_ordinal(min(first_date, last_date))
+        last = day_ordinal(max(first_date, last_date))
+        previous_types = {ordinal_date(day): work_type for day, _, _, _, work_type in
+                          self.db.fetchall('Select work hours in date range', (first, last))
+                          if ordinal_date(day) in dates}
+        if not previous_types:
+            return 0
+        months = sorted({split_date(date)[:2] for date in previous_types})
+        db_rows = [(day_ordinal(date),) for date in sorted(previous_types)]
+
+        self.db.write('Delete work hours', db_rows, many=True)
+        self.set_work_entries(db_rows)
+
+        entries = self.month_grants(months, earned_note='range delete', forfeit_note='range delete')
+        for date, work_type in sorted(previous_types.items()):
+            entries.append((date, 'refund', leave_adjustment(work_type), work_type))
+        self.record_leave(entries)
+        return len(db_rows)
+
+    def reset(self):
+        self.db.sync()
+        with self.db.transaction():
+            self.db.execute('Drop work_hours table')
+            self.db.execute('Drop holidays table')
+            self.db.execute('Drop monthly summary table')
+            self.db.execute('Drop leave ledger table')
+            self.db.execute('Drop settings table')
+            # 동기화 기록도 비운다. 다음 동기화 때 다른 기기의 변경을 처음부터 다시 받는다.
+            self.db.execute('Clear changelog')
+            self.db.execute('Clear sync watermarks')
+            self.db.execute('Bump reset generation')  # 같은 DB를 보는 다른 프로세스가 캐시를 통째로 다시 읽도록
+        self.db.create_tables()
+        self.clear_cache()
+        self.remaining_leave = 0.0
@@ -0,0 +1,330 @@
+import os
+import sqlite3
+from urllib.request import pathname2url
+
+from perf import PERF
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+QUERIES_PATH = os.path.join(BASE_DIR, 'queries.sql')
+DB_PATH = os.path.join(BASE_DIR, 'work_hours.db')
+
+# WAL은 -shm 공유 메모리 인덱스를 한 컴퓨터 안에서만 나눠 쓸 수 있다. SMB/NFS 네트워크 드라이브에서도
+# SQLite는 오류 없이 WAL을 켜지만, 여러 PC가 같은 파일을 열면 서로의 쓰기를 못 보거나 DB가 깨질 수 있다.
+# 그런 설치에서는 WORK_HOURS_JOURNAL_MODE=DELETE(또는 TRUNCATE)로 롤백 저널을 쓴다.
+# 설정하지 않으면 UNC 경로(\\server\share\...)만 DELETE, 나머지는 WAL이다.
+JOURNAL_MODES = ('WAL', 'DELETE', 'TRUNCATE', 'PERSIST')
+
+
+def default_journal_mode(path):
+    mode = os.environ.get('WORK_HOURS_JOURNAL_MODE', '').strip().upper()
+    if mode:
+        return mode
+    return 'DELETE' if os.fspath(path).startswith(('\\\\', '//')) else 'WAL'
+
+
+# PRAGMA user_version 으로 관리하는 스키마 버전과 버전별로 이어 붙여 실행할 queries.sql 항목들
+SCHEMA_VERSION = 7
+MIGRATIONS = {
+    1: ('Migrate v1: integer day and minute columns',),
+    2: ('Migrate v2: leave ledger',),
+    3: ('Create monthly summary table',
+        'Create monthly summary work insert trigger',
+        'Create monthly summary work update trigger',
+        'Create monthly summary work delete trigger',
+        'Create monthly summary holiday insert trigger',
+        'Create monthly summary holiday delete trigger',
+        'Create monthly summary source view',
+        'Rebuild monthly summary'),
+    4: ('Create changelog table',
+        'Create changelog work insert trigger',
+        'Create changelog work update trigger',
+        'Create changelog work delete trigger',
+        'Create changelog holiday insert trigger',
+        'Create changelog holiday update trigger',
+        'Create changelog holiday delete trigger',
+        'Create changelog setting insert trigger',
+        'Create changelog setting update trigger',
+        'Create changelog setting delete trigger',
+        'Create sync state table',
+        'Migrate v4: seed changelog'),
+    5: ('Migrate v5: leave ledger by work day',
+        'Create leave ledger balance trigger',
+        'Create leave ledger day index',
+        'Migrate v5: recompute leave balances'),
+    6: ('Migrate v6: leave ledger day not null',
+        'Create leave ledger balance trigger',
+        'Create leave ledger day index',
+        'Migrate v5: recompute leave balances'),
+    7: ('Create monthly summary source view',),
+}
+
+
+class QueryError(sqlite3.Error):
+    pass
+
+
+def parse_queries(text):
+    # '-- 이름' 주석 줄부터 다음 주석 줄 전까지를 하나의 쿼리로 본다
+    queries = {}
+    name = None
+    body = []
+
+    def flush():
+        sql = '\n'.join(body).strip()
+        if sql.endswith(';'):
+            sql = sql[:-1].rstrip()
+        if not sql:
+            raise QueryError(f"Empty query: {name}")
+        if name in queries:
+            raise QueryError(f"Duplicate query name: {name}")
+        queries[name] = sql
+
+    for line in text.splitlines():
+        if line.startswith('--'):
+            if name is not None:
+                flush()
+            name = line.strip().lstrip('- ')
+            body = []
+        elif name is not None:
+            body.append(line)
+    if name is not None:
+        flush()
+    return queries
+
+
+class QueryRegistry:
+    def __init__(self, queries):
+        self.queries = queries
+
+    @classmethod
+    def from_file(cls, path=QUERIES_PATH):
+        with open(path, 'r', encoding='utf-8') as file:
+            registry = cls(parse_queries(file.read()))
+        registry.validate()
+        return registry
+
+    def __getitem__(self, name):
+        try:
+            return self.queries[name]
+        except KeyError:
+            raise QueryError(f"Unknown query: {name}") from None
+
+    def __contains__(self, name):
+        return name in self.queries
+
+    def names(self):
+        return list(self.queries)
+
+    def validate(self):
+        # 빈 메모리 DB에 스키마를 만든 뒤 나머지 쿼리를 EXPLAIN 으로 컴파일만 해본다
+        # 마이그레이션 스크립트는 이전 스키마를 대상으로 하므로 문장이 끝나는지만 확인한다
+        conn = sqlite3.connect(':memory:')
+        try:
+            scripts = {name for name in self.queries if name.startswith('Migrate')}
+            for name in scripts:
+                if not sqlite3.complete_statement(self[name] + ';'):
+                    raise QueryError(f"{name}: incomplete script")
+            ddl = {name: sql for name, sql in self.queries.items()
+                   if sql.upper().startswith('CREATE') and name not in scripts}
+            for name, sql in ddl.items():
+                try:
+                    conn.execute(sql)
+                except sqlite3.Error as e:
+                    raise QueryError(f"{name}: {e}") from e
+            for name, sql in self.queries.items():
+                if name in ddl or name in scripts:
+                    continue
+                try:
+                    conn.execute('EXPLAIN ' + sql, (None,) * sql.count('?'))
+                except sqlite3.Error as e:
+                    raise QueryError(f"{name}: {e}") from e
+        finally:
+            conn.close()
+
+
+# 시작할 때 한 번만 파싱/검증한다. 같은 문자열 객체를 돌려주므로
+# sqlite3 연결의 prepared statement 캐시도 그대로 재사용된다.
+QUERIES = QueryRegistry.from_file()
+
+
+def load_query(query_name):
+    return QUERIES[query_name]
+
+
+class Database:
+    # 앱 전체가 공유하는 장수명 연결. 백그라운드 스레드는 connect()로 같은 설정의 연결을 따로 연다.
+    def __init__(self, path=DB_PATH, journal_mode=None, cache_kib=8192, read_only=False):
+        self.path = path
+        self.journal_mode = (journal_mode or default_journal_mode(path)).upper()
+        if self.journal_mode not in JOURNAL_MODES:
+            raise ValueError(f"Unknown journal mode {self.journal_mode!r} (choose one of {', '.join(JOURNAL_MODES)})")
+        self.cache_kib = cache_kib
+        self.read_only = read_only  # 다른 사람의 DB를 읽기만 할 때 (디스크의 파일은 바꾸지 않는다)
+        self.writer = None  # BackgroundWriter를 붙이면 write()가 그쪽 큐로 간다
+        self.created_files = []  # 읽기 전용으로 열면서 SQLite가 새로 만든 -wal/-shm (close에서 지운다)
+        self.conn = self.connect()
+        if read_only:
+            version = self.schema_version()
+            if version > SCHEMA_VERSION:
+                self.close()
+                raise QueryError(f"{path}: schema version {version} is newer than this app ({SCHEMA_VERSION})")
+            if version < SCHEMA_VERSION:
+                self.upgrade_in_memory()
+            return
+        self.migrate()
+        self.create_tables()
+
+    def upgrade_in_memory(self):
+        # 예전 버전 파일은 메모리 DB로 복사해 거기서 마이그레이션한다
+        memory = sqlite3.connect(':memory:', cached_statements=len(QUERIES.names()) + 16)
+        try:
+            self.conn.backup(memory)
+        except sqlite3.Error:
+            memory.close()
+            raise
+        finally:
+            self.close()
+        self.conn = memory
+        self.migrate()
+        self.create_tables()
+
+    def connect_read_only(self):
+        # -wal/-journal이 없으면 쓰는 프로그램이 없으므로 immutable로 열어 옆에 -wal/-shm을 만들지 않는다.
+        # 앱이 쓰고 있는 WAL 파일은 mode=ro로 열어야 -wal에만 있는 커밋까지 보인다.
+        # -shm을 만들 수 없는 곳(읽기 전용 공유 폴더 등)이면 immutable로 다시 연다.
+        uri = 'file:' + pathname2url(os.path.abspath(self.path))
+        live = any(os.path.exists(self.path + suffix) for suffix in ('-wal', '-journal'))
+        self.created_files = [self.path + suffix for suffix in ('-wal', '-shm')
+                              if live and not os.path.exists(self.path + suffix)]
+        for suffix in ('?mode=ro', '?mode=ro&immutable=1') if live else ('?mode=ro&immutable=1',):
+            conn = sqlite3.connect(uri + suffix, uri=True, cached_statements=len(QUERIES.names()) + 16)
+            try:
+                conn.execute("PRAGMA user_version").fetchone()
+                return conn
+            except sqlite3.OperationalError:
+                conn.close()
+                if suffix.endswith('immutable=1'):
+                    raise
+
+    def connect(self):
+        if self.read_only:
+            conn = self.connect_read_only()
+            conn.execute(f"PRAGMA cache_size = -{int(self.cache_kib)}")
+            return conn
+        conn = sqlite3.connect(self.path, cached_statements=len(QUERIES.names()) + 16)
+        # 다른 연결이 열려 있어 모드를 바꿀 수 없으면 SQLite는 오류 없이 지금 모드를 돌려준다.
+        # 네트워크 드라이브인지는 SQLite가 알려주지 않으므로 모드는 위의 default_journal_mode로 고른다.
+        conn.execute(f"PRAGMA journal_mode = {self.journal_mode}")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute(f"PRAGMA cache_size = -{int(self.cache_kib)}")
+        conn.execute("PRAGMA temp_store = MEMORY")
+        return conn
+
+    def schema_version(self):
+        return self.conn.execute("PRAGMA user_version").fetchone()[0]
+
+    def migrate(self):
+        # 버전 0은 두 가지다: 빈 파일(새 스키마를 바로 만든다)과 'HH:MM' 텍스트를 쓰던 예전 DB
+        version = self.schema_version()
+        if version >= SCHEMA_VERSION:
+            return
+        columns = [row[1] for row in self.conn.execute("PRAGMA table_info(work_hours)")]
+        if version == 0 and 'date' not in columns:
+            self.create_tables()
+            self.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            return
+        for target in range(version + 1, SCHEMA_VERSION + 1):
+            # 스크립트 하나와 버전 표시를 한 트랜잭션으로 묶어 중간에 실패하면 통째로 되돌린다
+            body = ''.join(f"{load_query(name)};\n" for name in MIGRATIONS[target])
+            script = f"BEGIN;\n{body}PRAGMA user_version = {target};\nCOMMIT;"
+            try:
+                self.conn.executescript(script)
+            except sqlite3.Error as e:
+                if self.conn.in_transaction:
+                    self.conn.rollback()
+                raise QueryError(f"Migration to schema version {target} failed: {e}") from e
+
+    def create_tables(self):
+        # 'Create ...' 항목을 queries.sql 순서대로 (테이블 다음에 트리거/인덱스)
+        with self.conn:
+            for query_name in QUERIES.names():
+                if query_name.startswith('Create'):
+                    self.conn.execute(load_query(query_name))
+
+    def execute(self, query_name, params=()):
+        if PERF.enabled:
+            with PERF.timer('sql', query_name):
+                return self.conn.execute(load_query(query_name), params)
+        return self.conn.execute(load_query(query_name), params)
+
+    def executemany(self, query_name, seq_of_params):
+        if PERF.enabled:
+            with PERF.timer('sql', query_name):
+                return self.conn.executemany(load_query(query_name), seq_of_params)
+        return self.conn.executemany(load_query(query_name), seq_of_params)
+
+    def fetchone(self, query_name, params=()):
+        self.sync()
+        if PERF.enabled:
+            with PERF.timer('sql', query_name):  # 결과를 읽는 시간까지
+                return self.conn.execute(load_query(query_name), params).fetchone()
+        return self.conn.execute(load_query(query_name), params).fetchone()
+
+    def fetchall(self, query_name, params=(), sync=True):
+        # sync=False는 아직 커밋되지 않은 쓰기를 기다리지 않는다 (캐시로 덮어쓸 값을 읽을 때)
+        if sync:
+            self.sync()
+        if PERF.enabled:
+            with PERF.timer('sql', query_name):
+                return self.conn.execute(load_query(query_name), params).fetchall()
+        return self.conn.execute(load_query(query_name), params).fetchall()
+
+    def iterate(self, query_name, params=()):
+        # 결과를 한꺼번에 읽지 않고 커서로 한 줄씩 (긴 기간 내보내기처럼 메모리를 일정하게 써야 할 때)
+        self.sync()
+        return self.execute(query_name, params)
+
+    def write(self, query_name, params=(), many=False):
+        # 쓰기 하나를 커밋한다. 백그라운드 writer가 있으면 큐에 넣고 바로 돌아온다.
+        if self.writer is not None:
+            self.writer.submit(query_name, params, many)
+            return
+        with self.conn:
+            if many:
+                self.executemany(query_name, params)
+            else:
+                self.execute(query_name, params)
+
+    def sync(self):
+        # 읽기 전에 아직 커밋되지 않은 쓰기를 마저 쓴다 (쓴 내용을 바로 다시 읽을 수 있도록)
+        if self.writer is not None and self.writer.pending:
+            if PERF.enabled:
+                with PERF.timer('db', 'sync wait'):
+                    self.writer.flush()
+                return
+            self.writer.flush()
+
+    def commit(self):
+        self.conn.commit()
+
+    def transaction(self):
+        # with db.transaction(): ... -> 정상 종료 시 commit, 예외 시 rollback
+        return self.conn
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()  # 남은 쓰기를 모두 커밋하고 스레드를 끝낸다
+            self.writer = None
+        try:
+            self.conn.execute("PRAGMA optimize")
+        except sqlite3.Error:
+            pass
+        self.conn.close()
+        for path in self.created_files:
+            # 이 연결이 만든 파일 중 빈 -wal과, -wal이 남지 않았을 때의 -shm만 지운다
+            try:
+                if os.path.getsize(path) == 0 or (path.endswith('-shm') and not os.path.exists(self.path + '-wal')):
+                    os.remove(path)
+            except OSError:
+                pass
+        self.created_files = []
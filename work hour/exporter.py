@@ -0,0 +1,164 @@
+import csv
+import datetime
+import os
+import re
+import zipfile
+from collections import namedtuple
+from xml.sax.saxutils import escape
+
+from core import MINUTES_PER_DAY, format_minutes
+from workdays import WorkdayEngine
+
+# 근무 기록과 휴일을 커서로 한 줄씩 읽어 하루 단위 보고서 줄을 만들고, 바로 CSV/XLSX로 쓴다.
+# 어느 단계도 기간 전체를 메모리에 올리지 않으므로 몇 년치를 내보내도 메모리 사용량은 같다.
+COLUMNS = ('kind', 'date', 'weekday', 'work_type', 'start_time', 'end_time', 'break_min',
+           'hours', 'balance_hours', 'required_hours', 'holiday')
+WEEKDAYS = ["월", "화", "수", "목", "금", "토", "일"]
+ReportRow = namedtuple('ReportRow', COLUMNS)
+
+# XML 1.0에 넣을 수 없는 제어 문자
+INVALID_XML_CHARS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+
+class ExportError(ValueError):
+    pass
+
+
+def merge_days(work_rows, holiday_rows):
+    # day 순으로 정렬된 두 커서를 (day, 근무 기록 또는 None, 휴일 설명 또는 None)으로 합친다
+    work = next(work_rows, None)
+    holiday = next(holiday_rows, None)
+    while work is not None or holiday is not None:
+        day = min(row[0] for row in (work, holiday) if row is not None)
+        entry = description = None
+        if work is not None and work[0] == day:
+            entry, work = work, next(work_rows, None)
+        if holiday is not None and holiday[0] == day:
+            description, holiday = holiday[1], next(holiday_rows, None)
+        yield day, entry, description
+
+
+def report_rows(db, first_date, last_date):
+    # 날짜마다 기록/휴일이 있는 날의 'day' 줄, 달이 끝날 때마다 'month' 합계 줄을 내보낸다.
+    # balance_hours는 여유 시간에 더해지는 몫: 근무일 기록은 근무시간 - 8, 주말/휴일 기록은 근무시간 전체.
+    first = datetime.date.fromisoformat(first_date).toordinal()
+    last = datetime.date.fromisoformat(last_date).toordinal()
+    work_rows = iter(db.iterate('Select work hours for export', (first, last)))
+    holiday_rows = iter(db.iterate('Select holidays for export', (first, last)))
+    days = merge_days(work_rows, holiday_rows)
+    pending = next(days, None)
+    workdays = WorkdayEngine(db)  # 필수시간은 화면과 같은 근무일 계산으로
+
+    month_start = first
+    while month_start <= last:
+        date = datetime.date.fromordinal(month_start)
+        next_month = (date.replace(day=28) + datetime.timedelta(days=4)).replace(day=1).toordinal()
+        month_end = min(last, next_month - 1)
+        total_minutes = balance_minutes = 0
+        while pending is not None and pending[0] <= month_end:
+            day, entry, description = pending
+            off_day = description is not None or (day - 1) % 7 >= 5
+            if entry is None:
+                yield ReportRow('day', datetime.date.fromordinal(day).isoformat(), WEEKDAYS[(day - 1) % 7],
+                                '', '', '', '', '', '', '', description)
+            else:
+                _, start_min, end_min, break_min, minutes, work_type = entry
+                contribution = minutes if off_day else minutes - MINUTES_PER_DAY
+                total_minutes += minutes
+                balance_minutes += contribution
+                yield ReportRow('day', datetime.date.fromordinal(day).isoformat(), WEEKDAYS[(day - 1) % 7],
+                                work_type, format_minutes(start_min), format_minutes(end_min), break_min,
+                                round(minutes / 60, 2), round(contribution / 60, 2), '', description or '')
+            pending = next(days, None)
+        # 필수시간 = 기간 안의 평일 수 - 평일 휴일 수 (전체 달이 아니면 그 구간만)
+        required = workdays.required_hours(date, datetime.date.fromordinal(month_end))
+        yield ReportRow('month', date.strftime('%Y-%m'), '', '', '', '', '', round(total_minutes / 60, 2),
+                        round(balance_minutes / 60, 2), required, '')
+        month_start = next_month
+
+
+def write_csv(rows, path):
+    count = 0
+    with open(path, 'w', encoding='utf-8-sig', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(COLUMNS)
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    return count
+
+
+CONTENT_TYPES = ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                 '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+                 '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+                 '<Default Extension="xml" ContentType="application/xml"/>'
+                 '<Override PartName="/xl/workbook.xml" '
+                 'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+                 '<Override PartName="/xl/worksheets/sheet1.xml" '
+                 'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+                 '</Types>')
+ROOT_RELS = ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+             '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+             '<Relationship Id="rId1" Target="xl/workbook.xml" '
+             'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"/>'
+             '</Relationships>')
+WORKBOOK = ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+            'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+            '<sheets><sheet name="{name}" sheetId="1" r:id="rId1"/></sheets></workbook>')
+WORKBOOK_RELS = ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                 '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+                 '<Relationship Id="rId1" Target="worksheets/sheet1.xml" '
+                 'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet"/>'
+                 '</Relationships>')
+
+
+def xlsx_cell(value):
+    # 숫자는 값으로, 나머지는 inline 문자열로 (sharedStrings를 쓰지 않아야 한 줄씩 쓸 수 있다)
+    if value == '' or value is None:
+        return '<c/>'
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return f'<c><v>{value}</v></c>'
+    text = escape(INVALID_XML_CHARS.sub('', str(value)))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def write_xlsx(rows, path, sheet_name="Report"):
+    # openpyxl 없이 최소 구성의 XLSX를 만든다. 시트 XML은 zip 항목에 줄 단위로 바로 쓴다.
+    count = 0
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr('[Content_Types].xml', CONTENT_TYPES)
+        archive.writestr('_rels/.rels', ROOT_RELS)
+        archive.writestr('xl/workbook.xml', WORKBOOK.format(name=escape(sheet_name, {'"': '&quot;'})))
+        archive.writestr('xl/_rels/workbook.xml.rels', WORKBOOK_RELS)
+        with archive.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as sheet:
+            sheet.write(b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                        b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+                        b'<sheetData>')
+            sheet.write(('<row>' + ''.join(map(xlsx_cell, COLUMNS)) + '</row>').encode('utf-8'))
+            for row in rows:
+                sheet.write(('<row>' + ''.join(map(xlsx_cell, row)) + '</row>').encode('utf-8'))
+                count += 1
+            sheet.write(b'</sheetData></worksheet>')
+    return count
+
+
+def detect_format(path):
+    extension = os.path.splitext(path)[1].lower()
+    if extension in ('.csv', '.xlsx'):
+        return extension[1:]
+    raise ExportError(f"Unknown export format: {path}")
+
+
+def export_report(db, path, first_date, last_date, fmt=None):
+    # 쓴 줄 수(머리글 제외)를 돌려준다
+    fmt = fmt or detect_format(path)
+    try:
+        if datetime.date.fromisoformat(last_date) < datetime.date.fromisoformat(first_date):
+            raise ExportError(f"{last_date} is before {first_date}")
+    except ValueError as e:
+        raise ExportError(str(e)) from None
+    rows = report_rows(db, first_date, last_date)
+    if fmt == 'xlsx':
+        return write_xlsx(rows, path, sheet_name=f"{first_date[:7]}~{last_date[:7]}")
+    return write_csv(rows, path)
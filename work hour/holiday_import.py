@@ -0,0 +1,140 @@
+import datetime
+import re
+
+# iCalendar(.ics)에서 하루 종일 일정(VALUE=DATE)만 휴일로 읽는다. 시간이 있는 일정은 건너뛴다.
+DATE_PATTERN = re.compile(r'^(\d{4})(\d{2})(\d{2})$')
+DURATION_PATTERN = re.compile(r'^P(?:(\d+)W)?(?:(\d+)D)?$')
+MAX_EVENT_DAYS = 31  # 잘못된 DTEND로 수십 년이 펼쳐지지 않도록
+
+
+class HolidayImportError(ValueError):
+    pass
+
+
+def iter_ics_lines(path):
+    # 접힌 줄(다음 줄이 공백/탭으로 시작)을 이어 붙여 (줄 번호, 논리 줄)을 하나씩 돌려준다
+    with open(path, 'r', encoding='utf-8-sig', newline='') as file:
+        pending = None
+        pending_no = 0
+        for line_no, line in enumerate(file, start=1):
+            line = line.rstrip('\r\n')
+            if line[:1] in (' ', '\t') and pending is not None:
+                pending += line[1:]
+                continue
+            if pending:
+                yield pending_no, pending
+            pending, pending_no = line, line_no
+        if pending:
+            yield pending_no, pending
+
+
+def split_property(line):
+    # 'DTSTART;VALUE=DATE:20240101' -> ('DTSTART', {'VALUE': 'DATE'}, '20240101')
+    head, _, value = line.partition(':')
+    name, *params = head.split(';')
+    return name.upper(), dict(param.upper().split('=', 1) for param in params if '=' in param), value
+
+
+def unescape_text(value):
+    return re.sub(r'\\([\\,;nN])', lambda match: '\n' if match.group(1) in 'nN' else match.group(1), value)
+
+
+def parse_date(value):
+    match = DATE_PATTERN.match(value.strip())
+    if not match:
+        return None
+    return datetime.date(*map(int, match.groups()))
+
+
+def iter_ics_events(path):
+    # VEVENT마다 (시작 줄 번호, {속성 이름: (파라미터, 값)}). 같은 이름은 처음 것만 쓴다.
+    event = None
+    start_no = 0
+    for line_no, line in iter_ics_lines(path):
+        name, params, value = split_property(line)
+        if name == 'BEGIN' and value.upper() == 'VEVENT':
+            event, start_no = {}, line_no
+        elif name == 'END' and value.upper() == 'VEVENT':
+            if event is not None:
+                yield start_no, event
+            event = None
+        elif event is not None:
+            event.setdefault(name, (params, value))
+
+
+def expand_yearly(first, rrule):
+    # FREQ=YEARLY에 COUNT나 UNTIL이 있는 경우만 펼친다. 끝이 없는 반복은 첫 해만 쓴다.
+    rule = dict(part.split('=', 1) for part in rrule.upper().split(';') if '=' in part)
+    if rule.get('FREQ') != 'YEARLY':
+        return [first]
+    interval = int(rule.get('INTERVAL', 1))
+    count = int(rule['COUNT']) if 'COUNT' in rule else None
+    until = parse_date(rule['UNTIL'][:8]) if 'UNTIL' in rule else None
+    if count is None and until is None:
+        return [first]
+    starts = []
+    year = first.year
+    while (count is None or len(starts) < count) and year <= 9999:
+        try:
+            start = first.replace(year=year)
+        except ValueError:  # 2월 29일
+            year += interval
+            continue
+        if until is not None and start > until:
+            break
+        starts.append(start)
+        year += interval
+    return starts
+
+
+def event_dates(event):
+    # 하루 종일 일정이 덮는 날짜들. DTEND는 그 날을 포함하지 않는다.
+    if 'DTSTART' not in event:
+        raise HolidayImportError("missing DTSTART")
+    params, value = event['DTSTART']
+    if params.get('VALUE') not in (None, 'DATE') or 'T' in value:
+        return []  # 시간이 있는 일정
+    first = parse_date(value)
+    if first is None:
+        raise HolidayImportError(f"invalid DTSTART: {value!r}")
+    days = 1
+    if 'DTEND' in event:
+        last = parse_date(event['DTEND'][1])
+        if last is None:
+            raise HolidayImportError(f"invalid DTEND: {event['DTEND'][1]!r}")
+        days = (last - first).days
+    elif 'DURATION' in event:
+        match = DURATION_PATTERN.match(event['DURATION'][1].strip())
+        if not match:
+            raise HolidayImportError(f"invalid DURATION: {event['DURATION'][1]!r}")
+        days = int(match.group(1) or 0) * 7 + int(match.group(2) or 0)
+    if not 1 <= days <= MAX_EVENT_DAYS:
+        raise HolidayImportError(f"event spans {days} days")
+    starts = expand_yearly(first, event['RRULE'][1]) if 'RRULE' in event else [first]
+    return [start + datetime.timedelta(days=offset) for start in starts for offset in range(days)]
+
+
+def iter_holidays(path, skip_invalid=False, errors=None):
+    # (날짜 문자열, 설명)을 파일 순서대로. 같은 날짜는 처음 나온 일정만 쓴다.
+    seen = set()
+    for line_no, event in iter_ics_events(path):
+        try:
+            dates = event_dates(event)
+        except (HolidayImportError, ValueError) as e:
+            if not skip_invalid:
+                raise HolidayImportError(f"{path}:{line_no}: {e}") from None
+            if errors is not None:
+                errors.append(f"{line_no}: {e}")
+            continue
+        description = unescape_text(event.get('SUMMARY', ({}, ''))[1]).strip() or "Holiday"
+        for date in dates:
+            date_str = date.isoformat()
+            if date_str not in seen:
+                seen.add(date_str)
+                yield date_str, description
+
+
+def import_holidays(store, path, skip_invalid=False):
+    errors = []
+    imported = store.import_holidays(iter_holidays(path, skip_invalid, errors))
+    return imported, errors
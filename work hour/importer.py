@@ -0,0 +1,91 @@
+import csv
+import datetime
+import json
+import os
+import re
+
+from core import WORK_TYPES
+
+FIELDS = ('date', 'start_time', 'end_time', 'work_type')
+TIME_PATTERN = re.compile(r'^([01]\d|2[0-3]):([0-5]\d)$')
+
+
+class AttendanceImportError(ValueError):
+    pass
+
+
+def iter_csv_rows(path):
+    with open(path, 'r', encoding='utf-8-sig', newline='') as file:
+        for line_no, row in enumerate(csv.DictReader(file), start=2):
+            yield line_no, row
+
+
+def iter_json_rows(path):
+    # JSON 배열이면 한 번에, JSON Lines(한 줄에 객체 하나)면 한 줄씩 읽는다
+    with open(path, 'r', encoding='utf-8-sig') as file:
+        first = file.read(1)
+        while first and first.isspace():
+            first = file.read(1)
+        if first == '[':
+            file.seek(0)
+            for index, row in enumerate(json.load(file), start=1):
+                yield index, row
+            return
+        file.seek(0)
+        for line_no, line in enumerate(file, start=1):
+            if line.strip():
+                yield line_no, json.loads(line)
+
+
+def detect_format(path):
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.csv':
+        return 'csv'
+    if extension in ('.json', '.jsonl'):
+        return 'json'
+    raise AttendanceImportError(f"Unknown file format: {path}")
+
+
+def validate_row(row):
+    # work_hours 스키마에 맞는 (date, start_time, end_time, work_type) 튜플로 바꾼다
+    if not isinstance(row, dict):
+        raise AttendanceImportError("row is not an object")
+    date = str(row.get('date') or '').strip()
+    start_time = str(row.get('start_time') or '').strip()
+    end_time = str(row.get('end_time') or '').strip()
+    work_type = str(row.get('work_type') or "일반근무").strip()
+    try:
+        if datetime.date.fromisoformat(date).isoformat() != date:
+            raise ValueError
+    except ValueError:
+        raise AttendanceImportError(f"invalid date: {date!r}") from None
+    for value in (start_time, end_time):
+        if not TIME_PATTERN.match(value):
+            raise AttendanceImportError(f"invalid time: {value!r}")
+    if end_time <= start_time:
+        raise AttendanceImportError(f"end_time {end_time} is not after start_time {start_time}")
+    if work_type not in WORK_TYPES:
+        raise AttendanceImportError(f"unknown work_type: {work_type!r}")
+    return date, start_time, end_time, work_type
+
+
+def read_attendance(path, fmt=None, skip_invalid=False):
+    # 잘못된 줄은 skip_invalid면 errors에 모으고 건너뛰며, 아니면 바로 예외를 낸다
+    fmt = fmt or detect_format(path)
+    rows = iter_csv_rows(path) if fmt == 'csv' else iter_json_rows(path)
+    valid = []
+    errors = []
+    for line_no, row in rows:
+        try:
+            valid.append(validate_row(row))
+        except AttendanceImportError as e:
+            if not skip_invalid:
+                raise AttendanceImportError(f"{path}:{line_no}: {e}") from None
+            errors.append(f"{line_no}: {e}")
+    return valid, errors
+
+
+def import_attendance(store, path, fmt=None, skip_invalid=False):
+    rows, errors = read_attendance(path, fmt, skip_invalid)
+    imported = store.import_entries(rows)
+    return imported, errors
@@ -1,21 +1,45 @@
 import sys
-import sqlite3
 import os
-from PyQt5.QtWidgets import QDialog, QMessageBox, QApplication, QMainWindow, QGroupBox, QCalendarWidget, QLabel, QVBoxLayout, QWidget, QPushButton, QComboBox, QHBoxLayout, QGridLayout, QFrame, QLineEdit
-from PyQt5.QtCore import QDate, Qt, QSettings, QSize, QPoint
-from PyQt5.QtGui import QColor, QPainter, QIcon, QPixmap, QIntValidator
-
-def load_query(query_name):
-    with open('queries.sql', 'r') as file:
-        queries = file.read().split(';')
-        query_dict = {}
-        for query in queries:
-            if query.strip():
-                lines = query.strip().split('\n')
-                name = lines[0].strip().lstrip('-- ')
-                query_dict[name] = '\n'.join(lines[1:]).strip()
-        return query_dict[query_name]
-    
+import calendar
+import json
+import socket
+import sqlite3
+import threading
+import time
+from collections import namedtuple, OrderedDict
+from PyQt5.QtWidgets import QDialog, QMessageBox, QApplication, QMainWindow, QGroupBox, QCalendarWidget, QLabel, QVBoxLayout, QWidget, QPushButton, QComboBox, QHBoxLayout, QGridLayout, QFrame, QLineEdit, QFileDialog, QTableWidget, QTableWidgetItem, QHeaderView, QAbstractItemView, QTableView, QTabWidget, QCheckBox
+from PyQt5.QtCore import QDate, Qt, QEvent, QSettings, QSize, QPoint, QRect, QObject, QTimer, pyqtSignal
+from PyQt5.QtGui import QColor, QPainter, QPen, QIcon, QPixmap, QIntValidator
+
+from core import (DAY_HOLIDAY, DAY_RECORDED, DAY_WEEKEND, MINUTES_PER_DAY, WORK_TYPES,
+                  WorkHoursStore, WorkType, add_months)
+from db import DB_PATH, Database
+from exporter import ExportError, export_report
+from holiday_import import HolidayImportError, import_holidays
+from importer import AttendanceImportError, import_attendance
+from perf import PERF, instrumented
+from server import DEFAULT_PORT as API_PORT
+from writer import BackgroundWriter
+
+# 셀을 그릴 때마다 QColor를 만들지 않도록 미리 만들어 둔다
+WHITE = QColor('white')
+BLACK = QColor('black')
+RED = QColor('red')
+BLUE = QColor('blue')
+RANGE_HIGHLIGHT = QColor(0, 120, 215, 40)  # 범위 선택 표시 (반투명 파랑)
+WORK_TYPE_COLORS = {
+    WorkType.REMOTE: QColor(0xE6, 0xFB, 0xEA),  # 연한 연두색
+    WorkType.ANNUAL_LEAVE: QColor(255, 219, 204),  # 연한 주황색
+    WorkType.HALF_DAY_AM: QColor(255, 255, 181),  # 연한 노랑색
+    WorkType.HALF_DAY_PM: QColor(255, 255, 181),  # 연한 노랑색
+    WorkType.BUSINESS_TRIP: QColor(212, 240, 240),  # 연한 파랑색
+    WorkType.TRAINING: QColor(236, 213, 227),  # 연한 보라색
+    WorkType.OTHER: QColor(236, 234, 228),  # 연한 회색
+}
+
+# 한 칸을 그리는 데 필요한 값들 (데이터가 바뀔 때만 다시 만든다)
+CellState = namedtuple('CellState', 'day_text work_type off_day hours_text short_hours')
+
 def format_number(value):
     if value is None:
         return "0"
@@ -23,161 +47,507 @@ def format_number(value):
     return formatted if formatted else "0"
 
 class WorkCalendar(QCalendarWidget):
-    def __init__(self, parent=None):
+    # 켜두면 같은 상태/크기의 셀은 한 번 그린 pixmap을 재사용한다
+    pixmap_cache_enabled = os.environ.get('WORK_HOURS_PIXMAP_CACHE') == '1'
+    pixmap_cache_size = 512
+
+    def __init__(self, store, parent=None):
         super().__init__(parent)
-        self.work_hours = {}
-        self.work_types = {}  # 근무 유형 저장
-        self.holidays = self.load_holidays()
-        self.load_work_hours()
+        self.store = store
+        self.render_model = None  # 줄리안 일 -> CellState, 보이는 달과 앞뒤 달
+        self.pixmap_cache = OrderedDict()
+        # shift-클릭 또는 드래그로 고른 범위 (줄리안 일). 기준 날짜와 끝 날짜가 같으면 범위가 아니다.
+        self.range_anchor = None
+        self.range_end = None
+        self.dragging = False
+        self.paint_batch_ms = 0.0  # 계측이 켜져 있을 때 한 번의 다시 그리기에서 paintCell에 쓴 시간
+        self.paint_batch_cells = 0
+        self.findChild(QTableView).viewport().installEventFilter(self)
+        self.selectionChanged.connect(self.on_selection_changed)
+        self.store.add_listener(self.invalidate_render_model)
+        self.store.ensure_window(self.yearShown(), self.monthShown())
+        self.currentPageChanged.connect(self.ensure_window)  # 페이지가 바뀌면 앞뒤 달까지 미리 읽는다
         self.setNavigationBarVisible(False)  # 기본 네비게이션 바 숨기기
 
-
-
-    def get_work_days_in_current_month(self, year, month):
-        first_day = QDate(year, month, 1)
-        last_day = QDate(year, month, first_day.daysInMonth())
-        work_days = 0
-
-        for day in range(first_day.day(), last_day.day() + 1):
-            date = QDate(first_day.year(), first_day.month(), day)
-            date_str = date.toString("yyyy-MM-dd")
-
-            if date.dayOfWeek() not in (Qt.Saturday, Qt.Sunday) and date_str not in self.holidays:
-                work_days += 1
-
-        return work_days
-    
+    def ensure_window(self, year, month):
+        self.invalidate_render_model()
+        self.store.ensure_window(year, month)
+
+    def build_render_model(self):
+        model = {}
+        for delta in (-1, 0, 1):
+            year, month = add_months(self.yearShown(), self.monthShown(), delta)
+            first_jd = QDate(year, month, 1).toJulianDay()
+            for day, view in enumerate(self.store.month_days(year, month), start=1):
+                off_day = view.off_day
+                minutes = view.minutes
+                hours_text = None if minutes is None else f"{minutes / 60:.2f}"
+                model[first_jd + day - 1] = CellState(str(day), view.work_type, off_day, hours_text,
+                                                      minutes is not None and not off_day and minutes < MINUTES_PER_DAY)
+        self.render_model = model
+
+    def invalidate_render_model(self):
+        self.render_model = None
+
+    def eventFilter(self, watched, event):
+        # 달력 안쪽 뷰의 마우스 이벤트만 엿보고, 날짜 선택은 원래대로 뷰가 처리한다 (선택은 버튼을 뗄 때 바뀐다)
+        if event.type() == QEvent.MouseButtonPress and event.button() == Qt.LeftButton:
+            date = self.date_at(event.pos())
+            if date is not None:
+                if not event.modifiers() & Qt.ShiftModifier:
+                    self.clear_range()
+                    self.range_anchor = date.toJulianDay()
+                elif self.range_anchor is None:
+                    self.range_anchor = self.selectedDate().toJulianDay()
+                self.set_range_end(date)
+                self.dragging = True
+        elif event.type() == QEvent.MouseMove and self.dragging:
+            date = self.date_at(event.pos())
+            if date is not None:
+                self.set_range_end(date)
+        elif event.type() == QEvent.MouseButtonRelease and event.button() == Qt.LeftButton:
+            self.dragging = False
+        elif event.type() == QEvent.Paint and PERF.enabled:
+            self.flush_paint_batch()  # 다시 그리기가 새로 시작되면 앞의 묶음을 기록한다
+        return False
+
+    def flush_paint_batch(self):
+        if self.paint_batch_cells:
+            PERF.record('paint', 'paintCell batch', self.paint_batch_ms)
+            PERF.record('paint', 'cells per batch', self.paint_batch_cells)
+        self.paint_batch_ms = 0.0
+        self.paint_batch_cells = 0
+
+    def date_at(self, pos):
+        # 뷰 좌표의 날짜. 칸에는 일(day)만 있으므로 몇 번째 줄인지로 앞뒤 달 날짜를 가린다.
+        view = self.findChild(QTableView)
+        index = view.indexAt(pos)
+        day = index.data()
+        first_row = 0 if self.horizontalHeaderFormat() == QCalendarWidget.NoHorizontalHeader else 1
+        first_column = 0 if self.verticalHeaderFormat() == QCalendarWidget.NoVerticalHeader else 1
+        if not index.isValid() or not isinstance(day, int) or index.row() < first_row or index.column() < first_column:
+            return None
+        row = index.row() - first_row
+        delta = 0
+        if row == 0 and day > 7:
+            delta = -1
+        elif row >= 4 and day < 15:
+            delta = 1
+        year, month = add_months(self.yearShown(), self.monthShown(), delta)
+        return QDate(year, month, day)
+
+    def set_range_end(self, date):
+        day = date.toJulianDay()
+        if self.range_end != day:
+            self.range_end = day
+            self.updateCells()
+
+    def on_selection_changed(self):
+        # 마우스로 고른 끝 날짜가 아닌 곳으로 선택이 옮겨지면 (이동 버튼, 콤보 등) 범위를 푼다
+        if not self.dragging and self.selectedDate().toJulianDay() != self.range_end:
+            self.clear_range()
+
+    def clear_range(self):
+        if self.range_end is not None:
+            self.updateCells()
+        self.range_anchor = None
+        self.range_end = None
+
+    def selected_range(self):
+        # (첫 날짜, 마지막 날짜) QDate, 범위를 고르지 않았으면 None
+        if self.range_anchor is None or self.range_end is None or self.range_anchor == self.range_end:
+            return None
+        first, last = sorted((self.range_anchor, self.range_end))
+        return QDate.fromJulianDay(first), QDate.fromJulianDay(last)
+
+    def in_range(self, day):
+        if self.range_end is None:
+            return False
+        return min(self.range_anchor, self.range_end) <= day <= max(self.range_anchor, self.range_end)
 
     def paintCell(self, painter, rect, date):
-        super().paintCell(painter, rect, date)
-        date_str = date.toString("yyyy-MM-dd")
+        if PERF.enabled:
+            started = time.perf_counter()
+            self.paint_cell(painter, rect, date)
+            self.paint_batch_ms += (time.perf_counter() - started) * 1000
+            self.paint_batch_cells += 1
+            return
+        self.paint_cell(painter, rect, date)
+
+    def paint_cell(self, painter, rect, date):
+        # 흰색으로 칸 전체를 덮으므로 기본 paintCell은 호출하지 않는다
+        if self.render_model is None:
+            self.build_render_model()
+        cell = self.render_model.get(date.toJulianDay())
+        if cell is None:
+            cell = CellState(str(date.day()), WorkType.NONE, date.dayOfWeek() in (6, 7), None, False)
+        selected_date = self.selectedDate()
+        in_month = date.month() == selected_date.month()
+        selected = date == selected_date
+        in_range = self.in_range(date.toJulianDay())
+
+        if not self.pixmap_cache_enabled:
+            self.draw_cell(painter, rect, cell, in_month, selected, in_range)
+            return
+
+        ratio = self.devicePixelRatioF()
+        key = (cell, rect.width(), rect.height(), ratio, in_month, selected, in_range)
+        pixmap = self.pixmap_cache.get(key)
+        if pixmap is None:
+            pixmap = QPixmap(rect.size() * ratio)
+            pixmap.setDevicePixelRatio(ratio)
+            cell_painter = QPainter(pixmap)
+            cell_painter.setFont(painter.font())
+            self.draw_cell(cell_painter, QRect(0, 0, rect.width(), rect.height()), cell, in_month, selected, in_range)
+            cell_painter.end()
+            self.pixmap_cache[key] = pixmap
+            if len(self.pixmap_cache) > self.pixmap_cache_size:
+                self.pixmap_cache.popitem(last=False)
+        else:
+            self.pixmap_cache.move_to_end(key)
+        painter.drawPixmap(rect.topLeft(), pixmap)
 
+    def draw_cell(self, painter, rect, cell, in_month, selected, in_range=False):
         # 배경색을 초기화
-        painter.fillRect(rect, QColor('white'))
+        painter.fillRect(rect, WHITE)
 
         # 현재 달의 날짜가 아니면 흐리게 표시
-        current_month = self.selectedDate().month()
-        if date.month() != current_month:
-            painter.setOpacity(0.3)
-        else:
-            painter.setOpacity(1.0)
-
+        painter.setOpacity(1.0 if in_month else 0.3)
 
         # 근무 유형에 따른 배경색 설정
-        if date_str in self.work_types:
-            work_type = self.work_types[date_str]
-            if work_type == "재택근무":
-                painter.fillRect(rect, QColor(0xE6, 0xFB, 0xEA))  # 연한 연두색
-            elif work_type == "연/월차":
-                painter.fillRect(rect, QColor(255, 219, 204))  # 연한 주황색
-            elif work_type == "오전반차":
-                painter.fillRect(rect, QColor(255, 255, 181))  # 연한 노랑색
-            elif work_type == "오후반차":
-                painter.fillRect(rect, QColor(255, 255, 181))  # 연한 노랑색
-            elif work_type == "출장":
-                painter.fillRect(rect, QColor(212, 240, 240))  # 연한 파랑색
-            elif work_type == "교육":
-                painter.fillRect(rect, QColor(236, 213, 227))  # 연한 보라색
-            elif work_type == "기타":
-                painter.fillRect(rect, QColor(236, 234, 228))  # 연한 회색
-
-        # 기본 글씨 색상을 검정색으로 설정
-        painter.setPen(QColor('black'))
+        background = WORK_TYPE_COLORS.get(cell.work_type)
+        if background is not None:
+            painter.fillRect(rect, background)
+        if in_range:
+            painter.fillRect(rect, RANGE_HIGHLIGHT)
 
         # 공휴일 또는 주말인 경우 글씨를 빨간색으로 설정
-        is_holiday_or_weekend = date_str in self.holidays or date.dayOfWeek() in (6, 7)
-        if is_holiday_or_weekend:
-            painter.setPen(QColor('red'))
+        painter.setPen(RED if cell.off_day else BLACK)
 
         # 날짜를 중앙에 그립니다.
-        painter.drawText(rect, Qt.AlignCenter, str(date.day()))
-
-        # 근무 시간이 있는 경우, 근무 시간을 별도로 표시
-        if date_str in self.work_hours:
-            hours = self.work_hours[date_str]
-            if date_str in self.holidays or date.dayOfWeek() in (6, 7):  # 휴일 및 주말 근무 시간은 파란 글씨로 표시
-                work_hours_color = QColor('blue')
-            else:
-                work_hours_color = QColor('blue') if hours >= 8 else QColor('red')
-            painter.setPen(work_hours_color)
-            painter.drawText(rect, Qt.AlignBottom | Qt.AlignRight, f"{hours:.2f}")
+        painter.drawText(rect, Qt.AlignCenter, cell.day_text)
 
+        # 근무 시간이 있는 경우, 근무 시간을 별도로 표시 (휴일 및 주말 근무 시간은 파란 글씨)
+        if cell.hours_text is not None:
+            painter.setPen(RED if cell.short_hours else BLUE)
+            painter.drawText(rect, Qt.AlignBottom | Qt.AlignRight, cell.hours_text)
 
         # 선택된 날짜 강조
-        if date == self.selectedDate():
-            pen = painter.pen()
-            pen.setWidth(2)  # 테두리 두께 설정
-            pen.setColor(QColor(0, 0, 0))  # 파란색 테두리
-            painter.setPen(pen)
+        if selected:
+            painter.setPen(QPen(BLACK, 2))  # 테두리 두께 설정
             painter.drawRect(rect.adjusted(1, 1, -1, -1))  # 테두리를 그립니다.
         # Opacity를 원래대로 복원
         painter.setOpacity(1.0)
 
+class YearHeatmap(QWidget):
+    # 12달 x 31일 격자. store.year_days()의 배열만 읽어 paintEvent 한 번에 전부 그린다.
+    dayClicked = pyqtSignal(QDate)
 
+    LABEL_WIDTH = 36
+    BALANCE_WIDTH = 56
+    # 일반/재택 근무는 근무시간(0~10시간 이상)에 따라 진해지는 파란색
+    HEAT_COLORS = [QColor(230 - 15 * level, 240 - 12 * level, 255 - 6 * level) for level in range(11)]
+    OFF_DAY = QColor(238, 238, 238)
+    HOLIDAY = QColor(250, 215, 215)
+    GRID = QColor(200, 200, 200)
 
-    def load_work_hours(self):
-        try:
-            conn = sqlite3.connect('work_hours.db')
-            cursor = conn.cursor()
-            query = load_query('Select all work hours')
-            cursor.execute(query)
-            records = cursor.fetchall()
-            for date, start_time, end_time, work_type in records:
-                start_hour = int(start_time.split(':')[0])
-                end_hour = int(end_time.split(':')[0])
-                start_minute = int(start_time.split(':')[1])
-                end_minute = int(end_time.split(':')[1])
-                hours = (end_hour + end_minute / 60) - (start_hour + start_minute / 60) - 1
-                self.work_hours[date] = hours
-                self.work_types[date] = work_type  # 근무 유형 저장
-            conn.close()
-        except sqlite3.Error as e:
-            print(f"Database error: {e}")
+    def __init__(self, store, parent=None):
+        super().__init__(parent)
+        self.store = store
+        self.year = QDate.currentDate().year()
+        self.days = None
+        self.store.add_listener(self.invalidate)
+        self.setMinimumSize(self.LABEL_WIDTH + self.BALANCE_WIDTH + 31 * 12, 12 * 14)
+
+    def set_year(self, year):
+        self.year = year
+        self.invalidate()
+
+    def detach(self):
+        self.store.remove_listener(self.invalidate)
+
+    def invalidate(self):
+        self.days = None
+        self.update()
+
+    def cell_size(self):
+        return ((self.width() - self.LABEL_WIDTH - self.BALANCE_WIDTH) / 31, self.height() / 12)
+
+    def paintEvent(self, event):
+        if self.days is None:
+            self.days = self.store.year_days(self.year)
+        days = self.days
+        cell_width, cell_height = self.cell_size()
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), WHITE)
+        painter.setPen(BLACK)
+        offset = 0
+        for month in range(1, 13):
+            top = (month - 1) * cell_height
+            painter.setPen(BLACK)
+            painter.drawText(QRect(0, int(top), self.LABEL_WIDTH - 4, int(cell_height)),
+                             Qt.AlignRight | Qt.AlignVCenter, f"{month}월")
+            for day in range(calendar.monthrange(self.year, month)[1]):
+                index = offset + day
+                flags = days.flags[index]
+                if flags & DAY_RECORDED:
+                    color = WORK_TYPE_COLORS.get(days.work_types[index])
+                    if color is None:
+                        color = self.HEAT_COLORS[max(0, min(10, days.minutes[index] // 60))]
+                elif flags & DAY_HOLIDAY:
+                    color = self.HOLIDAY
+                elif flags & DAY_WEEKEND:
+                    color = self.OFF_DAY
+                else:
+                    color = WHITE
+                painter.fillRect(int(self.LABEL_WIDTH + day * cell_width), int(top),
+                                 max(1, int(cell_width) - 1), max(1, int(cell_height) - 1), color)
+            offset += calendar.monthrange(self.year, month)[1]
+            balance = days.summaries[month - 1].balance
+            painter.setPen(RED if balance < 0 else BLUE)
+            painter.drawText(QRect(int(self.width() - self.BALANCE_WIDTH), int(top), self.BALANCE_WIDTH - 4, int(cell_height)),
+                             Qt.AlignRight | Qt.AlignVCenter, format_number(round(balance, 1)))
+        painter.end()
+
+    def mousePressEvent(self, event):
+        cell_width, cell_height = self.cell_size()
+        month = int(event.pos().y() // cell_height) + 1
+        day = int((event.pos().x() - self.LABEL_WIDTH) // cell_width) + 1
+        if 1 <= month <= 12 and 1 <= day <= calendar.monthrange(self.year, month)[1]:
+            self.dayClicked.emit(QDate(self.year, month, day))
+
+
+class YearOverviewDialog(QDialog):
+    def __init__(self, store, year, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("연간 보기")
+        self.setAttribute(Qt.WA_DeleteOnClose)
+        self.heatmap = YearHeatmap(store, self)
+        self.year_label = QLabel(self)
+        self.year_label.setAlignment(Qt.AlignCenter)
+        prev_button = QPushButton("<", self)
+        prev_button.clicked.connect(lambda: self.set_year(self.heatmap.year - 1))
+        next_button = QPushButton(">", self)
+        next_button.clicked.connect(lambda: self.set_year(self.heatmap.year + 1))
+        top_layout = QHBoxLayout()
+        top_layout.addWidget(prev_button)
+        top_layout.addWidget(self.year_label, 1)
+        top_layout.addWidget(next_button)
+        layout = QVBoxLayout()
+        layout.addLayout(top_layout)
+        layout.addWidget(self.heatmap, 1)
+        self.setLayout(layout)
+        self.resize(720, 320)
+        self.set_year(year)
+
+    def set_year(self, year):
+        self.year_label.setText(f"{year}년")
+        self.heatmap.set_year(year)
+
+    def done(self, result):
+        self.heatmap.detach()  # 닫힌 뒤에는 store 변경 알림을 받지 않는다
+        super().done(result)
+
+    def closeEvent(self, event):
+        self.heatmap.detach()
+        super().closeEvent(event)
+
+    def keyPressEvent(self, event):
+        if event.key() in (Qt.Key_Left, Qt.Key_PageUp):
+            self.set_year(self.heatmap.year - 1)
+        elif event.key() in (Qt.Key_Right, Qt.Key_PageDown):
+            self.set_year(self.heatmap.year + 1)
+        else:
+            super().keyPressEvent(event)
 
 
-    def load_holidays(self):
-        holidays = set()
+class WriterSignals(QObject):
+    # BackgroundWriter 콜백은 쓰기 스레드에서 불리므로 시그널로 GUI 스레드에 넘긴다
+    committed = pyqtSignal(int)
+    failed = pyqtSignal(str)
+
+
+class ApiEventListener(QObject):
+    # 로컬 API 서버(cli.py serve)의 /events를 구독해 변경 알림을 시그널로 넘긴다.
+    # 서버가 떠 있지 않으면 조용히 기다렸다가 다시 붙는다. WORK_HOURS_API_EVENTS=0이면 끈다.
+    changed = pyqtSignal(dict)
+    connected = pyqtSignal()  # 새로 붙었을 때 (끊겨 있던 동안의 변경은 알 수 없으므로 다시 읽는다)
+
+    enabled = os.environ.get('WORK_HOURS_API_EVENTS', '1') != '0'
+    RETRY_SECONDS = 5
+    READ_TIMEOUT = 45  # 서버는 15초마다 ping을 보낸다
+
+    def __init__(self, port=API_PORT, parent=None):
+        super().__init__(parent)
+        self.port = port
+        self.stopped = threading.Event()
+        self.sock = None
+        self.thread = threading.Thread(target=self.run, name='work-hours-api-events', daemon=True)
+
+    def start(self):
+        if self.enabled:
+            self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        sock = self.sock
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def run(self):
+        while not self.stopped.is_set():
+            try:
+                with socket.create_connection(('127.0.0.1', self.port), timeout=self.RETRY_SECONDS) as sock:
+                    self.sock = sock
+                    sock.sendall(b"GET /events HTTP/1.1\r\nHost: localhost\r\n\r\n")
+                    sock.settimeout(self.READ_TIMEOUT)
+                    stream = sock.makefile('rb')
+                    if b' 200 ' not in stream.readline():
+                        raise OSError("unexpected response")
+                    while stream.readline() not in (b'\r\n', b''):
+                        pass
+                    self.connected.emit()
+                    for line in stream:
+                        if line.startswith(b'data: '):
+                            self.changed.emit(json.loads(line[6:]))
+            except (OSError, ValueError):
+                pass
+            finally:
+                self.sock = None
+            self.stopped.wait(self.RETRY_SECONDS)
+
+
+class ExternalChangeWatcher(QObject):
+    # 다른 프로세스(가져오기 스크립트, cli.py sync, 다른 창)의 커밋을 PRAGMA data_version으로 알아챈다.
+    # 이 값은 다른 연결이 커밋했을 때만 바뀌므로 조용할 때는 타이머마다 PRAGMA 한 번이 전부다.
+    # 바뀌었으면 changelog에서 그 뒤로 바뀐 날만 읽어 캐시를 고친다. WORK_HOURS_WATCH_MS=0이면 끈다.
+    changed = pyqtSignal()
+
+    interval_ms = int(os.environ.get('WORK_HOURS_WATCH_MS', '1000'))
+
+    def __init__(self, store, parent=None):
+        super().__init__(parent)
+        self.store = store
+        self.data_version = None
+        self.mark = (0, 0)  # 캐시에 반영한 changelog_mark (reset 세대, seq)
+        self.timer = QTimer(self)
+        self.timer.setInterval(self.interval_ms)
+        self.timer.timeout.connect(self.poll)
+
+    def start(self):
+        if self.interval_ms > 0:
+            self.data_version = self.read_data_version()
+            self.mark = self.store.changelog_mark()
+            self.timer.start()
+
+    def stop(self):
+        self.timer.stop()
+
+    def read_data_version(self):
+        return self.store.db.conn.execute("PRAGMA data_version").fetchone()[0]
+
+    @instrumented('refresh')
+    def poll(self):
+        # 쓰기 스레드가 커밋하는 것도 다른 연결이므로 값이 바뀐다. 그 줄은 캐시와 같아서 건너뛰게 된다.
+        writer = self.store.db.writer
+        if writer is not None and writer.pending:
+            return  # 캐시가 DB보다 앞서 있는 동안은 비교하지 않고 다음 번에 본다
         try:
-            conn = sqlite3.connect('work_hours.db')
-            cursor = conn.cursor()
-            query = load_query('Select all holidays')
-            cursor.execute(query)
-            records = cursor.fetchall()
-            for record in records:
-                holidays.add(record[0])
-            conn.close()
+            version = self.read_data_version()
         except sqlite3.Error as e:
             print(f"Database error: {e}")
-        return holidays
-    
+            return
+        if version == self.data_version:
+            return
+        self.data_version = version
+        self.mark, changed = self.store.apply_external_changes(self.mark)
+        if changed:
+            self.changed.emit()
+
+
+class RefreshScheduler(QObject):
+    # 정보 라벨 재계산과 달력 다시 그리기 요청을 dirty 표시만 해두었다가 이벤트 루프 한 바퀴에 한 번만 실행한다.
+    # 달 이동 한 번에 콤보 두 개, 페이지 변경, setSelectedDate가 각각 갱신을 요청해도 계산은 한 번이다.
+
+    # 켜두면 창을 닫을 때 요청/실행 횟수를 출력한다
+    report_enabled = os.environ.get('WORK_HOURS_REFRESH_STATS') == '1'
+
+    def __init__(self, update_info, update_cells, parent=None):
+        super().__init__(parent)
+        self.update_info = update_info
+        self.update_cells = update_cells
+        self.info_dirty = False
+        self.cells_dirty = False
+        self.requested = {'info': 0, 'cells': 0}
+        self.performed = {'info': 0, 'cells': 0}
+        self.stopped = False
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(0)
+        self.timer.timeout.connect(self.flush)
+
+    def request_info(self):
+        if self.stopped:
+            return
+        self.requested['info'] += 1
+        self.info_dirty = True
+        self.timer.start()
+
+    def request_cells(self):
+        if self.stopped:
+            return
+        self.requested['cells'] += 1
+        self.cells_dirty = True
+        self.timer.start()
+
+    def stop(self):
+        # 창을 닫은 뒤에 도착한 요청(쓰기 스레드의 마지막 커밋 알림 등)은 닫힌 DB를 읽지 않도록 버린다
+        self.stopped = True
+        self.timer.stop()
+
+    def flush(self):
+        # 밀린 갱신을 지금 실행한다 (타이머가 부르거나, 바로 결과가 필요할 때 직접 부른다)
+        self.timer.stop()
+        if self.cells_dirty:
+            self.cells_dirty = False
+            self.performed['cells'] += 1
+            self.update_cells()
+        if self.info_dirty:
+            self.info_dirty = False
+            self.performed['info'] += 1
+            self.update_info()
+
+    def saved(self):
+        return {kind: self.requested[kind] - self.performed[kind] for kind in self.requested}
+
+    def report(self):
+        for kind in self.requested:
+            print(f"refresh {kind}: {self.requested[kind]} requested, {self.performed[kind]} performed, "
+                  f"{self.requested[kind] - self.performed[kind]} saved")
 
 
-    
 class WorkHoursManager(QMainWindow):
-    def __init__(self):
+    def __init__(self, db_path=DB_PATH):
         super().__init__()
 
         self.setWindowTitle("Work Hours Manager")
 
         self.load_window_settings()
 
-        self.init_db()
+        self.init_db(db_path)
 
-        self.calendar = WorkCalendar(self)
+        self.calendar = WorkCalendar(self.store, self)
         self.calendar.setGridVisible(True)
+        self.refresh = RefreshScheduler(self.update_info, self.calendar.updateCells, self)
 
         self.label = QLabel(self)
         self.label.setText("Select a date")
 
         self.work_type_combo = QComboBox(self)  # 근무 유형 드롭다운 추가
-        self.work_type_combo.addItem("일반근무")
-        self.work_type_combo.addItem("재택근무")
-        self.work_type_combo.addItem("연/월차")
-        self.work_type_combo.addItem("오전반차")
-        self.work_type_combo.addItem("오후반차")
-        self.work_type_combo.addItem("출장")
-        self.work_type_combo.addItem("교육")
-        self.work_type_combo.addItem("기타")
+        self.work_type_combo.addItems(WORK_TYPES)
         self.work_type_combo.setStyleSheet("QComboBox:focus { border: 1px solid lightgray; }")
 
         self.start_time_combo = QComboBox(self)
@@ -213,6 +583,8 @@ class WorkHoursManager(QMainWindow):
         self.balance_label = QLabel("여유 시간: 0")
         self.remaining_days_label = QLabel("남은 연/월차: 0")
         self.Required_label = QLabel("이번 달 필수시간: 0")
+        self.quarter_required_label = QLabel("이번 분기 필수시간: 0")
+        self.ytd_required_label = QLabel("올해 누적 필수시간: 0")
 
         # 연도와 달을 선택할 수 있는 드롭다운 메뉴 추가
         self.year_combo = QComboBox(self)
@@ -292,33 +664,155 @@ class WorkHoursManager(QMainWindow):
         info_layout.addWidget(self.total_hours_label, 1, 1)  # 총 근무시간 왼쪽아래
         info_layout.addWidget(self.balance_label, 0, 0)  # 밸런스 오른쪽 위
         info_layout.addWidget(self.remaining_days_label, 1, 0)  # 남은 휴가일수 오른쪽 아래
+        info_layout.addWidget(self.quarter_required_label, 2, 0)  # 분기 필수시간
+        info_layout.addWidget(self.ytd_required_label, 2, 1)  # 1월부터 이번 달까지 필수시간
 
         info_group_box.setLayout(info_layout)
 
+        # 연간 요약: 달마다 근무시간/필수시간/여유 시간 (monthly_summary 테이블에서 읽는다)
+        self.year_group_box = QGroupBox("올해 근무 현황")
+        self.year_table = QTableWidget(3, 13, self)
+        self.year_table.setHorizontalHeaderLabels([f"{month}월" for month in range(1, 13)] + ["합계"])
+        self.year_table.setVerticalHeaderLabels(["근무", "필수", "여유"])
+        self.year_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.year_table.setSelectionMode(QAbstractItemView.NoSelection)
+        self.year_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.year_table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        self.year_table.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.year_table.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        font = self.year_table.font()
+        font.setPointSizeF(font.pointSizeF() * 0.85)
+        self.year_table.setFont(font)
+        for row in range(3):
+            for column in range(13):
+                item = QTableWidgetItem("")
+                item.setTextAlignment(Qt.AlignCenter)
+                self.year_table.setItem(row, column, item)
+        self.year_table.resizeRowsToContents()
+        self.year_table.setFixedHeight(self.year_table.horizontalHeader().sizeHint().height()
+                                       + self.year_table.verticalHeader().length()
+                                       + 2 * self.year_table.frameWidth())
+        year_layout = QVBoxLayout()
+        year_layout.addWidget(self.year_table)
+        self.year_group_box.setLayout(year_layout)
+
 
 
         # 레이아웃을 메인 레이아웃에 추가
         main_layout.addWidget(input_group_box)
         main_layout.addWidget(holiday_group_box)
         main_layout.addWidget(info_group_box)
+        main_layout.addWidget(self.year_group_box)
 
         container = QWidget()
         container.setLayout(main_layout)
         self.setCentralWidget(container)
 
+        # 파일 메뉴
+        file_menu = self.menuBar().addMenu("파일")
+        import_action = file_menu.addAction("근무 기록 가져오기...")
+        import_action.triggered.connect(self.import_attendance)
+        holiday_import_action = file_menu.addAction("휴일 가져오기 (.ics)...")
+        holiday_import_action.triggered.connect(self.import_holidays)
+        file_menu.addSeparator()
+        export_month_action = file_menu.addAction("이번 달 내보내기...")
+        export_month_action.triggered.connect(lambda: self.export_report('month'))
+        export_year_action = file_menu.addAction("올해 내보내기...")
+        export_year_action.triggered.connect(lambda: self.export_report('year'))
+        view_menu = self.menuBar().addMenu("보기")
+        year_action = view_menu.addAction("연간 보기...")
+        year_action.triggered.connect(self.open_year_overview)
+
   
 
         self.calendar.clicked[QDate].connect(self.show_date)
         self.calendar.currentPageChanged.connect(self.on_page_changed)  # 달력 페이지가 변경될 때 on_page_changed 호출
 
         self.show_date(self.calendar.selectedDate())
-        self.load_remaining_leave()
 
 
     def open_settings(self):
         settings_dialog = SettingsDialog(self)
         settings_dialog.exec_()
 
+    @instrumented('handler')
+    def open_year_overview(self):
+        dialog = YearOverviewDialog(self.store, self.calendar.selectedDate().year(), self)
+        dialog.heatmap.dayClicked.connect(self.go_to_date)
+        dialog.show()
+
+    @instrumented('handler')
+    def go_to_date(self, date):
+        # 페이지 변경 핸들러는 1일을 고르므로 잠시 떼어 두고 그 날짜를 한 번만 고른다 (앞뒤 달 미리 읽기는 그대로 돈다)
+        for combo in (self.year_combo, self.month_combo):
+            combo.blockSignals(True)
+        self.year_combo.setCurrentText(str(date.year()))
+        self.month_combo.setCurrentIndex(date.month() - 1)
+        for combo in (self.year_combo, self.month_combo):
+            combo.blockSignals(False)
+        self.calendar.currentPageChanged.disconnect(self.on_page_changed)
+        try:
+            self.calendar.setSelectedDate(date)
+        finally:
+            self.calendar.currentPageChanged.connect(self.on_page_changed)
+        self.show_date(date)
+
+    def import_attendance(self):
+        path, _ = QFileDialog.getOpenFileName(self, "근무 기록 가져오기", "", "Attendance (*.csv *.json *.jsonl)")
+        if not path:
+            return
+        try:
+            imported, errors = import_attendance(self.store, path, skip_invalid=True)
+        except (AttendanceImportError, OSError) as e:
+            QMessageBox.warning(self, "Import", str(e))
+            return
+        self.refresh.request_cells()
+        self.refresh.request_info()
+        message = f"{imported}건을 가져왔습니다."
+        if errors:
+            message += f"\n건너뛴 줄 {len(errors)}개:\n" + "\n".join(errors[:10])
+        QMessageBox.information(self, "Import", message)
+
+    def import_holidays(self):
+        path, _ = QFileDialog.getOpenFileName(self, "휴일 가져오기", "", "iCalendar (*.ics)")
+        if not path:
+            return
+        try:
+            imported, errors = import_holidays(self.store, path, skip_invalid=True)
+        except (HolidayImportError, OSError) as e:
+            QMessageBox.warning(self, "Import", str(e))
+            return
+        self.refresh.request_cells()
+        self.refresh.request_info()
+        message = f"휴일 {imported}일을 가져왔습니다."
+        if errors:
+            message += f"\n건너뛴 일정 {len(errors)}개:\n" + "\n".join(errors[:10])
+        QMessageBox.information(self, "Import", message)
+
+    def export_report(self, period):
+        # 범위를 골라 두었으면 그 범위, 아니면 선택한 날짜의 달 또는 해 전체
+        selected = self.calendar.selectedDate()
+        selected_range = self.calendar.selected_range()
+        if selected_range:
+            first, last = (day.toString("yyyy-MM-dd") for day in selected_range)
+        elif period == 'month':
+            first = QDate(selected.year(), selected.month(), 1)
+            first, last = first.toString("yyyy-MM-dd"), first.addMonths(1).addDays(-1).toString("yyyy-MM-dd")
+        else:
+            first, last = f"{selected.year():04}-01-01", f"{selected.year():04}-12-31"
+        path, selected_filter = QFileDialog.getSaveFileName(self, "내보내기", f"work_hours_{first}_{last}.xlsx",
+                                                            "Excel (*.xlsx);;CSV (*.csv)")
+        if not path:
+            return
+        fmt = 'csv' if selected_filter.startswith('CSV') or path.lower().endswith('.csv') else 'xlsx'
+        try:
+            count = export_report(self.db, path, first, last, fmt)
+        except (ExportError, OSError) as e:
+            QMessageBox.warning(self, "Export", str(e))
+            return
+        self.label.setText(f"Exported {count} rows: {first} ~ {last}")
+
+    @instrumented('handler')
     def show_prev_month(self):
         current_date = self.calendar.selectedDate()
         prev_month_date = current_date.addMonths(-1)
@@ -328,6 +822,7 @@ class WorkHoursManager(QMainWindow):
         self.calendar.showSelectedDate()
         self.update_calendar()
 
+    @instrumented('handler')
     def show_next_month(self):
         current_date = self.calendar.selectedDate()
         next_month_date = current_date.addMonths(1)
@@ -337,19 +832,21 @@ class WorkHoursManager(QMainWindow):
         self.calendar.showSelectedDate()
         self.update_calendar()
 
+    @instrumented('handler')
     def update_calendar(self):
         year = int(self.year_combo.currentText())
         month = self.month_combo.currentIndex() + 1
         new_date = QDate(year, month, 1)
         self.calendar.setSelectedDate(new_date)
         self.calendar.showSelectedDate()
-        self.update_info()
+        self.refresh.request_info()
 
 
+    @instrumented('handler')
     def show_current_month(self):
         self.calendar.setSelectedDate(QDate.currentDate())
         self.calendar.showSelectedDate()
-        self.update_info()  # 현재 달로 이동 시 정보 업데이트
+        self.refresh.request_info()  # 현재 달로 이동 시 정보 업데이트
 
     def load_window_settings(self):
         settings = QSettings('MyCompany', 'WorkHoursManager')
@@ -361,24 +858,62 @@ class WorkHoursManager(QMainWindow):
         settings.setValue('windowSize', self.size())
         settings.setValue('windowPos', self.pos())
 
-    def init_db(self):
-        db_path = 'work_hours.db'
-        db_exists = os.path.exists(db_path)
-        self.conn = sqlite3.connect(db_path)
-        self.cursor = self.conn.cursor()
-        if not db_exists:
-            queries = [
-                'Create tables',
-                'Create holidays table',
-                'Create settings table'
-            ]
-            for query_name in queries:
-                query = load_query(query_name)
-                self.cursor.execute(query)
-            self.conn.commit()
-
+    def init_db(self, db_path=DB_PATH):
+        self.db = Database(db_path)
+        self.store = WorkHoursStore(self.db)
+        # 저장/삭제 클릭은 캐시만 고치고 바로 돌아오며, 커밋은 쓰기 스레드가 모아서 한다
+        self.writer_signals = WriterSignals(self)
+        self.writer_signals.failed.connect(self.on_write_failed)
+        self.writer_signals.committed.connect(lambda count: self.refresh.request_info())  # 연간 요약을 커밋된 값으로
+        self.db.writer = BackgroundWriter(self.db, on_commit=self.writer_signals.committed.emit,
+                                          on_error=lambda error, ops: self.writer_signals.failed.emit(str(error)))
+        # 로컬 API 서버가 쓴 변경은 알림을 받아 그 달만 다시 읽는다
+        self.api_events = ApiEventListener(parent=self)
+        self.api_events.changed.connect(self.on_api_change)
+        self.api_events.connected.connect(self.on_api_connected)
+        self.api_events.start()
+        # 그 밖의 프로세스가 쓴 변경은 1초마다 data_version을 보고 바뀐 날만 다시 읽는다
+        self.external_changes = ExternalChangeWatcher(self.store, self)
+        self.external_changes.changed.connect(self.on_external_change)
+        self.external_changes.start()
+
+    @instrumented('handler')
+    def on_api_change(self, event):
+        date = event.get('date')
+        if date:
+            if event.get('type') == 'holiday':
+                self.store.workdays.invalidate(date)
+            self.store.reload_months([(int(date[:4]), int(date[5:7]))])
+        self.store.remaining_leave = self.store.load_remaining_leave()
+        self.refresh.request_cells()
+        self.refresh.request_info()
+
+    def on_external_change(self):
+        self.refresh.request_cells()
+        self.refresh.request_info()
+
+    def on_api_connected(self):
+        self.store.reload()
+        self.store.workdays.clear()
+        self.refresh.request_cells()
+        self.refresh.request_info()
+
+    @instrumented('handler')
+    def on_write_failed(self, message):
+        # 낙관적으로 고친 캐시와 남은 연차를 DB에 실제로 남은 상태로 되돌린다
+        self.store.reload()
+        self.refresh.request_cells()
+        self.refresh.request_info()
+        self.label.setText(f"저장하지 못했습니다: {message}")
+        QMessageBox.warning(self, "Database error", message)
+
+    @instrumented('handler')
     def show_date(self, date):
         formatted_date = date.toString("yyyy-MM-dd dddd")
+        selected_range = self.calendar.selected_range()
+        if selected_range:
+            first, last = selected_range
+            formatted_date = f"{first.toString('yyyy-MM-dd')} ~ {last.toString('yyyy-MM-dd')} (주말/휴일 제외)"
         self.label.setText(formatted_date)
 
         start_time, end_time, work_type = self.load_work_hours(date)
@@ -389,18 +924,15 @@ class WorkHoursManager(QMainWindow):
         holiday_desc = self.load_holiday_description(date)
         self.holiday_desc.setText(holiday_desc if holiday_desc else "")
 
-        self.update_info()  # 날짜를 표시할 때마다 정보 업데이트
+        self.refresh.request_info()  # 날짜를 표시할 때마다 정보 업데이트
 
     def load_holiday_description(self, date):
-        date_str = date.toString("yyyy-MM-dd")
-        query = load_query('Select holiday description for a specific date')
-        self.cursor.execute(query, (date_str,))
-        result = self.cursor.fetchone()
-        return result[0] if result else None
+        return self.store.holiday_description(date.toString("yyyy-MM-dd"))
 
 
 
 
+    @instrumented('handler')
     def on_page_changed(self):
         selected_date = self.calendar.selectedDate()
         year = selected_date.year()
@@ -408,185 +940,92 @@ class WorkHoursManager(QMainWindow):
         
         first_day_of_month = QDate(year, month, 1)
         self.calendar.setSelectedDate(first_day_of_month)
-        self.update_info()  # 페이지가 변경될 때 정보 업데이트
+        self.refresh.request_info()  # 페이지가 변경될 때 정보 업데이트
 
+    @instrumented('handler')
     def save_work_hours(self):
         date = self.calendar.selectedDate().toString("yyyy-MM-dd")
         work_type = self.work_type_combo.currentText()
         start_time = self.start_time_combo.currentText()
         end_time = self.end_time_combo.currentText()
-        if date and start_time and end_time:
-            previous_work_type = self.load_work_hours(self.calendar.selectedDate())[2]
-            self.adjust_remaining_leave(previous_work_type, undo=False)  # 이전 근무 타입에 따른 남은 휴가 복원
-
-            query = load_query('Insert or replace work hours')
-            self.cursor.execute(query, (date, start_time, end_time, work_type))
-            self.conn.commit()
-            self.calendar.load_work_hours()
-            self.calendar.updateCells()
-
-            # balance와 모든 근무일에 근무시간이 등록되었는지 확인
-            balance, all_days_worked = self.update_balance_and_leave()
-            if all_days_worked and balance >= 0 and date not in self.calendar.holidays:
-                self.adjust_remaining_leave("increment")
-
+        selected_range = self.calendar.selected_range()
+        if selected_range and start_time and end_time:
+            # 범위의 근무일 전체를 한 번에 등록 (연차/여유 시간도 한 번만 다시 계산)
+            first, last = (day.toString("yyyy-MM-dd") for day in selected_range)
+            count = self.store.save_range(first, last, start_time, end_time, work_type)
+            self.refresh.request_cells()
+            self.label.setText(f"Saved {count} days: {first} ~ {last} - {work_type} - {start_time} to {end_time}")
+            self.refresh.request_info()
+        elif date and start_time and end_time:
+            self.store.save_entry(date, start_time, end_time, work_type)
+            self.refresh.request_cells()
             self.label.setText(f"Saved: {date} - {work_type} - {start_time} to {end_time}")
-
-            self.adjust_remaining_leave(work_type, undo=True)  # 새 근무 타입에 따른 남은 휴가 반영
-
-            self.update_info()
+            self.refresh.request_info()
 
 
+    @instrumented('handler')
     def delete_work_hours(self):
         date = self.calendar.selectedDate().toString("yyyy-MM-dd")
-        previous_work_type = self.load_work_hours(self.calendar.selectedDate())[2]
-        if date:
-            # balance와 모든 근무일에 근무시간이 등록되었는지 확인
-            balance, all_days_worked = self.update_balance_and_leave()
-            if all_days_worked and balance >= 0 and date not in self.calendar.holidays:
-                self.adjust_remaining_leave("decrement")
-
-            query = load_query('Delete work hours')
-            self.cursor.execute(query, (date,))
-            self.conn.commit()
-            self.calendar.load_work_hours()
-            self.calendar.work_hours.pop(date, None)  # 즉시 삭제 반영
-            self.calendar.work_types.pop(date, None)  # 근무 유형도 삭제 반영
-            self.calendar.updateCells()  # UI 즉시 갱신
+        selected_range = self.calendar.selected_range()
+        if selected_range:
+            first, last = (day.toString("yyyy-MM-dd") for day in selected_range)
+            count = self.store.delete_range(first, last)
+            self.refresh.request_cells()
+            self.label.setText(f"Deleted work hours for {count} days: {first} ~ {last}")
+            self.refresh.request_info()
+        elif date:
+            self.store.delete_entry(date)
+            self.refresh.request_cells()  # UI 즉시 갱신
             self.label.setText(f"Deleted work hours for {date}")
-
-            self.adjust_remaining_leave(previous_work_type, undo=False)  # 이전 근무 타입에 따른 남은 휴가 복원
-
-            self.update_info()
+            self.refresh.request_info()
 
 
     def adjust_remaining_leave(self, work_type, undo=False):
-        current_leave = float(self.remaining_days_label.text().split(":")[1].strip())
-        adjustment = 0
-        if work_type == "연/월차":
-            adjustment = 1
-        elif work_type == "오전반차" or work_type == "오후반차":
-            adjustment = 0.5
-        elif work_type == "increment":
-            adjustment = 1
-        elif work_type == "decrement":
-            adjustment = -1
-
-        if undo:
-            adjustment = -adjustment
-
-        new_leave = current_leave + adjustment
-        self.update_remaining_leave(new_leave)
+        self.store.adjust_remaining_leave(work_type, undo)
+        self.remaining_days_label.setText(f"남은 연/월차: {format_number(self.store.remaining_leave)}")
 
 
     def update_balance_and_leave(self):
         selected_date = self.calendar.selectedDate()
-        year = selected_date.year()
-        month = selected_date.month()
-
-        current_month_hours = {
-            date: hours for date, hours in self.calendar.work_hours.items()
-            if QDate.fromString(date, "yyyy-MM-dd").year() == year and QDate.fromString(date, "yyyy-MM-dd").month() == month
-        }
-
-        total_hours = sum(current_month_hours.values())
-        work_days = self.calendar.get_work_days_in_current_month(year, month)
-
-        # balance 계산
-        balance = 0
-        for date, hours in current_month_hours.items():
-            qdate = QDate.fromString(date, "yyyy-MM-dd")
-            if date in self.calendar.holidays or qdate.dayOfWeek() in (6, 7):  # 휴일 및 주말 근무 시간
-                balance += hours
-            else:
-                balance += (hours - 8) if hours != 0 else -8
-
-        # 근무 시간이 등록된 근무일 수 계산
-        workdays_with_hours = len([date for date in current_month_hours if QDate.fromString(date, "yyyy-MM-dd").dayOfWeek() not in (Qt.Saturday, Qt.Sunday) and date not in self.calendar.holidays])
-
-        all_days_worked = workdays_with_hours == work_days
-
-        return balance, all_days_worked
+        summary = self.store.month_summary(selected_date.year(), selected_date.month())
+        return summary.balance, summary.all_days_worked
 
     def load_work_hours(self, date):
-        date_str = date.toString("yyyy-MM-dd")  # QDate 객체를 문자열로 변환
-        query = load_query('Select work hours for a specific date')
-        self.cursor.execute(query, (date_str,))
-        result = self.cursor.fetchone()
-        return result if result else (None, None, None)
-    
+        return self.store.get_entry(date.toString("yyyy-MM-dd"))  # QDate 객체를 문자열로 변환
+
+    @instrumented('handler')
     def add_holiday(self):
         date = self.calendar.selectedDate().toString("yyyy-MM-dd")
         description = self.holiday_desc.text() or "Holiday"  # 설명 필드가 비어있을 경우 기본값 설정
-        
+
         if date:
-            # 현재 상태에서 balance와 모든 근무일에 근무시간이 등록되었는지 확인
-            previous_balance, was_all_days_worked = self.update_balance_and_leave()
-
-            query = load_query('Insert or replace holiday')
-            self.cursor.execute(query, (date, description))
-            self.conn.commit()
-            self.calendar.holidays = self.calendar.load_holidays()
-            self.calendar.updateCells()
+            self.store.add_holiday(date, description)
+            self.refresh.request_cells()
             self.label.setText(f"Added holiday: {description} on {date}")
+            self.refresh.request_info()  # add_holiday 후에 정보 업데이트
 
-            # 휴일 추가 후 상태에서 balance와 모든 근무일에 근무시간이 등록되었는지 확인
-            current_balance, all_days_worked = self.update_balance_and_leave()
-            if all_days_worked and current_balance >= 0 and not was_all_days_worked:
-                self.adjust_remaining_leave("increment")  # 남은 휴가일 수 증가
-
-            self.update_info()  # add_holiday 후에 정보 업데이트
-
+    @instrumented('handler')
     def remove_holiday(self):
         date = self.calendar.selectedDate().toString("yyyy-MM-dd")
-        
+
         if date:
-            # 현재 상태에서 balance와 모든 근무일에 근무시간이 등록되었는지 확인
-            previous_balance, was_all_days_worked = self.update_balance_and_leave()
-
-            query = load_query('Delete holiday')
-            self.cursor.execute(query, (date,))
-            self.conn.commit()
-            self.calendar.holidays = self.calendar.load_holidays()
-            self.calendar.updateCells()
+            self.store.remove_holiday(date)
+            self.refresh.request_cells()
             self.label.setText(f"Removed holiday on {date}")
-
-            # 휴일 삭제 후 상태에서 balance와 모든 근무일에 근무시간이 등록되었는지 확인
-            current_balance, all_days_worked = self.update_balance_and_leave()
-            if not all_days_worked and was_all_days_worked and previous_balance >= 0:
-                self.adjust_remaining_leave("decrement")  # 남은 휴가일 수 감소
-
-            self.update_info()  # remove_holiday 후에 정보 업데이트
+            self.refresh.request_info()  # remove_holiday 후에 정보 업데이트
 
     def format_number(value):
         return f"{value:.2f}".rstrip('0').rstrip('.') if '.' in f"{value:.2f}" else f"{value:.2f}"
 
 
 
+    @instrumented('refresh')
     def update_info(self):
         selected_date = self.calendar.selectedDate()
-        year = selected_date.year()
-        month = selected_date.month()
-
-        # 현재 달에 해당하는 work_hours 필터링
-        current_month_hours = {
-            date: hours for date, hours in self.calendar.work_hours.items()
-            if QDate.fromString(date, "yyyy-MM-dd").year() == year and QDate.fromString(date, "yyyy-MM-dd").month() == month
-        }
-
-        total_hours = sum(current_month_hours.values())
-        work_days = self.calendar.get_work_days_in_current_month(year, month)
-
-        # balance 계산 수정
-        balance = 0
-        for date, hours in current_month_hours.items():
-            qdate = QDate.fromString(date, "yyyy-MM-dd")
-            if date in self.calendar.holidays or qdate.dayOfWeek() in (6, 7):  # 휴일 및 주말 근무 시간
-                balance += hours
-            else:
-                balance += (hours - 8) if hours != 0 else -8
-
-        required = work_days * 8
+        summary = self.store.month_summary(selected_date.year(), selected_date.month())
+        total_hours = summary.total_hours
+        balance = summary.balance
+        required = summary.required
 
         # balance 색상 설정
         balance_text = f"{balance:.2f}" if balance % 1 != 0 else f"{balance:.0f}"
@@ -597,57 +1036,56 @@ class WorkHoursManager(QMainWindow):
 
         self.total_hours_label.setText(f"이번 달 근무시간: {total_hours:.2f}" if total_hours % 1 != 0 else f"이번 달 근무시간: {total_hours:.0f}")
         self.Required_label.setText(f"이번 달 필수시간: {required:.2f}" if required % 1 != 0 else f"이번 달 필수시간: {required:.0f}")
-        self.remaining_days_label.setText(f"남은 연/월차: {format_number(self.load_remaining_leave())}")
+        self.remaining_days_label.setText(f"남은 연/월차: {format_number(self.store.remaining_leave)}")
+
+        year, month = selected_date.year(), selected_date.month()
+        quarter_required = self.store.workdays.quarter_required_hours(year, month)
+        ytd_required = self.store.workdays.year_to_date_required_hours(year, month)
+        self.quarter_required_label.setText(f"이번 분기 필수시간: {quarter_required}")
+        self.ytd_required_label.setText(f"올해 누적 필수시간: {ytd_required}")
+        self.update_year_overview(year)
+
+    @instrumented('refresh')
+    def update_year_overview(self, year):
+        self.year_group_box.setTitle(f"{year}년 근무 현황")
+        summaries = self.store.year_summaries(year)
+        totals = [sum(summary.total_hours for summary in summaries),
+                  sum(summary.required for summary in summaries),
+                  sum(summary.balance for summary in summaries)]
+        for column, summary in enumerate(summaries + [None]):
+            values = totals if summary is None else (summary.total_hours, summary.required, summary.balance)
+            for row, value in enumerate(values):
+                item = self.year_table.item(row, column)
+                item.setText(format_number(round(value, 1)))
+                if row == 2:
+                    item.setForeground(RED if value < 0 else BLUE)
 
 
     def load_remaining_leave(self):
-        try:
-            conn = sqlite3.connect('work_hours.db')
-            cursor = conn.cursor()
-            query = load_query('Select remaining leave')
-            cursor.execute(query)
-            result = cursor.fetchone()
-            conn.close()
-            if result:
-                return float(result[0])
-            else:
-                return 0.0
-        except sqlite3.Error as e:
-            print(f"Database error: {e}")
-            return 0.0
+        return self.store.remaining_leave
 
 
+    @instrumented('handler')
     def update_remaining_leave(self, remaining_leave):
         remaining_leave = float(remaining_leave)  # 문자열을 float으로 변환
         self.remaining_days_label.setText(f"남은 연/월차: {format_number(remaining_leave)}")
-        try:
-            conn = sqlite3.connect('work_hours.db')
-            cursor = conn.cursor()
-            query = load_query('Insert or replace remaining leave')
-            cursor.execute(query, (remaining_leave,))
-            conn.commit()
-            conn.close()
-        except sqlite3.Error as e:
-            print(f"Database error: {e}")
+        self.store.set_remaining_leave(remaining_leave)
 
 
     def closeEvent(self, event):
         self.save_window_settings()
-        self.conn.close()
+        self.refresh.flush()
+        self.refresh.stop()
+        self.writer_signals.committed.disconnect()
+        self.writer_signals.failed.disconnect()
+        self.api_events.stop()
+        self.external_changes.stop()
+        if self.refresh.report_enabled:
+            self.refresh.report()
+        self.db.close()  # 쓰기 스레드에 남은 변경을 모두 커밋한 뒤 닫는다
         event.accept()
 
 
-def load_query(query_name):
-    with open('queries.sql', 'r') as file:
-        queries = file.read().split(';')
-        query_dict = {}
-        for query in queries:
-            if query.strip():
-                lines = query.strip().split('\n')
-                name = lines[0].strip().lstrip('-- ')
-                query_dict[name] = '\n'.join(lines[1:]).strip()
-        return query_dict[query_name]
-    
 class SettingsDialog(QDialog):
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -682,31 +1120,30 @@ class SettingsDialog(QDialog):
         reset_layout.addWidget(self.reset_button)
         reset_group_box.setLayout(reset_layout)
 
+        settings_tab = QWidget()
+        settings_tab.setLayout(main_layout)
         main_layout.addWidget(leave_group_box)
         main_layout.addWidget(reset_group_box)
 
-        self.setLayout(main_layout)
+        tabs = QTabWidget(self)
+        tabs.addTab(settings_tab, "설정")
+        tabs.addTab(PerformancePanel(parent.calendar if parent else None, self), "Performance")
+        dialog_layout = QVBoxLayout()
+        dialog_layout.addWidget(tabs)
+        self.setLayout(dialog_layout)
 
     def save_settings(self):
         # 설정 저장 로직을 여기에 추가
         remaining_leave = self.remaining_leave_input.text()
         try:
             remaining_leave = float(remaining_leave)  # 문자열을 float으로 변환
-            conn = sqlite3.connect('work_hours.db')
-            cursor = conn.cursor()
-            query = load_query('Insert or replace remaining leave')
-            cursor.execute(query, (remaining_leave,))
-            conn.commit()
-            conn.close()
-            print(f"Remaining leave days saved: {remaining_leave}")
 
-            # 부모 윈도우의 remaining leave 업데이트
+            # 부모 윈도우의 remaining leave 업데이트 (DB에도 저장된다)
             self.parent.update_remaining_leave(remaining_leave)
+            print(f"Remaining leave days saved: {remaining_leave}")
 
         except ValueError as e:
             print(f"Value error: {e}")
-        except sqlite3.Error as e:
-            print(f"Database error: {e}")
 
         self.accept()
 
@@ -719,29 +1156,12 @@ class SettingsDialog(QDialog):
             self.reset_data()
 
     def reset_data(self):
-        # 데이터베이스 초기화 로직
-        conn = sqlite3.connect('work_hours.db')
-        cursor = conn.cursor()
-
-        # Drop tables
-        cursor.execute(load_query('Drop work_hours table'))
-        cursor.execute(load_query('Drop holidays table'))
-        cursor.execute("DROP TABLE IF EXISTS settings")
-
-        # Recreate tables
-        cursor.execute(load_query('Create tables'))
-        cursor.execute(load_query('Create holidays table'))
-        cursor.execute(load_query('Create settings table'))
-
-        conn.commit()
-        conn.close()
+        # 데이터베이스 초기화 (테이블을 지우고 다시 만든 뒤 캐시도 비운다)
+        self.parent.store.reset()
         print("Data has been reset.")
 
         # 부모 윈도우의 달력 갱신
-        self.parent.calendar.work_hours.clear()
-        self.parent.calendar.holidays.clear()
-        self.parent.calendar.work_types.clear()
-        self.parent.calendar.updateCells()
+        self.parent.refresh.request_cells()
 
         # 남은 휴가일 수 초기화
         self.parent.update_remaining_leave(0.0)
@@ -752,23 +1172,83 @@ class SettingsDialog(QDialog):
 
 
 
+class PerformancePanel(QWidget):
+    # perf.PERF가 모은 시간을 항목별 백분위로 보여준다 (밀리초, paint: cells per batch만 칸 수)
+    COLUMNS = ["항목", "호출", "합계", "p50", "p90", "p99", "최대"]
+
+    def __init__(self, calendar=None, parent=None):
+        super().__init__(parent)
+        self.calendar = calendar
+        self.enabled_check = QCheckBox("계측 켜기 (SQL, 정보 갱신, 달력 그리기, 핸들러)")
+        self.enabled_check.setChecked(PERF.enabled)
+        self.enabled_check.toggled.connect(self.set_enabled)
+
+        self.table = QTableWidget(0, len(self.COLUMNS), self)
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.verticalHeader().setVisible(False)
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        for column in range(1, len(self.COLUMNS)):
+            self.table.horizontalHeader().setSectionResizeMode(column, QHeaderView.ResizeToContents)
+
+        refresh_button = QPushButton("새로고침")
+        refresh_button.clicked.connect(self.refresh)
+        reset_button = QPushButton("초기화")
+        reset_button.clicked.connect(self.reset)
+        dump_button = QPushButton("파일로 저장...")
+        dump_button.clicked.connect(self.dump)
+        button_layout = QHBoxLayout()
+        button_layout.addWidget(refresh_button)
+        button_layout.addWidget(reset_button)
+        button_layout.addStretch()
+        button_layout.addWidget(dump_button)
+
+        layout = QVBoxLayout()
+        layout.addWidget(self.enabled_check)
+        layout.addWidget(self.table)
+        layout.addLayout(button_layout)
+        self.setLayout(layout)
+        self.setMinimumWidth(560)
+        self.refresh()
+
+    def set_enabled(self, enabled):
+        PERF.enabled = enabled
+        self.refresh()
+
+    def refresh(self):
+        if self.calendar is not None:
+            self.calendar.flush_paint_batch()
+        rows = PERF.stats()
+        self.table.setRowCount(len(rows))
+        for row, values in enumerate(rows):
+            texts = [values[0], str(values[1])] + [f"{value:.3f}" for value in values[2:]]
+            for column, text in enumerate(texts):
+                item = QTableWidgetItem(text)
+                if column:
+                    item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                self.table.setItem(row, column, item)
+
+    def reset(self):
+        PERF.reset()
+        self.refresh()
+
+    def dump(self):
+        path, _ = QFileDialog.getSaveFileName(self, "성능 기록 저장", "work_hours_perf.json", "JSON (*.json)")
+        if not path:
+            return
+        if self.calendar is not None:
+            self.calendar.flush_paint_batch()
+        try:
+            PERF.dump(path)
+        except OSError as e:
+            QMessageBox.warning(self, "Performance", str(e))
+
+
 # WorkHoursManager 클래스에서 SettingsDialog를 열 때 부모를 전달
 def open_settings(self):
     settings_dialog = SettingsDialog(self)
     settings_dialog.exec_()
 
-def load_query(query_name):
-    with open('queries.sql', 'r') as file:
-        queries = file.read().split(';')
-        query_dict = {}
-        for query in queries:
-            if query.strip():
-                lines = query.strip().split('\n')
-                name = lines[0].strip().lstrip('-- ')
-                query_dict[name] = '\n'.join(lines[1:]).strip()
-        return query_dict[query_name]
-
-
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
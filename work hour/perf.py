@@ -0,0 +1,116 @@
+import functools
+import inspect
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+
+# 켜두면 SQL 실행, update_info, paintCell 묶음, WorkHoursManager 핸들러마다 걸린 시간을 모은다.
+# 꺼져 있으면 호출마다 PERF.enabled 확인 한 번만 한다. 설정 > Performance 탭에서 켜고 끌 수 있다.
+
+
+class PerfRecorder:
+    def __init__(self, enabled=False, max_samples=4096):
+        self.enabled = enabled
+        self.max_samples = max_samples  # 항목마다 최근 표본만 남긴다 (백분위 계산용)
+        self.samples = {}  # '분류: 이름' -> deque(밀리초)
+        self.counts = {}
+        self.totals = {}
+        self.lock = threading.Lock()  # 쓰기 스레드에서도 기록한다
+        self.started_at = time.time()
+
+    def record(self, category, name, elapsed_ms):
+        key = f"{category}: {name}"
+        with self.lock:
+            samples = self.samples.get(key)
+            if samples is None:
+                samples = self.samples[key] = deque(maxlen=self.max_samples)
+                self.counts[key] = 0
+                self.totals[key] = 0.0
+            samples.append(elapsed_ms)
+            self.counts[key] += 1
+            self.totals[key] += elapsed_ms
+
+    def timer(self, category, name):
+        return PerfTimer(self, category, name)
+
+    def reset(self):
+        with self.lock:
+            self.samples.clear()
+            self.counts.clear()
+            self.totals.clear()
+            self.started_at = time.time()
+
+    def stats(self):
+        # (항목, 호출 수, 합계, p50, p90, p99, 최대) 목록, 합계가 큰 순서. 백분위는 최근 표본 기준.
+        with self.lock:
+            snapshot = [(key, self.counts[key], self.totals[key], sorted(samples))
+                        for key, samples in self.samples.items()]
+        rows = []
+        for key, count, total, samples in snapshot:
+            rows.append((key, count, total, percentile(samples, 50), percentile(samples, 90),
+                         percentile(samples, 99), samples[-1]))
+        rows.sort(key=lambda row: row[2], reverse=True)
+        return rows
+
+    def dump(self, path):
+        fields = ('name', 'count', 'total_ms', 'p50_ms', 'p90_ms', 'p99_ms', 'max_ms')
+        report = {
+            'started_at': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(self.started_at)),
+            'dumped_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'entries': [dict(zip(fields, (row[0], row[1], *(round(value, 4) for value in row[2:]))))
+                        for row in self.stats()],
+        }
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(report, file, indent=2, ensure_ascii=False)
+
+
+class PerfTimer:
+    __slots__ = ('recorder', 'category', 'name', 'started')
+
+    def __init__(self, recorder, category, name):
+        self.recorder = recorder
+        self.category = category
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.recorder.record(self.category, self.name, (time.perf_counter() - self.started) * 1000)
+        return False
+
+
+def percentile(sorted_samples, percent):
+    # 가장 가까운 순위 방식
+    if not sorted_samples:
+        return 0.0
+    index = max(0, min(len(sorted_samples) - 1, -(-len(sorted_samples) * percent // 100) - 1))
+    return sorted_samples[int(index)]
+
+
+def instrumented(category):
+    # 메서드를 '분류: 이름'으로 잰다. Qt 시그널이 넘기는 남는 인자(clicked의 checked 등)는
+    # 원래 함수가 받는 개수만큼 잘라서 넘긴다. 꺼져 있을 때 인자 수가 맞는 호출은 플래그만 보고 바로 부른다.
+    def decorate(func):
+        name = func.__name__
+        parameters = inspect.signature(func).parameters.values()
+        varargs = any(parameter.kind == parameter.VAR_POSITIONAL for parameter in parameters)
+        positional = sys.maxsize if varargs else func.__code__.co_argcount
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not PERF.enabled:
+                if len(args) <= positional:
+                    return func(*args, **kwargs)
+                return func(*args[:positional], **kwargs)
+            with PERF.timer(category, name):
+                return func(*args[:positional], **kwargs)
+        return wrapper
+    return decorate
+
+
+PERF = PerfRecorder(enabled=os.environ.get('WORK_HOURS_PERF') == '1')
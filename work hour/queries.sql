@@ -1,14 +1,16 @@
 -- Create tables
 CREATE TABLE IF NOT EXISTS work_hours (
-    date TEXT PRIMARY KEY,
-    start_time TEXT,
-    end_time TEXT,
+    day INTEGER PRIMARY KEY,
+    start_min INTEGER NOT NULL,
+    end_min INTEGER NOT NULL,
+    break_min INTEGER NOT NULL DEFAULT 60,
+    minutes INTEGER NOT NULL,
     work_type TEXT
 );
 
 -- Create holidays table
 CREATE TABLE IF NOT EXISTS holidays (
-    date TEXT PRIMARY KEY,
+    day INTEGER PRIMARY KEY,
     description TEXT
 );
 
@@ -18,38 +20,494 @@ CREATE TABLE IF NOT EXISTS settings (
     value TEXT
 );
 
+-- Create leave ledger table
+CREATE TABLE IF NOT EXISTS leave_ledger (
+    seq INTEGER PRIMARY KEY,
+    recorded_at TEXT NOT NULL DEFAULT (datetime('now', 'localtime')),
+    day INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    amount REAL NOT NULL,
+    balance REAL NOT NULL DEFAULT 0,
+    note TEXT
+);
+
+-- Create leave ledger balance trigger
+CREATE TRIGGER IF NOT EXISTS leave_ledger_running_balance
+AFTER INSERT ON leave_ledger
+BEGIN
+    -- 잔액은 (근무일, seq) 순서의 누적 합이다. 바로 앞 항목의 잔액에 이 항목의 금액을 더해 채우고,
+    -- 지난 날짜로 넣은 항목(가져오기, 동기화, 범위 편집)이면 그 뒤 항목들의 잔액에도 더한다
+    UPDATE leave_ledger
+    SET balance = NEW.amount + COALESCE(
+        (SELECT balance FROM leave_ledger WHERE (day, seq) < (NEW.day, NEW.seq) ORDER BY day DESC, seq DESC LIMIT 1), 0)
+    WHERE seq = NEW.seq;
+    UPDATE leave_ledger
+    SET balance = balance + NEW.amount
+    WHERE (day, seq) > (NEW.day, NEW.seq);
+END;
+
+-- Create leave ledger day index
+CREATE INDEX IF NOT EXISTS leave_ledger_day ON leave_ledger (day, seq);
+
+-- Create monthly summary table
+CREATE TABLE IF NOT EXISTS monthly_summary (
+    year INTEGER NOT NULL,
+    month INTEGER NOT NULL,
+    total_minutes INTEGER NOT NULL DEFAULT 0,
+    entries INTEGER NOT NULL DEFAULT 0,
+    workday_entries INTEGER NOT NULL DEFAULT 0,
+    weekday_holidays INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (year, month)
+) WITHOUT ROWID;
+
+-- Create monthly summary work insert trigger
+CREATE TRIGGER IF NOT EXISTS monthly_summary_work_insert
+AFTER INSERT ON work_hours
+BEGIN
+    INSERT INTO monthly_summary (year, month, total_minutes, entries, workday_entries, weekday_holidays)
+    VALUES (CAST(strftime('%Y', NEW.day + 1721424.5) AS INTEGER), CAST(strftime('%m', NEW.day + 1721424.5) AS INTEGER), NEW.minutes, 1,
+            (((NEW.day - 1) % 7 < 5) AND NOT EXISTS (SELECT 1 FROM holidays WHERE day = NEW.day)), 0)
+    ON CONFLICT (year, month) DO UPDATE SET
+        total_minutes = total_minutes + excluded.total_minutes,
+        entries = entries + excluded.entries,
+        workday_entries = workday_entries + excluded.workday_entries,
+        weekday_holidays = weekday_holidays + excluded.weekday_holidays;
+END;
+
+-- Create monthly summary work update trigger
+CREATE TRIGGER IF NOT EXISTS monthly_summary_work_update
+AFTER UPDATE ON work_hours
+BEGIN
+    INSERT INTO monthly_summary (year, month, total_minutes, entries, workday_entries, weekday_holidays)
+    VALUES (CAST(strftime('%Y', OLD.day + 1721424.5) AS INTEGER), CAST(strftime('%m', OLD.day + 1721424.5) AS INTEGER), -OLD.minutes, -1,
+            -(((OLD.day - 1) % 7 < 5) AND NOT EXISTS (SELECT 1 FROM holidays WHERE day = OLD.day)), 0)
+    ON CONFLICT (year, month) DO UPDATE SET
+        total_minutes = total_minutes + excluded.total_minutes,
+        entries = entries + excluded.entries,
+        workday_entries = workday_entries + excluded.workday_entries,
+        weekday_holidays = weekday_holidays + excluded.weekday_holidays;
+    INSERT INTO monthly_summary (year, month, total_minutes, entries, workday_entries, weekday_holidays)
+    VALUES (CAST(strftime('%Y', NEW.day + 1721424.5) AS INTEGER), CAST(strftime('%m', NEW.day + 1721424.5) AS INTEGER), NEW.minutes, 1,
+            (((NEW.day - 1) % 7 < 5) AND NOT EXISTS (SELECT 1 FROM holidays WHERE day = NEW.day)), 0)
+    ON CONFLICT (year, month) DO UPDATE SET
+        total_minutes = total_minutes + excluded.total_minutes,
+        entries = entries + excluded.entries,
+        workday_entries = workday_entries + excluded.workday_entries,
+        weekday_holidays = weekday_holidays + excluded.weekday_holidays;
+END;
+
+-- Create monthly summary work delete trigger
+CREATE TRIGGER IF NOT EXISTS monthly_summary_work_delete
+AFTER DELETE ON work_hours
+BEGIN
+    INSERT INTO monthly_summary (year, month, total_minutes, entries, workday_entries, weekday_holidays)
+    VALUES (CAST(strftime('%Y', OLD.day + 1721424.5) AS INTEGER), CAST(strftime('%m', OLD.day + 1721424.5) AS INTEGER), -OLD.minutes, -1,
+            -(((OLD.day - 1) % 7 < 5) AND NOT EXISTS (SELECT 1 FROM holidays WHERE day = OLD.day)), 0)
+    ON CONFLICT (year, month) DO UPDATE SET
+        total_minutes = total_minutes + excluded.total_minutes,
+        entries = entries + excluded.entries,
+        workday_entries = workday_entries + excluded.workday_entries,
+        weekday_holidays = weekday_holidays + excluded.weekday_holidays;
+END;
+
+-- Create monthly summary holiday insert trigger
+CREATE TRIGGER IF NOT EXISTS monthly_summary_holiday_insert
+AFTER INSERT ON holidays
+WHEN (NEW.day - 1) % 7 < 5
+BEGIN
+    INSERT INTO monthly_summary (year, month, total_minutes, entries, workday_entries, weekday_holidays)
+    VALUES (CAST(strftime('%Y', NEW.day + 1721424.5) AS INTEGER), CAST(strftime('%m', NEW.day + 1721424.5) AS INTEGER), 0, 0,
+            -EXISTS (SELECT 1 FROM work_hours WHERE day = NEW.day), 1)
+    ON CONFLICT (year, month) DO UPDATE SET
+        total_minutes = total_minutes + excluded.total_minutes,
+        entries = entries + excluded.entries,
+        workday_entries = workday_entries + excluded.workday_entries,
+        weekday_holidays = weekday_holidays + excluded.weekday_holidays;
+END;
+
+-- Create monthly summary holiday delete trigger
+CREATE TRIGGER IF NOT EXISTS monthly_summary_holiday_delete
+AFTER DELETE ON holidays
+WHEN (OLD.day - 1) % 7 < 5
+BEGIN
+    INSERT INTO monthly_summary (year, month, total_minutes, entries, workday_entries, weekday_holidays)
+    VALUES (CAST(strftime('%Y', OLD.day + 1721424.5) AS INTEGER), CAST(strftime('%m', OLD.day + 1721424.5) AS INTEGER), 0, 0,
+            EXISTS (SELECT 1 FROM work_hours WHERE day = OLD.day), -1)
+    ON CONFLICT (year, month) DO UPDATE SET
+        total_minutes = total_minutes + excluded.total_minutes,
+        entries = entries + excluded.entries,
+        workday_entries = workday_entries + excluded.workday_entries,
+        weekday_holidays = weekday_holidays + excluded.weekday_holidays;
+END;
+
+-- Create monthly summary source view
+CREATE VIEW IF NOT EXISTS monthly_summary_source AS
+    -- 트리거가 관리하는 monthly_summary를 원본 테이블에서 새로 계산한 값. 검증(Compute)과 재구성(Rebuild)이 함께 쓴다.
+SELECT year, month, SUM(total_minutes) AS total_minutes, SUM(entries) AS entries,
+       SUM(workday_entries) AS workday_entries, SUM(weekday_holidays) AS weekday_holidays
+FROM (
+    SELECT CAST(strftime('%Y', w.day + 1721424.5) AS INTEGER) AS year,
+           CAST(strftime('%m', w.day + 1721424.5) AS INTEGER) AS month,
+           w.minutes AS total_minutes, 1 AS entries,
+           ((w.day - 1) % 7 < 5 AND h.day IS NULL) AS workday_entries, 0 AS weekday_holidays
+    FROM work_hours w LEFT JOIN holidays h ON h.day = w.day
+    UNION ALL
+    SELECT CAST(strftime('%Y', day + 1721424.5) AS INTEGER),
+           CAST(strftime('%m', day + 1721424.5) AS INTEGER),
+           0, 0, 0, 1
+    FROM holidays
+    WHERE (day - 1) % 7 < 5
+)
+GROUP BY year, month;
+
+-- Create changelog table
+CREATE TABLE IF NOT EXISTS changelog (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    tbl TEXT NOT NULL,
+    key NOT NULL,
+    deleted INTEGER NOT NULL DEFAULT 0,
+    changed_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ', 'now')),
+    origin TEXT,
+    UNIQUE (tbl, key)
+);
+
+-- Create changelog work insert trigger
+CREATE TRIGGER IF NOT EXISTS changelog_work_insert
+AFTER INSERT ON work_hours
+BEGIN
+    -- 키마다 마지막 변경 한 줄만 남긴다. 지우고 다시 넣어 seq를 새로 받는다
+    -- (INSERT OR REPLACE는 바깥 문장이 upsert면 그 충돌 처리로 바뀌어 UNIQUE 오류가 난다)
+    DELETE FROM changelog WHERE tbl = 'work_hours' AND key = NEW.day;
+    INSERT INTO changelog (tbl, key, deleted) VALUES ('work_hours', NEW.day, 0);
+END;
+
+-- Create changelog work update trigger
+CREATE TRIGGER IF NOT EXISTS changelog_work_update
+AFTER UPDATE ON work_hours
+BEGIN
+    DELETE FROM changelog WHERE tbl = 'work_hours' AND key = NEW.day;
+    INSERT INTO changelog (tbl, key, deleted) VALUES ('work_hours', NEW.day, 0);
+END;
+
+-- Create changelog work delete trigger
+CREATE TRIGGER IF NOT EXISTS changelog_work_delete
+AFTER DELETE ON work_hours
+BEGIN
+    DELETE FROM changelog WHERE tbl = 'work_hours' AND key = OLD.day;
+    INSERT INTO changelog (tbl, key, deleted) VALUES ('work_hours', OLD.day, 1);
+END;
+
+-- Create changelog holiday insert trigger
+CREATE TRIGGER IF NOT EXISTS changelog_holiday_insert
+AFTER INSERT ON holidays
+BEGIN
+    DELETE FROM changelog WHERE tbl = 'holidays' AND key = NEW.day;
+    INSERT INTO changelog (tbl, key, deleted) VALUES ('holidays', NEW.day, 0);
+END;
+
+-- Create changelog holiday update trigger
+CREATE TRIGGER IF NOT EXISTS changelog_holiday_update
+AFTER UPDATE ON holidays
+BEGIN
+    DELETE FROM changelog WHERE tbl = 'holidays' AND key = NEW.day;
+    INSERT INTO changelog (tbl, key, deleted) VALUES ('holidays', NEW.day, 0);
+END;
+
+-- Create changelog holiday delete trigger
+CREATE TRIGGER IF NOT EXISTS changelog_holiday_delete
+AFTER DELETE ON holidays
+BEGIN
+    DELETE FROM changelog WHERE tbl = 'holidays' AND key = OLD.day;
+    INSERT INTO changelog (tbl, key, deleted) VALUES ('holidays', OLD.day, 1);
+END;
+
+-- Create changelog setting insert trigger
+CREATE TRIGGER IF NOT EXISTS changelog_setting_insert
+AFTER INSERT ON settings
+BEGIN
+    DELETE FROM changelog WHERE tbl = 'settings' AND key = NEW.key;
+    INSERT INTO changelog (tbl, key, deleted) VALUES ('settings', NEW.key, 0);
+END;
+
+-- Create changelog setting update trigger
+CREATE TRIGGER IF NOT EXISTS changelog_setting_update
+AFTER UPDATE ON settings
+BEGIN
+    DELETE FROM changelog WHERE tbl = 'settings' AND key = NEW.key;
+    INSERT INTO changelog (tbl, key, deleted) VALUES ('settings', NEW.key, 0);
+END;
+
+-- Create changelog setting delete trigger
+CREATE TRIGGER IF NOT EXISTS changelog_setting_delete
+AFTER DELETE ON settings
+BEGIN
+    DELETE FROM changelog WHERE tbl = 'settings' AND key = OLD.key;
+    INSERT INTO changelog (tbl, key, deleted) VALUES ('settings', OLD.key, 1);
+END;
+
+-- Create sync state table
+CREATE TABLE IF NOT EXISTS sync_state (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+
+-- Migrate v1: integer day and minute columns
+ALTER TABLE work_hours RENAME TO work_hours_v0;
+CREATE TABLE work_hours (
+    day INTEGER PRIMARY KEY,
+    start_min INTEGER NOT NULL,
+    end_min INTEGER NOT NULL,
+    break_min INTEGER NOT NULL DEFAULT 60,
+    minutes INTEGER NOT NULL,
+    work_type TEXT
+);
+INSERT INTO work_hours (day, start_min, end_min, break_min, minutes, work_type)
+SELECT day, start_min, end_min, 60, end_min - start_min - 60, work_type
+FROM (
+    SELECT CAST(julianday(date) - 1721424.5 AS INTEGER) AS day,
+           CAST(substr(start_time, 1, instr(start_time, ':') - 1) AS INTEGER) * 60
+               + CAST(substr(start_time, instr(start_time, ':') + 1) AS INTEGER) AS start_min,
+           CAST(substr(end_time, 1, instr(end_time, ':') - 1) AS INTEGER) * 60
+               + CAST(substr(end_time, instr(end_time, ':') + 1) AS INTEGER) AS end_min,
+           work_type
+    FROM work_hours_v0
+    WHERE julianday(date) IS NOT NULL
+);
+DROP TABLE work_hours_v0;
+ALTER TABLE holidays RENAME TO holidays_v0;
+CREATE TABLE holidays (
+    day INTEGER PRIMARY KEY,
+    description TEXT
+);
+INSERT OR REPLACE INTO holidays (day, description)
+SELECT CAST(julianday(date) - 1721424.5 AS INTEGER), description
+FROM holidays_v0
+WHERE julianday(date) IS NOT NULL;
+DROP TABLE holidays_v0;
+
+-- Migrate v2: leave ledger
+CREATE TABLE IF NOT EXISTS leave_ledger (
+    seq INTEGER PRIMARY KEY,
+    recorded_at TEXT NOT NULL DEFAULT (datetime('now', 'localtime')),
+    day INTEGER,
+    kind TEXT NOT NULL,
+    amount REAL NOT NULL,
+    balance REAL NOT NULL DEFAULT 0,
+    note TEXT
+);
+CREATE TRIGGER IF NOT EXISTS leave_ledger_running_balance
+AFTER INSERT ON leave_ledger
+BEGIN
+    UPDATE leave_ledger
+    SET balance = NEW.amount + COALESCE(
+        (SELECT balance FROM leave_ledger WHERE seq < NEW.seq ORDER BY seq DESC LIMIT 1), 0)
+    WHERE seq = NEW.seq;
+END;
+CREATE INDEX IF NOT EXISTS leave_ledger_recorded_at ON leave_ledger (recorded_at);
+INSERT INTO leave_ledger (kind, amount, note)
+SELECT 'set', CAST(value AS REAL), 'settings.remaining_leave'
+FROM settings
+WHERE key = 'remaining_leave' AND CAST(value AS REAL) != 0;
+DELETE FROM settings WHERE key = 'remaining_leave';
+
+-- Migrate v4: seed changelog
+INSERT OR IGNORE INTO changelog (tbl, key, changed_at)
+SELECT 'work_hours', day, '1970-01-01T00:00:00.000Z' FROM work_hours;
+INSERT OR IGNORE INTO changelog (tbl, key, changed_at)
+SELECT 'holidays', day, '1970-01-01T00:00:00.000Z' FROM holidays;
+INSERT OR IGNORE INTO changelog (tbl, key, changed_at)
+SELECT 'settings', key, '1970-01-01T00:00:00.000Z' FROM settings;
+
+-- Migrate v5: leave ledger by work day
+DROP TRIGGER IF EXISTS leave_ledger_running_balance;
+DROP INDEX IF EXISTS leave_ledger_recorded_at;
+UPDATE leave_ledger
+SET day = CAST(julianday(date(recorded_at)) - 1721424.5 AS INTEGER)
+WHERE day IS NULL;
+
+-- Migrate v5: recompute leave balances
+UPDATE leave_ledger
+SET balance = (
+    SELECT SUM(amount) FROM leave_ledger AS earlier
+    WHERE (earlier.day, earlier.seq) <= (leave_ledger.day, leave_ledger.seq));
+
+-- Migrate v6: leave ledger day not null
+UPDATE leave_ledger
+SET day = CAST(julianday(date(recorded_at)) - 1721424.5 AS INTEGER)
+WHERE day IS NULL;
+DROP TRIGGER IF EXISTS leave_ledger_running_balance;
+DROP INDEX IF EXISTS leave_ledger_day;
+ALTER TABLE leave_ledger RENAME TO leave_ledger_v5;
+CREATE TABLE leave_ledger (
+    seq INTEGER PRIMARY KEY,
+    recorded_at TEXT NOT NULL DEFAULT (datetime('now', 'localtime')),
+    day INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    amount REAL NOT NULL,
+    balance REAL NOT NULL DEFAULT 0,
+    note TEXT
+);
+INSERT INTO leave_ledger (seq, recorded_at, day, kind, amount, balance, note)
+SELECT seq, recorded_at, day, kind, amount, balance, note FROM leave_ledger_v5;
+DROP TABLE leave_ledger_v5;
+
 -- Insert or replace work hours
-INSERT OR REPLACE INTO work_hours (date, start_time, end_time, work_type)
-VALUES (?, ?, ?, ?);
+INSERT INTO work_hours (day, start_min, end_min, break_min, minutes, work_type)
+VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (day) DO UPDATE SET
+    start_min = excluded.start_min,
+    end_min = excluded.end_min,
+    break_min = excluded.break_min,
+    minutes = excluded.minutes,
+    work_type = excluded.work_type;
 
 -- Select all work hours
-SELECT * FROM work_hours;
+SELECT day, start_min, end_min, minutes, work_type FROM work_hours;
+
+-- Select work hours in date range
+SELECT day, start_min, end_min, minutes, work_type FROM work_hours WHERE day BETWEEN ? AND ?;
+
+-- Select work hours for export
+SELECT day, start_min, end_min, break_min, minutes, work_type FROM work_hours
+WHERE day BETWEEN ? AND ? ORDER BY day;
 
 -- Select work hours for a specific date
-SELECT start_time, end_time, work_type FROM work_hours WHERE date = ?;
+SELECT start_min, end_min, work_type FROM work_hours WHERE day = ?;
+
+-- Select monthly summary
+SELECT total_minutes, workday_entries, weekday_holidays FROM monthly_summary WHERE year = ? AND month = ?;
+
+-- Select monthly summaries for year
+SELECT month, total_minutes, workday_entries, weekday_holidays FROM monthly_summary WHERE year = ?;
+
+-- Select all monthly summaries
+SELECT year, month, total_minutes, entries, workday_entries, weekday_holidays FROM monthly_summary;
+
+-- Compute monthly summary
+SELECT year, month, total_minutes, entries, workday_entries, weekday_holidays FROM monthly_summary_source;
+
+-- Clear monthly summary
+DELETE FROM monthly_summary;
+
+-- Rebuild monthly summary
+INSERT INTO monthly_summary (year, month, total_minutes, entries, workday_entries, weekday_holidays)
+SELECT year, month, total_minutes, entries, workday_entries, weekday_holidays FROM monthly_summary_source;
 
 -- Delete work hours
-DELETE FROM work_hours WHERE date = ?;
+DELETE FROM work_hours WHERE day = ?;
 
 -- Insert or replace holiday
-INSERT OR REPLACE INTO holidays (date, description)
-VALUES (?, ?);
+INSERT INTO holidays (day, description)
+VALUES (?, ?)
+ON CONFLICT (day) DO UPDATE SET description = excluded.description;
 
 -- Select all holidays
-SELECT * FROM holidays;
+SELECT day FROM holidays;
+
+-- Select holidays in date range
+SELECT day, description FROM holidays WHERE day BETWEEN ? AND ?;
+
+-- Select holidays for export
+SELECT day, description FROM holidays WHERE day BETWEEN ? AND ? ORDER BY day;
+
+-- Count weekday holidays in date range
+SELECT COUNT(*) FROM holidays
+WHERE day BETWEEN ? AND ? AND (day - 1) % 7 < 5;
 
 -- Delete holiday
-DELETE FROM holidays WHERE date = ?;
+DELETE FROM holidays WHERE day = ?;
 
 -- Select holiday description for a specific date
-SELECT description FROM holidays WHERE date = ?;
+SELECT description FROM holidays WHERE day = ?;
+
+-- Insert leave entry
+INSERT INTO leave_ledger (day, kind, amount, note)
+VALUES (?, ?, ?, ?);
+
+-- Select leave balance
+SELECT balance FROM leave_ledger ORDER BY day DESC, seq DESC LIMIT 1;
 
--- Insert or replace remaining leave
-INSERT OR REPLACE INTO settings (key, value)
-VALUES ('remaining_leave', ?);
+-- Select leave balance at date
+SELECT balance FROM leave_ledger
+WHERE day <= ?
+ORDER BY day DESC, seq DESC LIMIT 1;
 
--- Select remaining leave
-SELECT value FROM settings WHERE key = 'remaining_leave';
+-- Select leave entries
+SELECT seq, recorded_at, day, kind, amount, balance, note FROM leave_ledger ORDER BY day, seq;
+
+-- Select month leave grant
+SELECT IFNULL(SUM(amount), 0) FROM leave_ledger
+WHERE day BETWEEN ? AND ? AND kind IN ('earned', 'forfeit');
+
+-- Select leave adjustment total
+SELECT IFNULL(SUM(amount), 0) FROM leave_ledger WHERE kind = 'set';
+
+-- Select setting
+SELECT value FROM settings WHERE key = ?;
+
+-- Insert or replace setting
+INSERT INTO settings (key, value)
+VALUES (?, ?)
+ON CONFLICT (key) DO UPDATE SET value = excluded.value;
+
+-- Delete setting
+DELETE FROM settings WHERE key = ?;
+
+-- Select changelog high-water mark
+SELECT IFNULL(MAX(seq), 0) FROM changelog;
+
+-- Select changelog mark
+SELECT IFNULL((SELECT CAST(value AS INTEGER) FROM sync_state WHERE key = 'reset_generation'), 0), IFNULL(MAX(seq), 0)
+FROM changelog;
+
+-- Select local changes in range
+SELECT c.seq, c.tbl, c.key, c.deleted, c.changed_at,
+       w.start_min, w.end_min, w.break_min, w.minutes, w.work_type, h.description, s.value
+FROM changelog c
+LEFT JOIN work_hours w ON c.tbl = 'work_hours' AND w.day = c.key
+LEFT JOIN holidays h ON c.tbl = 'holidays' AND h.day = c.key
+LEFT JOIN settings s ON c.tbl = 'settings' AND s.key = c.key
+WHERE c.seq > ? AND c.seq <= ? AND c.origin IS NULL
+ORDER BY c.seq;
+
+-- Select changed days after
+SELECT c.tbl, c.key, c.deleted, w.start_min, w.end_min, w.break_min, w.minutes, w.work_type, h.description
+FROM changelog c
+LEFT JOIN work_hours w ON c.tbl = 'work_hours' AND w.day = c.key
+LEFT JOIN holidays h ON c.tbl = 'holidays' AND h.day = c.key
+WHERE c.seq > ? AND c.tbl != 'settings'
+ORDER BY c.seq
+LIMIT ?;
+
+-- Select change
+SELECT seq, changed_at, origin FROM changelog WHERE tbl = ? AND key = ?;
+
+-- Record remote change
+INSERT INTO changelog (tbl, key, deleted, changed_at, origin)
+VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (tbl, key) DO UPDATE SET
+    deleted = excluded.deleted,
+    changed_at = excluded.changed_at,
+    origin = excluded.origin;
+
+-- Clear changelog
+DELETE FROM changelog;
+
+-- Select sync state
+SELECT value FROM sync_state WHERE key = ?;
+
+-- Set sync state
+INSERT INTO sync_state (key, value)
+VALUES (?, ?)
+ON CONFLICT (key) DO UPDATE SET value = excluded.value;
+
+-- Clear sync watermarks
+DELETE FROM sync_state WHERE key NOT IN ('device_id', 'reset_generation');
+
+-- Bump reset generation
+INSERT INTO sync_state (key, value)
+VALUES ('reset_generation', 1)
+ON CONFLICT (key) DO UPDATE SET value = CAST(value AS INTEGER) + 1;
 
 -- Drop work_hours table
 DROP TABLE IF EXISTS work_hours;
@@ -57,5 +515,11 @@ DROP TABLE IF EXISTS work_hours;
 -- Drop holidays table
 DROP TABLE IF EXISTS holidays;
 
+-- Drop monthly summary table
+DROP TABLE IF EXISTS monthly_summary;
+
+-- Drop leave ledger table
+DROP TABLE IF EXISTS leave_ledger;
+
 -- Drop settings table
 DROP TABLE IF EXISTS settings;
@@ -0,0 +1,82 @@
+import csv
+import os
+import sqlite3
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+from core import WorkHoursStore
+from db import Database
+
+# 직원마다 따로 쓰는 work_hours.db 여러 개를 읽기 전용으로 열어 한 해 요약을 모은다.
+# 달별 근무시간/필수시간/여유 시간은 화면의 update_info와 같은 month_summary 규칙, 남은 연차는 원장 잔액이다.
+EmployeeReport = namedtuple('EmployeeReport', 'name path remaining_leave months error')
+
+
+def employee_name(path):
+    # .../alice/work_hours.db -> alice, .../alice.db -> alice
+    stem = os.path.splitext(os.path.basename(path))[0]
+    if stem == 'work_hours':
+        return os.path.basename(os.path.dirname(os.path.abspath(path))) or stem
+    return stem
+
+
+def find_databases(root):
+    paths = []
+    for directory, _, files in os.walk(root):
+        paths.extend(os.path.join(directory, name) for name in files if name.endswith('.db'))
+    return sorted(paths)
+
+
+def employee_report(path, year):
+    # 프로세스 풀에서 파일 하나씩 실행된다. 열 수 없는 파일은 error에 이유를 담아 돌려준다.
+    name = employee_name(path)
+    try:
+        db = Database(path, read_only=True)
+    except sqlite3.Error as e:
+        return EmployeeReport(name, path, None, None, str(e))
+    try:
+        store = WorkHoursStore(db)
+        return EmployeeReport(name, path, store.remaining_leave, store.year_summaries(year), None)
+    except sqlite3.Error as e:
+        return EmployeeReport(name, path, None, None, str(e))
+    finally:
+        db.close()
+
+
+def rollup(paths, year, jobs=None):
+    # jobs: 프로세스 수 (None이면 CPU 수, 1이면 이 프로세스에서 차례로)
+    if jobs == 1 or len(paths) < 2:
+        return [employee_report(path, year) for path in paths]
+    workers = jobs or os.cpu_count() or 1
+    chunksize = max(1, len(paths) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(employee_report, paths, repeat(year), chunksize=chunksize))
+
+
+def team_totals(reports):
+    # 달마다 (근무시간 합, 필수시간 합, 여유 시간 합). 열지 못한 파일은 뺀다.
+    totals = [[0.0, 0, 0.0] for _ in range(12)]
+    for report in reports:
+        if report.error:
+            continue
+        for month, summary in enumerate(report.months):
+            totals[month][0] += summary.total_hours
+            totals[month][1] += summary.required
+            totals[month][2] += summary.balance
+    return [tuple(values) for values in totals]
+
+
+def write_csv(path, reports):
+    # 직원 x 달 한 줄씩
+    with open(path, 'w', encoding='utf-8-sig', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(['employee', 'month', 'total_hours', 'required', 'balance',
+                         'workdays_with_hours', 'work_days', 'remaining_leave'])
+        for report in reports:
+            if report.error:
+                continue
+            for month, summary in enumerate(report.months, start=1):
+                writer.writerow([report.name, month, round(summary.total_hours, 2), summary.required,
+                                 round(summary.balance, 2), summary.workdays_with_hours, summary.work_days,
+                                 report.remaining_leave])
@@ -0,0 +1,302 @@
+import asyncio
+import datetime
+import json
+import os
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import unquote, urlsplit
+
+from core import WorkHoursStore
+from db import DB_PATH, Database
+from importer import AttendanceImportError, validate_row
+
+# 로컬 전용 HTTP/JSON API. 다른 도구(타임시트 봇 등)가 창을 띄우지 않고 근무/휴일을 읽고 쓴다.
+# DB 작업은 전용 스레드 하나에서만 하므로 읽기와 쓰기가 요청 순서대로 하나씩 실행된다.
+#
+#   GET    /entries/2024-06-20          근무 기록
+#   PUT    /entries/2024-06-20          {"start_time": "08:00", "end_time": "17:00", "work_type": "일반근무"}
+#   DELETE /entries/2024-06-20
+#   GET    /holidays/2024-06-06
+#   PUT    /holidays/2024-06-06         {"description": "현충일"}
+#   DELETE /holidays/2024-06-06
+#   GET    /summary/2024/6              이번 달 근무 정보 (update_info와 같은 값)
+#   GET    /events                      변경 알림 (text/event-stream)
+DEFAULT_PORT = int(os.environ.get('WORK_HOURS_API_PORT', '8765'))
+LOOPBACK_HOSTS = ('127.0.0.1', 'localhost', '::1')
+MAX_BODY = 64 * 1024
+EVENT_QUEUE_SIZE = 256  # 이만큼 밀린 구독자는 끊는다
+HEARTBEAT_SECONDS = 15
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+           413: 'Payload Too Large', 500: 'Internal Server Error'}
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def parse_date(value):
+    try:
+        if datetime.date.fromisoformat(value).isoformat() == value:
+            return value
+    except ValueError:
+        pass
+    raise ApiError(400, f"invalid date: {value!r}")
+
+
+class WorkHoursApi:
+    # DB 스레드에서만 부르는 동기 연산들. 쓰기는 WorkHoursStore의 같은 메서드를 쓰므로 연차 규칙도 같다.
+    def __init__(self, db_path):
+        self.db = Database(db_path)
+        self.store = WorkHoursStore(self.db)
+        self.data_version = self.read_data_version()
+        self.mark = self.store.changelog_mark()
+
+    def read_data_version(self):
+        return self.db.conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def refresh_if_changed(self):
+        # 다른 연결(열려 있는 창 등)이 커밋했으면 data_version이 바뀐다. 그때만 바뀐 날을 캐시에 반영한다.
+        version = self.read_data_version()
+        if version != self.data_version:
+            self.data_version = version
+            self.mark, _ = self.store.apply_external_changes(self.mark)
+
+    def get_entry(self, date):
+        start_time, end_time, work_type = self.store.get_entry(date)
+        if work_type is None:
+            raise ApiError(404, f"no entry on {date}")
+        return {'date': date, 'start_time': start_time, 'end_time': end_time, 'work_type': work_type}
+
+    def save_entry(self, date, body):
+        try:
+            date, start_time, end_time, work_type = validate_row(dict(body, date=date))
+        except AttendanceImportError as e:
+            raise ApiError(400, str(e)) from None
+        self.store.save_entry(date, start_time, end_time, work_type)
+        return {'date': date, 'start_time': start_time, 'end_time': end_time, 'work_type': work_type,
+                'remaining_leave': self.store.remaining_leave}
+
+    def delete_entry(self, date):
+        self.store.delete_entry(date)
+        return {'date': date, 'remaining_leave': self.store.remaining_leave}
+
+    def get_holiday(self, date):
+        description = self.store.holiday_description(date)
+        if description is None:
+            raise ApiError(404, f"no holiday on {date}")
+        return {'date': date, 'description': description}
+
+    def add_holiday(self, date, body):
+        description = str(body.get('description') or "Holiday").strip() or "Holiday"
+        self.store.add_holiday(date, description)
+        return {'date': date, 'description': description, 'remaining_leave': self.store.remaining_leave}
+
+    def remove_holiday(self, date):
+        self.store.remove_holiday(date)
+        return {'date': date, 'remaining_leave': self.store.remaining_leave}
+
+    def month_summary(self, year, month):
+        summary = self.store.month_summary(year, month)
+        return dict(summary._asdict(), year=year, month=month,
+                    quarter_required=self.store.workdays.quarter_required_hours(year, month),
+                    ytd_required=self.store.workdays.year_to_date_required_hours(year, month),
+                    remaining_leave=self.store.remaining_leave)
+
+    def handle(self, method, parts, body):
+        # (결과, 알림 또는 None)
+        self.refresh_if_changed()
+        if len(parts) == 2 and parts[0] in ('entries', 'holidays'):
+            kind, date = parts[0], parse_date(parts[1])
+            if method == 'GET':
+                return (self.get_entry(date) if kind == 'entries' else self.get_holiday(date)), None
+            if method == 'PUT':
+                result = self.save_entry(date, body) if kind == 'entries' else self.add_holiday(date, body)
+            elif method == 'DELETE':
+                result = self.delete_entry(date) if kind == 'entries' else self.remove_holiday(date)
+            else:
+                raise ApiError(405, f"{method} not allowed")
+            self.data_version = self.read_data_version()
+            event = {'type': 'entry' if kind == 'entries' else 'holiday',
+                     'action': 'deleted' if method == 'DELETE' else 'saved',
+                     'date': date, 'remaining_leave': self.store.remaining_leave}
+            return result, event
+        if len(parts) == 3 and parts[0] == 'summary':
+            if method != 'GET':
+                raise ApiError(405, f"{method} not allowed")
+            try:
+                year, month = int(parts[1]), int(parts[2])
+            except ValueError:
+                raise ApiError(400, "year and month must be numbers") from None
+            if not (1 <= month <= 12 and 1 <= year <= 9999):
+                raise ApiError(400, f"invalid month: {year}-{month}")
+            return self.month_summary(year, month), None
+        raise ApiError(404, f"unknown path: /{'/'.join(parts)}")
+
+    def close(self):
+        self.db.close()
+
+
+class WorkHoursServer:
+    def __init__(self, db_path=DB_PATH, host='127.0.0.1', port=DEFAULT_PORT):
+        if host not in LOOPBACK_HOSTS:
+            raise ValueError(f"the API only listens on localhost, not {host!r}")
+        self.db_path = db_path
+        self.host = host
+        self.port = port
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='work-hours-api-db')
+        self.api = None
+        self.server = None
+        self.subscribers = set()  # 구독자마다 asyncio.Queue
+        self.requests = 0
+
+    async def run_db(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+
+    async def start(self):
+        self.api = await self.run_db(WorkHoursApi, self.db_path)
+        self.server = await asyncio.start_server(self.handle_client, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]  # port=0이면 실제로 받은 포트
+        return self
+
+    async def close(self):
+        # 알림 스트림을 먼저 끝내야 wait_closed가 열린 연결을 기다리며 멈추지 않는다
+        for queue in list(self.subscribers):
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait(None)
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        if self.api is not None:
+            await self.run_db(self.api.close)
+        self.executor.shutdown()
+
+    def publish(self, event):
+        for queue in list(self.subscribers):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # 너무 밀린 구독자는 끊는다. 다시 연결하면 처음부터 새로 읽어야 한다.
+                self.subscribers.discard(queue)
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(None)
+
+    async def handle_client(self, reader, writer):
+        # HTTP/1.1 keep-alive. 요청 하나를 다 처리한 뒤 다음 요청을 읽는다.
+        try:
+            while True:
+                request = await self.read_request(reader)
+                if request is None:
+                    break
+                method, path, headers, body = request
+                if path == '/events' and method == 'GET':
+                    await self.stream_events(writer)
+                    break
+                status, payload = await self.dispatch(method, path, body)
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                await self.send_json(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except ApiError as e:
+            await self.send_json(writer, e.status, {'error': str(e)}, False)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def read_request(self, reader):
+        line = await reader.readline()
+        if not line:
+            return None
+        try:
+            method, target, _ = line.decode('latin-1').split()
+        except ValueError:
+            raise ApiError(400, "malformed request line") from None
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        try:
+            length = int(headers.get('content-length') or 0)
+        except ValueError:
+            raise ApiError(400, "invalid Content-Length") from None
+        if length < 0:
+            raise ApiError(400, "invalid Content-Length")
+        if length > MAX_BODY:
+            raise ApiError(413, "request body too large")
+        body = await reader.readexactly(length) if length else b''
+        return method.upper(), urlsplit(target).path, headers, body
+
+    async def dispatch(self, method, path, body):
+        self.requests += 1
+        try:
+            data = json.loads(body.decode('utf-8')) if body else {}
+            if not isinstance(data, dict):
+                raise ApiError(400, "body must be a JSON object")
+        except (UnicodeDecodeError, json.JSONDecodeError) as e:
+            return 400, {'error': f"invalid JSON: {e}"}
+        parts = [unquote(part) for part in path.strip('/').split('/') if part]
+        try:
+            result, event = await self.run_db(self.api.handle, method, parts, data)
+        except ApiError as e:
+            return e.status, {'error': str(e)}
+        except sqlite3.Error as e:
+            print(f"Database error: {e}")
+            return 500, {'error': str(e)}
+        if event is not None:
+            self.publish(event)
+        return 200, result
+
+    async def send_json(self, writer, status, payload, keep_alive=True):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        head = (f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+                f"Content-Type: application/json; charset=utf-8\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode('latin-1') + body)
+        await writer.drain()
+
+    async def stream_events(self, writer):
+        # Server-Sent Events. 쓰기가 끝날 때마다 'data: {...}' 한 건, 조용할 때는 주석 줄로 연결을 확인한다.
+        queue = asyncio.Queue(EVENT_QUEUE_SIZE)
+        self.subscribers.add(queue)
+        try:
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\n"
+                         b"Cache-Control: no-cache\r\nConnection: keep-alive\r\n\r\n")
+            await writer.drain()
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    writer.write(b": ping\n\n")
+                    await writer.drain()
+                    continue
+                if event is None:
+                    break
+                writer.write(f"data: {json.dumps(event, ensure_ascii=False)}\n\n".encode('utf-8'))
+                await writer.drain()
+        finally:
+            self.subscribers.discard(queue)
+
+
+async def serve(db_path=DB_PATH, host='127.0.0.1', port=DEFAULT_PORT, ready=None):
+    server = await WorkHoursServer(db_path, host, port).start()
+    print(f"Serving {db_path} on http://{host}:{server.port}")
+    if ready is not None:
+        ready(server)
+    try:
+        await server.server.serve_forever()
+    except asyncio.CancelledError:
+        pass
+    finally:
+        await server.close()
@@ -0,0 +1,212 @@
+import json
+import os
+import re
+import uuid
+from collections import namedtuple
+
+from core import LEAVE_ADJUSTMENT_KEY, format_minutes, ordinal_date, split_date
+
+# 회사/집 PC처럼 여러 기기의 work_hours.db를 공유 폴더(클라우드 드라이브, USB 등)를 거쳐 맞춘다.
+# work_hours/holidays/settings에 쓰면 트리거가 changelog에 키마다 마지막 변경 (seq, 시각)을 남긴다.
+# 동기화는 다른 기기가 새로 올린 묶음 파일만 읽어 적용하고, 지난번에 내보낸 seq 뒤의 이 기기 변경만 파일 하나로 올린다.
+# 그래서 DB 크기와 상관없이 바뀐 줄 수만큼만 읽고 쓴다.
+# 같은 키를 여러 기기에서 바꿨으면 changed_at이 늦은 쪽이 이긴다 (같으면 기기 ID가 큰 쪽).
+#
+#   <폴더>/<기기 ID>/<마지막 seq>.json   {"device": ..., "after_seq": ..., "last_seq": ..., "changes": [...]}
+#
+# 연차 원장은 올리지 않는다. 받은 근무/휴일 변경을 save_entry/add_holiday 등으로 적용하면
+# 사용/반환은 근무 타입대로, 다 채운 달의 1일은 그 달의 지금 상태대로(month_grants) 다시 계산되므로
+# 편집 순서가 달라도 잔액이 같다. 설정 화면에서 잔액을 직접 바꾼 'set' 항목은
+# 합계를 settings의 leave_adjustment로 올리고, 받은 쪽은 자기 'set' 합계와의 차이만큼 'set' 항목을 남긴다.
+SYNC_TABLES = ('work_hours', 'holidays', 'settings')
+DEVICE_PATTERN = re.compile(r'^[0-9a-f]{12}$')
+BATCH_PATTERN = re.compile(r'^(\d{12})\.json$')
+
+# value: 비교용 값 (work_hours는 (출근, 퇴근, 근무 타입), holidays는 (설명,), settings는 (값,)), 삭제면 None
+Change = namedtuple('Change', 'changed_at device table key value')
+Conflict = namedtuple('Conflict', 'table key local_changed_at remote_changed_at device kept')
+SyncReport = namedtuple('SyncReport', 'device received applied unchanged older exported conflicts')
+
+
+class SyncError(ValueError):
+    pass
+
+
+def read_state(db, key, default=None):
+    row = db.fetchone('Select sync state', (key,))
+    return row[0] if row else default
+
+
+def write_state(db, key, value):
+    db.write('Set sync state', (key, str(value)))
+
+
+def device_id(db):
+    # 처음 동기화할 때 만든다. sync_state는 동기화 대상이 아니므로 기기마다 다르다.
+    device = read_state(db, 'device_id')
+    if device is None:
+        device = uuid.uuid4().hex[:12]
+        write_state(db, 'device_id', device)
+    return device
+
+
+def change_record(row):
+    seq, table, key, deleted, changed_at, start_min, end_min, break_min, minutes, work_type, description, value = row
+    if deleted:
+        data = None
+    elif table == 'work_hours':
+        data = {'start_min': start_min, 'end_min': end_min, 'break_min': break_min,
+                'minutes': minutes, 'work_type': work_type}
+    elif table == 'holidays':
+        data = {'description': description}
+    else:
+        data = {'value': value}
+    return {'seq': seq, 'table': table, 'key': key, 'changed_at': changed_at, 'row': data}
+
+
+def export_changes(db, folder, device):
+    # 지난번 뒤로 이 기기에서 생긴 변경만 묶음 하나로 쓴다. 받은 변경(origin이 있는 줄)은 다시 올리지 않는다.
+    exported = int(read_state(db, 'exported_seq', 0))
+    high = db.fetchone('Select changelog high-water mark')[0]
+    if high <= exported:
+        return 0
+    changes = [change_record(row) for row in db.fetchall('Select local changes in range', (exported, high))]
+    if changes:
+        directory = os.path.join(folder, device)
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{high:012d}.json")
+        temp = path + '.tmp'
+        with open(temp, 'w', encoding='utf-8') as file:
+            json.dump({'device': device, 'after_seq': exported, 'last_seq': high, 'changes': changes},
+                      file, ensure_ascii=False)
+        os.replace(temp, path)  # 다른 기기가 반쯤 쓴 파일을 읽지 않도록 다 쓴 뒤에 이름을 바꾼다
+    write_state(db, 'exported_seq', high)
+    return len(changes)
+
+
+def parse_change(change, peer):
+    table, key, row = change['table'], change['key'], change['row']
+    if table not in SYNC_TABLES:
+        raise SyncError(f"unknown table {table!r}")
+    if table == 'settings' and not isinstance(key, str):
+        raise SyncError(f"invalid settings key {key!r}")
+    if table != 'settings' and (not isinstance(key, int) or isinstance(key, bool) or key < 1):
+        raise SyncError(f"invalid day {key!r} in {table}")
+    if row is None:
+        value = None
+    elif table == 'work_hours':
+        value = (format_minutes(int(row['start_min'])), format_minutes(int(row['end_min'])), row['work_type'])
+    elif table == 'holidays':
+        value = (row['description'],)
+    elif key == LEAVE_ADJUSTMENT_KEY:
+        value = (repr(float(row['value'])),)
+    else:
+        value = (row['value'],)
+    return Change(str(change['changed_at']), peer, table, key, value)
+
+
+def read_batch(path, peer):
+    with open(path, encoding='utf-8') as file:
+        try:
+            batch = json.load(file)
+        except json.JSONDecodeError as e:
+            raise SyncError(f"{path}: {e}") from None
+    try:
+        if batch['device'] != peer:
+            raise SyncError(f"written by {batch['device']!r}, expected {peer!r}")
+        return [parse_change(change, peer) for change in batch['changes']]
+    except (KeyError, TypeError, ValueError) as e:
+        raise SyncError(f"{path}: invalid change: {e}") from None
+
+
+def read_batches(db, folder, device):
+    # 기기 폴더마다 지난번에 읽은 seq보다 뒤인 묶음만. (변경 목록, {sync_state 키: 새로 읽은 마지막 seq})
+    # 이 기기 폴더는 exported_seq 뒤로 묶음이 없으므로 평소에는 읽지 않는다.
+    # reset으로 exported_seq가 지워졌을 때만 읽혀, 이 기기에서 했던 변경도 다른 기기 것과 함께 되살린다.
+    changes = []
+    watermarks = {}
+    for peer in sorted(os.listdir(folder)):
+        directory = os.path.join(folder, peer)
+        if not DEVICE_PATTERN.match(peer) or not os.path.isdir(directory):
+            continue
+        key = 'exported_seq' if peer == device else f'peer:{peer}'
+        watermark = int(read_state(db, key, 0))
+        batches = sorted(int(match.group(1)) for match in map(BATCH_PATTERN.match, os.listdir(directory))
+                         if match and int(match.group(1)) > watermark)
+        for last_seq in batches:
+            changes.extend(read_batch(os.path.join(directory, f"{last_seq:012d}.json"), peer))
+            watermarks[key] = last_seq
+    return changes, watermarks
+
+
+def local_value(store, table, key):
+    if table == 'settings':
+        row = store.db.fetchone('Select setting', (key,))
+        return (row[0],) if row else None
+    date = ordinal_date(key)
+    store.ensure_month(*split_date(date)[:2])  # 화면에서 바꿀 때처럼 휴일 여부를 캐시에서 보도록
+    if table == 'work_hours':
+        start_time, end_time, work_type = store.get_entry(date)
+        return None if start_time is None else (start_time, end_time, work_type)
+    return (store.holiday_description(date),) if store.is_holiday(date) else None
+
+
+def apply_value(store, table, key, value):
+    # 화면과 같은 메서드로 써야 연차 규칙과 캐시가 함께 맞는다
+    if table == 'settings':
+        if key == LEAVE_ADJUSTMENT_KEY and value is not None:
+            store.apply_leave_adjustment(float(value[0]), note='sync')
+        elif value is None:
+            store.db.write('Delete setting', (key,))
+        else:
+            store.db.write('Insert or replace setting', (key, value[0]))
+    elif table == 'work_hours':
+        if value is None:
+            store.delete_entry(ordinal_date(key))
+        else:
+            store.save_entry(ordinal_date(key), *value)
+    elif value is None:
+        store.remove_holiday(ordinal_date(key))
+    else:
+        store.add_holiday(ordinal_date(key), value[0])
+
+
+def sync(store, folder):
+    db = store.db
+    os.makedirs(folder, exist_ok=True)
+    device = device_id(db)
+    exported_before = int(read_state(db, 'exported_seq', 0))
+    changes, watermarks = read_batches(db, folder, device)
+    changes.sort(key=lambda change: (change.changed_at, change.device))  # 원래 기기에서 일어난 순서대로
+    applied = unchanged = older = 0
+    conflicts = {}
+    for change in changes:
+        local = db.fetchone('Select change', (change.table, change.key))
+        current = local_value(store, change.table, change.key)
+        remote_wins = local is None or (change.changed_at, change.device) > (local[1], local[2] or device)
+        # 아직 올리지 않은 이 기기의 변경과 값이 다르면 양쪽에서 따로 바꾼 것이다
+        if local is not None and local[2] is None and local[0] > exported_before and current != change.value:
+            key = change.key if change.table == 'settings' else ordinal_date(change.key)
+            conflicts[(change.table, key)] = Conflict(change.table, key, local[1], change.changed_at, change.device,
+                                                      'remote' if remote_wins else 'local')
+        if not remote_wins:
+            older += 1
+            continue
+        if current == change.value:
+            unchanged += 1
+        else:
+            apply_value(store, change.table, change.key, change.value)
+            applied += 1
+        # 방금 쓴 줄의 changelog를 보낸 기기의 시각과 ID로 바꿔 두면 다시 올리지 않고, 다음 비교에도 그 시각을 쓴다
+        db.write('Record remote change', (change.table, change.key, int(change.value is None),
+                                          change.changed_at, change.device))
+    for key, last_seq in watermarks.items():
+        write_state(db, key, last_seq)
+    exported = export_changes(db, folder, device)
+    return SyncReport(device, len(changes), applied, unchanged, older, exported, list(conflicts.values()))
+
+
+def write_report(report, path):
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(dict(report._asdict(), conflicts=[conflict._asdict() for conflict in report.conflicts]),
+                  file, indent=2, ensure_ascii=False)
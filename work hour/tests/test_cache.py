@@ -0,0 +1,132 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core import WorkHoursStore  # noqa: E402
+from db import Database  # noqa: E402
+from writer import BackgroundWriter  # noqa: E402
+
+
+class CacheConsistencyTest(unittest.TestCase):
+    # 쓰기마다 캐시를 한 줄씩 고친 결과가 DB에서 통째로 다시 읽은 결과와 같은지 (verify_cache)
+    background_writer = False
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = Database(os.path.join(self.tmp.name, 'work_hours.db'))
+        if self.background_writer:
+            self.db.writer = BackgroundWriter(self.db, coalesce_ms=5)
+        self.store = WorkHoursStore(self.db)
+        self.store.verify_cache_enabled = True  # 캐시를 고칠 때마다 check_cache가 비교한다
+        for month in (5, 6, 7):
+            self.store.ensure_month(2024, month)
+
+    def tearDown(self):
+        self.db.close()
+        self.tmp.cleanup()
+
+    def assertCacheMatches(self):
+        self.assertEqual(self.store.verify_cache(), [])
+
+    def test_save_and_delete(self):
+        self.store.save_entry('2024-06-03', '08:00', '17:00', '일반근무')
+        self.store.save_entry('2024-06-03', '09:00', '19:00', '재택근무')  # 덮어쓰기
+        self.store.save_entry('2024-06-08', '10:00', '14:00', '출장')  # 주말
+        self.store.save_entry('2024-08-01', '08:00', '17:00', '일반근무')  # 캐시에 없는 달
+        self.assertCacheMatches()
+        self.store.delete_entry('2024-06-03')
+        self.store.delete_entry('2024-06-04')  # 기록이 없는 날
+        self.assertCacheMatches()
+        self.assertEqual(self.store.get_entry('2024-06-08'), ('10:00', '14:00', '출장'))
+
+    def test_holiday_add_and_remove(self):
+        self.store.save_entry('2024-06-06', '08:00', '17:00', '일반근무')
+        self.store.add_holiday('2024-06-06', "현충일")
+        self.store.add_holiday('2024-06-06', "현충일 (대체)")  # 설명만 바뀐다
+        self.store.add_holiday('2024-07-01', "창립기념일")
+        self.assertCacheMatches()
+        self.assertTrue(self.store.is_holiday('2024-06-06'))
+        self.store.remove_holiday('2024-06-06')
+        self.store.remove_holiday('2024-06-07')  # 휴일이 아닌 날
+        self.assertCacheMatches()
+        self.assertFalse(self.store.is_holiday('2024-06-06'))
+
+    def test_range_save_and_delete(self):
+        self.store.add_holiday('2024-06-06', "현충일")
+        saved = self.store.save_range('2024-05-27', '2024-06-14', '08:00', '17:00', '일반근무')
+        self.assertEqual(saved, 14)  # 주말과 휴일을 뺀 날
+        self.assertCacheMatches()
+        self.store.delete_range('2024-06-10', '2024-06-12')
+        self.assertCacheMatches()
+        self.assertEqual(self.store.get_entry('2024-06-11'), (None, None, None))
+        self.assertEqual(self.store.get_entry('2024-06-13')[2], '일반근무')
+
+    def test_import(self):
+        rows = [(f'2024-06-{day:02}', '08:00', '17:00', '일반근무') for day in range(3, 8)]
+        rows.append(('2024-06-05', '09:00', '18:00', '연/월차'))  # 같은 날짜는 마지막 줄
+        rows.append(('2023-12-29', '08:00', '17:00', '일반근무'))  # 캐시에 없는 달
+        self.store.import_entries(rows)
+        self.assertCacheMatches()
+        self.store.import_holidays([('2024-06-06', "현충일"), ('2024-07-17', "제헌절")])
+        self.assertCacheMatches()
+        self.assertEqual(self.store.get_entry('2024-06-05')[2], '연/월차')
+
+    def test_full_reload_after_writes(self):
+        # 같은 쓰기 뒤에 캐시를 버리고 다시 읽어도 달 요약이 같아야 한다
+        self.store.save_range('2024-06-01', '2024-06-30', '08:00', '18:00', '일반근무')
+        self.store.add_holiday('2024-06-06', "현충일")
+        before = self.store.month_summary(2024, 6)
+        self.store.reload()
+        self.assertEqual(self.store.month_summary(2024, 6), before)
+        self.assertCacheMatches()
+
+
+class BackgroundWriterCacheConsistencyTest(CacheConsistencyTest):
+    # 화면처럼 쓰기 스레드에 커밋을 맡겨도 verify_cache가 먼저 sync하므로 결과가 같아야 한다
+    background_writer = True
+
+
+class ExternalChangeTest(unittest.TestCase):
+    # 같은 DB를 다른 프로세스(여기서는 다른 연결)가 바꾼 뒤 apply_external_changes로 따라잡은 캐시
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        path = os.path.join(self.tmp.name, 'work_hours.db')
+        self.dbs = [Database(path), Database(path)]
+        self.store, self.other = [WorkHoursStore(db) for db in self.dbs]
+        self.store.save_entry('2024-06-03', '08:00', '17:00', '일반근무')
+        self.store.add_holiday('2024-06-06', "현충일")
+        self.store.ensure_window(2024, 6)
+        self.mark = self.store.changelog_mark()
+
+    def tearDown(self):
+        for db in self.dbs:
+            db.close()
+        self.tmp.cleanup()
+
+    def test_edits(self):
+        self.other.save_entry('2024-06-04', '09:00', '18:00', '재택근무')
+        self.other.delete_entry('2024-06-03')
+        self.mark, changed = self.store.apply_external_changes(self.mark)
+        self.assertTrue(changed)
+        self.assertEqual(self.store.verify_cache(), [])
+        self.assertEqual(self.store.get_entry('2024-06-03'), (None, None, None))
+
+    def test_reset_then_write(self):
+        # changelog seq는 reset 뒤에도 줄지 않으므로, 다음 확인 전에 새로 쓴 줄이 있어도 reset을 알아채야 한다
+        self.other.reset()
+        self.other.save_entry('2024-06-10', '08:00', '17:00', '일반근무')
+        self.mark, changed = self.store.apply_external_changes(self.mark)
+        self.assertTrue(changed)
+        self.assertEqual(self.store.verify_cache(), [])
+        self.assertEqual(self.store.get_entry('2024-06-03'), (None, None, None))
+        self.assertFalse(self.store.is_holiday('2024-06-06'))
+        self.other.reset()  # 두 번째 reset도 새 세대다
+        self.assertNotEqual(self.store.changelog_mark()[0], self.mark[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import datetime
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core import WorkHoursStore  # noqa: E402
+from db import Database  # noqa: E402
+
+
+class LeaveLedgerTest(unittest.TestCase):
+    # 날짜별 잔액은 입력한 시각이 아니라 항목의 근무일 기준이어야 한다
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = Database(os.path.join(self.tmp.name, 'work_hours.db'))
+        self.store = WorkHoursStore(self.db)
+
+    def tearDown(self):
+        self.db.close()
+        self.tmp.cleanup()
+
+    def test_backdated_entries_count_on_their_day(self):
+        self.store.set_remaining_leave(10)  # 오늘 날짜로 남는다
+        self.store.import_entries([('2024-03-05', '09:00', '18:00', '연/월차')])
+        self.store.save_entry('2024-02-14', '09:00', '18:00', '오전반차')  # 더 이른 날을 나중에 입력
+        self.assertEqual(self.store.leave_balance_on('2024-02-13'), 0.0)
+        self.assertEqual(self.store.leave_balance_on('2024-02-29'), -0.5)
+        self.assertEqual(self.store.leave_balance_on('2024-03-31'), -1.5)
+        self.assertEqual(self.store.leave_balance_on(datetime.date.today().isoformat()), 8.5)
+
+    def test_running_balance_follows_day_order(self):
+        self.store.save_entry('2024-06-10', '09:00', '18:00', '연/월차')
+        self.store.save_entry('2024-01-10', '09:00', '18:00', '연/월차')
+        self.store.delete_entry('2024-06-10')
+        balance, mismatches = self.store.replay_leave_ledger()
+        self.assertEqual(mismatches, [])
+        self.assertEqual(balance, self.store.remaining_leave)
+        self.assertEqual(self.store.load_remaining_leave(), -1.0)
+        days = [day for _, _, day, *_ in self.store.leave_entries()]
+        self.assertEqual(days, sorted(days))
+
+    def test_entries_need_a_day(self):
+        # 날짜가 없는 줄은 (근무일, seq) 순서의 잔액 계산에서 빠지므로 원장에 들어가면 안 된다
+        with self.assertRaises(ValueError):
+            self.store.record_leave([(None, 'grant', 15.0, None)])
+        with self.assertRaises(sqlite3.IntegrityError):
+            self.db.execute('Insert leave entry', (None, 'grant', 15.0, 'bench'))
+        self.assertEqual(self.store.leave_entries(), [])
+
+    def test_range_edits_are_noted(self):
+        # 감사할 때 가져오기와 범위 편집을 구분할 수 있어야 한다
+        self.store.save_range('2024-06-01', '2024-06-30', '08:00', '17:00', '일반근무')
+        self.store.delete_range('2024-06-03', '2024-06-03')
+        notes = [(kind, note) for _, _, _, kind, _, _, note in self.store.leave_entries()]
+        self.assertEqual(notes, [('earned', 'range save'), ('forfeit', 'range delete')])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import hashlib
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core import WorkHoursStore  # noqa: E402
+from db import Database  # noqa: E402
+from rollup import employee_report  # noqa: E402
+
+
+def digest(path):
+    with open(path, 'rb') as file:
+        return hashlib.sha256(file.read()).hexdigest()
+
+
+class ReadOnlyRollupTest(unittest.TestCase):
+    # 팀 합계를 낼 때 직원의 DB 파일은 바뀌거나 옆에 파일이 생기면 안 된다
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        os.mkdir(os.path.join(self.tmp.name, 'bob'))
+        self.path = os.path.join(self.tmp.name, 'bob', 'work_hours.db')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def files(self):
+        return sorted(os.listdir(os.path.dirname(self.path)))
+
+    def test_old_schema_is_upgraded_in_memory(self):
+        # 'HH:MM' 텍스트를 쓰던 버전 0 파일
+        conn = sqlite3.connect(self.path)
+        conn.executescript("""
+            CREATE TABLE work_hours (date TEXT PRIMARY KEY, start_time TEXT, end_time TEXT, work_type TEXT);
+            CREATE TABLE holidays (date TEXT PRIMARY KEY, description TEXT);
+            CREATE TABLE settings (key TEXT PRIMARY KEY, value TEXT);
+            INSERT INTO work_hours VALUES ('2024-06-03', '08:00', '17:00', '일반근무');
+        """)
+        conn.close()
+        before = digest(self.path)
+        report = employee_report(self.path, 2024)
+        self.assertIsNone(report.error)
+        self.assertEqual(report.months[5].total_hours, 8.0)
+        self.assertEqual(digest(self.path), before)
+        self.assertEqual(self.files(), ['work_hours.db'])
+
+    def test_wal_file_leaves_nothing_behind(self):
+        db = Database(self.path, journal_mode='WAL')
+        WorkHoursStore(db).save_entry('2024-06-03', '08:00', '17:00', '일반근무')
+        db.close()
+        report = employee_report(self.path, 2024)
+        self.assertIsNone(report.error)
+        self.assertEqual(report.months[5].total_hours, 8.0)
+        self.assertEqual(self.files(), ['work_hours.db'])
+
+
+if __name__ == '__main__':
+    unittest.main()
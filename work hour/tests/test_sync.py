@@ -0,0 +1,69 @@
+import datetime
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core import WorkHoursStore  # noqa: E402
+from db import Database  # noqa: E402
+from sync import sync  # noqa: E402
+
+
+class SyncTest(unittest.TestCase):
+    # 두 기기가 공유 폴더로 서로 동기화하면 근무 기록과 연차 잔액이 같아져야 한다
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.folder = os.path.join(self.tmp.name, 'share')
+        self.dbs = [Database(os.path.join(self.tmp.name, name)) for name in ('a.db', 'b.db')]
+        self.a, self.b = [WorkHoursStore(db) for db in self.dbs]
+
+    def tearDown(self):
+        for db in self.dbs:
+            db.close()
+        self.tmp.cleanup()
+
+    def sync_both(self):
+        sync(self.a, self.folder)
+        sync(self.b, self.folder)
+        sync(self.a, self.folder)
+
+    def test_entries_and_leave_follow(self):
+        self.a.save_entry('2024-06-03', '09:00', '18:00', '연/월차')
+        self.a.set_remaining_leave(10)
+        self.sync_both()
+        self.assertEqual(self.b.get_entry('2024-06-03'), ('09:00', '18:00', '연/월차'))
+        self.assertEqual(self.b.remaining_leave, 10.0)
+        self.assertEqual(self.b.load_remaining_leave(), 10.0)
+
+    def test_resaving_a_completed_month(self):
+        # 다 채운 달의 날을 다시 저장해도 연차는 한 번만 생기므로 받은 쪽과 잔액이 같다
+        day = datetime.date(2024, 6, 1)
+        while day.month == 6:
+            if day.weekday() < 5:
+                self.a.save_entry(day.isoformat(), '08:00', '17:00', '일반근무')
+            day += datetime.timedelta(days=1)
+        self.a.save_entry('2024-06-05', '08:00', '17:00', '일반근무')
+        self.a.save_entry('2024-06-08', '10:00', '12:00', '일반근무')  # 주말
+        self.sync_both()
+        self.assertEqual(self.a.load_remaining_leave(), 1.0)
+        self.assertEqual(self.b.load_remaining_leave(), self.a.load_remaining_leave())
+        self.b.delete_entry('2024-06-08')
+        self.sync_both()
+        self.assertEqual(self.a.load_remaining_leave(), 1.0)
+        self.assertEqual(self.b.load_remaining_leave(), 1.0)
+
+    def test_leave_set_on_either_device(self):
+        self.a.set_remaining_leave(10)
+        self.sync_both()
+        self.b.set_remaining_leave(12.5)
+        self.sync_both()
+        self.assertEqual(self.a.load_remaining_leave(), 12.5)
+        self.assertEqual(self.b.load_remaining_leave(), 12.5)
+        self.assertEqual(sync(self.b, self.folder).exported, 0)  # 받은 잔액을 다시 올리지 않는다
+
+
+if __name__ == '__main__':
+    unittest.main()
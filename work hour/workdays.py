@@ -0,0 +1,110 @@
+import calendar
+import datetime
+import sqlite3
+
+HOURS_PER_DAY = 8
+
+
+def count_weekdays(first, last):
+    # first~last(포함) 사이의 월~금 일수를 반복 없이 계산한다
+    days = (last - first).days + 1
+    if days <= 0:
+        return 0
+    full_weeks, extra = divmod(days, 7)
+    start = first.weekday()
+    return full_weeks * 5 + sum(1 for offset in range(extra) if (start + offset) % 7 < 5)
+
+
+def quarter_range(year, month):
+    first_month = (month - 1) // 3 * 3 + 1
+    last_month = first_month + 2
+    return (datetime.date(year, first_month, 1),
+            datetime.date(year, last_month, calendar.monthrange(year, last_month)[1]))
+
+
+def month_end(year, month):
+    return datetime.date(year, month, calendar.monthrange(year, month)[1])
+
+
+class WorkdayEngine:
+    # 달별 근무일 비트마스크와 구간별 근무일 수를 캐시한다. 휴일이 바뀔 때만 무효화된다.
+    def __init__(self, db):
+        self.db = db
+        self.month_masks = {}  # (년, 월) -> 근무일이면 (일 - 1)번째 비트가 1
+        self.range_counts = {}  # (처음, 끝) -> 근무일 수
+
+    def month_mask(self, year, month):
+        key = (year, month)
+        mask = self.month_masks.get(key)
+        if mask is None:
+            holiday_days = set()
+            first_weekday, days_in_month = calendar.monthrange(year, month)
+            first = datetime.date(year, month, 1).toordinal()
+            try:
+                holiday_days = {day - first + 1 for day, _ in
+                                self.db.fetchall('Select holidays in date range', (first, first + days_in_month - 1))}
+            except sqlite3.Error as e:
+                print(f"Database error: {e}")
+            mask = 0
+            for day in range(1, days_in_month + 1):
+                if (first_weekday + day - 1) % 7 < 5 and day not in holiday_days:
+                    mask |= 1 << (day - 1)
+            self.month_masks[key] = mask
+        return mask
+
+    def is_workday(self, year, month, day):
+        return bool(self.month_mask(year, month) >> (day - 1) & 1)
+
+    def workdays_in_month(self, year, month):
+        return bin(self.month_mask(year, month)).count('1')
+
+    def count(self, first, last):
+        # 주말은 산술로, 평일 휴일은 인덱스를 타는 COUNT 한 번으로 뺀다
+        key = (first, last)
+        count = self.range_counts.get(key)
+        if count is None:
+            count = count_weekdays(first, last)
+            if count:
+                try:
+                    count -= self.db.fetchone('Count weekday holidays in date range',
+                                              (first.toordinal(), last.toordinal()))[0]
+                except sqlite3.Error as e:
+                    print(f"Database error: {e}")
+            self.range_counts[key] = count
+        return count
+
+    def required_hours(self, first, last):
+        return self.count(first, last) * HOURS_PER_DAY
+
+    def quarter_required_hours(self, year, month):
+        return self.required_hours(*quarter_range(year, month))
+
+    def year_to_date_required_hours(self, year, month):
+        # 1월 1일부터 해당 월 말일까지
+        return self.required_hours(datetime.date(year, 1, 1), month_end(year, month))
+
+    def set_holiday(self, date_str, is_holiday):
+        # 휴일 한 건이 바뀌면 DB를 다시 읽지 않고 캐시된 비트와 구간 수만 고친다
+        day = datetime.date.fromisoformat(date_str)
+        if day.weekday() >= 5:  # 주말 휴일은 근무일 수에 영향이 없다
+            return
+        mask = self.month_masks.get((day.year, day.month))
+        if mask is None:
+            self.invalidate(date_str)
+            return
+        bit = 1 << (day.day - 1)
+        if bool(mask & bit) != is_holiday:  # 이미 그 상태
+            return
+        self.month_masks[(day.year, day.month)] = mask ^ bit
+        delta = -1 if is_holiday else 1
+        for first, last in self.range_counts:
+            if first <= day <= last:
+                self.range_counts[(first, last)] += delta
+
+    def invalidate(self, date_str):
+        self.month_masks.pop((int(date_str[:4]), int(date_str[5:7])), None)
+        self.range_counts.clear()
+
+    def clear(self):
+        self.month_masks.clear()
+        self.range_counts.clear()
@@ -0,0 +1,109 @@
+import sqlite3
+import threading
+import time
+
+from db import load_query
+from perf import PERF
+
+
+class BackgroundWriter:
+    # 쓰기 전용 스레드. 자기 연결을 따로 열고, 짧은 시간 안에 들어온 쓰기를 한 트랜잭션으로 묶어 커밋한다.
+    # on_commit(개수)와 on_error(예외, 쓰기 목록)은 이 스레드에서 호출되므로 GUI는 시그널로 넘겨 받아야 한다.
+    def __init__(self, db, coalesce_ms=50, on_commit=None, on_error=None):
+        self.db = db
+        self.coalesce_ms = coalesce_ms
+        self.on_commit = on_commit
+        self.on_error = on_error
+        self.ops = []  # 대기 중인 (쿼리 이름, 파라미터, executemany 여부)
+        self.in_flight = 0  # 지금 커밋 중인 쓰기 수
+        self.flush_waiters = 0
+        self.closed = False
+        self.committed = 0
+        self.batches = 0
+        self.cond = threading.Condition()
+        self.thread = threading.Thread(target=self.run, name='work-hours-writer', daemon=True)
+        self.thread.start()
+
+    def submit(self, query_name, params=(), many=False):
+        load_query(query_name)  # 이름이 틀리면 쓰기 스레드가 아니라 호출한 쪽에서 바로 실패하도록
+        with self.cond:
+            if self.closed:
+                raise sqlite3.ProgrammingError("Background writer is closed")
+            self.ops.append((query_name, params, many))
+            self.cond.notify_all()
+
+    @property
+    def pending(self):
+        with self.cond:
+            return bool(self.ops or self.in_flight)
+
+    def flush(self):
+        # 지금까지 넣은 쓰기가 모두 커밋(또는 실패)될 때까지 기다린다
+        with self.cond:
+            self.flush_waiters += 1
+            self.cond.notify_all()
+            try:
+                while self.ops or self.in_flight:
+                    self.cond.wait()
+            finally:
+                self.flush_waiters -= 1
+
+    def close(self):
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+        self.thread.join()
+
+    @staticmethod
+    def execute(conn, query_name, params, many):
+        if many:
+            conn.executemany(load_query(query_name), params)
+        else:
+            conn.execute(load_query(query_name), params)
+
+    def run(self):
+        conn = self.db.connect()
+        try:
+            while True:
+                with self.cond:
+                    while not self.ops and not self.closed:
+                        self.cond.wait()
+                    if not self.ops:
+                        return
+                    # 연속 클릭을 한 번에 커밋하도록 잠깐 더 모은다 (flush/close 중이면 바로 쓴다)
+                    deadline = time.monotonic() + self.coalesce_ms / 1000
+                    while not self.closed and not self.flush_waiters:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self.cond.wait(remaining)
+                    batch, self.ops = self.ops, []
+                    self.in_flight = len(batch)
+                error = None
+                started = time.perf_counter()
+                try:
+                    with conn:
+                        for query_name, params, many in batch:
+                            if PERF.enabled:
+                                with PERF.timer('sql', query_name):
+                                    self.execute(conn, query_name, params, many)
+                            else:
+                                self.execute(conn, query_name, params, many)
+                except sqlite3.Error as e:
+                    error = e
+                if PERF.enabled:
+                    PERF.record('writer', 'batch commit', (time.perf_counter() - started) * 1000)
+                with self.cond:
+                    self.in_flight = 0
+                    if error is None:
+                        self.committed += len(batch)
+                        self.batches += 1
+                    self.cond.notify_all()
+                if error is not None:
+                    print(f"Database error: {error}")
+                    if self.on_error:
+                        self.on_error(error, batch)
+                elif self.on_commit:
+                    self.on_commit(len(batch))
+        finally:
+            conn.close()